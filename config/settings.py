@@ -5,11 +5,18 @@ Author: Lucas Maidana
 """
 
 import os
-from typing import Dict, Any
-from dataclasses import dataclass, field
+import sys
+from functools import cached_property, lru_cache
+from types import MappingProxyType
+from typing import Dict, Any, ClassVar, Mapping, NamedTuple, Optional, Tuple
+from dataclasses import dataclass, field, fields
 
 
-@dataclass
+# dataclass(slots=True) is only available on Python 3.10+
+DATACLASS_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**DATACLASS_SLOTS)
 class BrowserConfig:
     """Browser configuration settings"""
     name: str
@@ -17,13 +24,14 @@ class BrowserConfig:
     window_size: str = "1920,1080"
     download_directory: str = "./downloads"
     
+    FIELD_NAMES: ClassVar[Tuple[str, ...]] = ()
+    
+    def __post_init__(self):
+        # Resolved once here, browsers need an absolute download path
+        self.download_directory = os.path.abspath(self.download_directory)
+    
     def to_dict(self) -> Dict[str, Any]:
-        return {
-            'name': self.name,
-            'headless': self.headless,
-            'window_size': self.window_size,
-            'download_directory': self.download_directory
-        }
+        return {name: getattr(self, name) for name in self.FIELD_NAMES}
 
 
 @dataclass 
@@ -43,9 +51,20 @@ class TestConfig:
     test_data_file: str = './test_data/test_data.yaml'
     
     # Timeouts (in seconds)
-    implicit_wait: int = 10
+    # WebDriver has three session timeouts: implicit (element lookups),
+    # pageLoad (driver.get) and script (execute_async_script callbacks).
+    # Page objects wait explicitly; a non-zero implicit wait stretches every
+    # missing-element probe inside those waits to the full implicit timeout
+    implicit_wait: int = int(os.getenv('IMPLICIT_WAIT', '0'))
     explicit_wait: int = 20
     page_load_timeout: int = 30
+    script_timeout: int = int(os.getenv('SCRIPT_TIMEOUT', '10'))
+    poll_frequency: float = float(os.getenv('WAIT_POLL_FREQUENCY', '0.2'))  # explicit wait polling
+    
+    # Page Loading
+    # 'eager' returns from driver.get() at DOMContentLoaded instead of full load
+    page_load_strategy: str = os.getenv('PAGE_LOAD_STRATEGY', 'eager')
+    load_images: bool = os.getenv('LOAD_IMAGES', 'false').lower() == 'true'
     
     # Retry Configuration
     max_retries: int = 3
@@ -73,32 +92,57 @@ class TestConfig:
                 'edge': BrowserConfig('edge')
             }
     
-    @property
+    @cached_property
+    def env(self) -> Mapping[str, Optional[str]]:
+        """
+        Read-only snapshot of the framework's environment variables
+        
+        Values are read from os.environ once and normalized here, so
+        callers never re-query or re-case them. Variables without a
+        framework-wide default (BASE_URL, ADMIN_URL) are None when unset.
+        """
+        environ = os.environ
+        is_ci = environ.get('CI', 'false').lower() == 'true'
+        return MappingProxyType({
+            'BROWSER': environ.get('BROWSER', 'chrome').lower(),
+            'BASE_URL': environ.get('BASE_URL'),
+            'ADMIN_URL': environ.get('ADMIN_URL'),
+            'TEST_ENVIRONMENT': environ.get('TEST_ENVIRONMENT', 'LOCAL'),
+            'HEADLESS': environ.get('HEADLESS', 'false').lower(),
+            'CI': environ.get('CI', 'false').lower(),
+            # Per-action INFO logs are only read locally
+            'LOG_LEVEL': environ.get('LOG_LEVEL', 'WARNING' if is_ci else 'INFO').upper(),
+        })
+    
+    @cached_property
     def current_browser(self) -> str:
         """Get current browser from environment or default to chrome"""
-        return os.getenv('BROWSER', 'chrome').lower()
+        return self.env['BROWSER']
     
-    @property
+    @cached_property
     def is_ci_environment(self) -> bool:
         """Check if running in CI environment"""
-        return os.getenv('CI', 'false').lower() == 'true'
+        return self.env['CI'] == 'true'
     
-    @property
+    @cached_property
     def log_level(self) -> str:
-        """Get log level from environment or default to INFO"""
-        return os.getenv('LOG_LEVEL', 'INFO').upper()
+        """Get log level from environment or default to INFO (WARNING in CI)"""
+        return self.env['LOG_LEVEL']
+    
+    def refresh_environment(self):
+        """Drop the environment snapshot so it is re-read on next access"""
+        for name in ('env', 'current_browser', 'is_ci_environment', 'log_level'):
+            self.__dict__.pop(name, None)
 
 
-@dataclass
-class AdminTestData:
+class AdminTestData(NamedTuple):
     """Admin test data configuration"""
     username: str = os.getenv('ADMIN_USERNAME', 'admin')
     password: str = os.getenv('ADMIN_PASSWORD', 'admin123')
     email: str = os.getenv('ADMIN_EMAIL', 'admin@opencart.local')
 
 
-@dataclass
-class CustomerTestData:
+class CustomerTestData(NamedTuple):
     """Customer test data configuration"""
     firstname: str = 'Test'
     lastname: str = 'Customer'
@@ -112,6 +156,10 @@ class CustomerTestData:
     region: str = 'Florida'
 
 
+# Field names resolved once instead of walking dataclass fields per call
+BrowserConfig.FIELD_NAMES = tuple(f.name for f in fields(BrowserConfig))
+
+
 # Global configuration instance
 config = TestConfig()
 admin_data = AdminTestData()
@@ -121,39 +169,46 @@ customer_data = CustomerTestData()
 class TestEnvironments:
     """Environment-specific configurations"""
     
-    LOCAL = {
+    # Read-only so the cached lookups below can be shared safely
+    LOCAL = MappingProxyType({
         'base_url': 'http://localhost/opencart',
         'admin_url': 'http://localhost/opencart/admin',
         'db_host': 'localhost'
-    }
+    })
     
-    DOCKER = {
+    DOCKER = MappingProxyType({
         'base_url': 'http://opencart:80',
         'admin_url': 'http://opencart:80/admin',
         'db_host': 'opencart-db'
-    }
+    })
     
-    STAGING = {
+    STAGING = MappingProxyType({
         'base_url': 'https://staging.opencart.example.com',
         'admin_url': 'https://staging.opencart.example.com/admin',
         'db_host': 'staging-db.example.com'
-    }
+    })
     
     @classmethod
-    def get_environment(cls, env_name: str = None) -> Dict[str, str]:
+    def get_environment(cls, env_name: str = None) -> Mapping[str, str]:
         """Get environment configuration by name"""
         env_name = env_name or os.getenv('TEST_ENVIRONMENT', 'LOCAL')
-        return getattr(cls, env_name.upper(), cls.LOCAL)
+        return cls._lookup_environment(env_name.upper())
+    
+    @staticmethod
+    @lru_cache(maxsize=8)
+    def _lookup_environment(env_name: str) -> Mapping[str, str]:
+        """Resolve an upper-cased environment name (cached per name)"""
+        return getattr(TestEnvironments, env_name, TestEnvironments.LOCAL)
 
 
 # API Configuration
 API_CONFIG = {
     'timeout': 30,
     'retry_count': 3,
-    'base_headers': {
+    'base_headers': MappingProxyType({
         'Content-Type': 'application/json',
         'Accept': 'application/json'
-    }
+    })
 }
 
 # Email Configuration for notifications
@@ -174,15 +229,19 @@ PERFORMANCE_CONFIG = {
 }
 
 # Security Testing Configuration
+SQL_INJECTION_PAYLOADS: Tuple[str, ...] = (
+    "' OR '1'='1",
+    "'; DROP TABLE users; --",
+    "' UNION SELECT * FROM users --"
+)
+
+XSS_PAYLOADS: Tuple[str, ...] = (
+    "<script>alert('XSS')</script>",
+    "javascript:alert('XSS')",
+    "<img src=x onerror=alert('XSS')>"
+)
+
 SECURITY_CONFIG = {
-    'sql_injection_payloads': [
-        "' OR '1'='1",
-        "'; DROP TABLE users; --",
-        "' UNION SELECT * FROM users --"
-    ],
-    'xss_payloads': [
-        "<script>alert('XSS')</script>",
-        "javascript:alert('XSS')",
-        "<img src=x onerror=alert('XSS')>"
-    ]
-}
\ No newline at end of file
+    'sql_injection_payloads': SQL_INJECTION_PAYLOADS,
+    'xss_payloads': XSS_PAYLOADS
+}
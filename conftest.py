@@ -4,17 +4,41 @@ Global test configuration for OpenCart test framework
 Author: Lucas Maidana
 """
 
+from __future__ import annotations
+
 import os
+import sys
+import itertools
 import pytest
 import time
-from datetime import datetime
-from typing import Generator
-from selenium import webdriver
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Generator, Iterator
 
-from config.settings import config, TestEnvironments
-from utils.driver_manager import DriverManager, get_driver, quit_driver
+from config.settings import config as settings, TestEnvironments
 from loguru import logger
 
+# Selenium is imported lazily by the fixtures that
+# need a browser, so --collect-only and filtered runs don't pay for them
+if TYPE_CHECKING:
+    from selenium import webdriver
+
+
+# Interpreter version for the session banner ('python_version' isn't an ini key)
+PYTHON_VERSION = sys.version.split()[0]
+
+# Marker names of a test item, computed once per item
+MARKERS_KEY = pytest.StashKey[tuple]()
+
+# WebDriver used by a test item, set by the driver fixture
+DRIVER_KEY = pytest.StashKey[object]()
+
+# Failure screenshot directory, resolved once
+SCREENSHOTS_DIR = os.fspath(settings.screenshots_dir).rstrip("/\\")
+
+# loguru handler id of the execution log file added in pytest_configure
+_LOG_HANDLER_ID = None
+
 
 def pytest_addoption(parser):
     """Add custom command line options"""
@@ -27,7 +51,7 @@ def pytest_addoption(parser):
     parser.addoption(
         "--base-url",
         action="store", 
-        default=config.base_url,
+        default=settings.base_url,
         help="Base URL for OpenCart application"
     )
     parser.addoption(
@@ -51,53 +75,123 @@ def pytest_addoption(parser):
         action="store_true",
         help="Run only smoke tests"
     )
+    parser.addoption(
+        "--workers",
+        action="store",
+        default=None,
+        help="Parallel workers via pytest-xdist: a number, auto or logical"
+    )
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_cmdline_main(config):
+    """Map --workers onto pytest-xdist's -n, distributing tests by xdist_group"""
+    # Workers re-parse the controller's arguments, --workers included; only
+    # the controller may start workers
+    if hasattr(config, "workerinput"):
+        return
+    
+    workers = config.getoption("--workers")
+    if workers is None or not config.pluginmanager.hasplugin("xdist"):
+        return
+    
+    config.option.numprocesses = workers if workers in ("auto", "logical") else int(workers)
+    # Tests on the pooled driver fixture are independent and spread one by
+    # one; classes relying on class_driver state mark themselves with
+    # @pytest.mark.xdist_group so they stay on a single worker
+    if config.option.dist == "no":
+        config.option.dist = "loadgroup"
+
 
+@lru_cache(maxsize=1)
+def _ensure_report_dirs():
+    """Create report directories once per process"""
+    Path(settings.reports_dir).mkdir(parents=True, exist_ok=True)
+    Path(settings.screenshots_dir).mkdir(parents=True, exist_ok=True)
 
-def pytest_configure(config_obj):
+
+def pytest_configure(config):
     """Configure pytest environment"""
     # Set environment variables from command line options
-    os.environ['BROWSER'] = config_obj.getoption('--browser')
-    os.environ['BASE_URL'] = config_obj.getoption('--base-url')
-    os.environ['TEST_ENVIRONMENT'] = config_obj.getoption('--environment')
+    os.environ['BROWSER'] = config.getoption('--browser')
+    os.environ['BASE_URL'] = config.getoption('--base-url')
+    os.environ['TEST_ENVIRONMENT'] = config.getoption('--environment')
     
-    if config_obj.getoption('--headless'):
+    if config.getoption('--headless'):
         os.environ['HEADLESS'] = 'true'
     
+    # Environment changed above, drop cached lookups on the shared settings
+    settings.refresh_environment()
+    
+    # Configure output only once per process, re-entry would duplicate it
+    global _LOG_HANDLER_ID, SCREENSHOTS_DIR
+    if _LOG_HANDLER_ID is not None:
+        return
+    
+    # pytest-xdist workers get their own screenshot, download directory and log file
+    worker_id = os.environ.get('PYTEST_XDIST_WORKER')
+    log_name = "test_execution.log"
+    if worker_id:
+        settings.screenshots_dir = os.path.join(settings.screenshots_dir, worker_id)
+        SCREENSHOTS_DIR = settings.screenshots_dir
+        for browser_config in settings.browsers.values():
+            browser_config.download_directory = os.path.join(browser_config.download_directory, worker_id)
+        log_name = f"test_execution_{worker_id}.log"
+    
     # Create report directories
-    os.makedirs(config.reports_dir, exist_ok=True)
-    os.makedirs(config.screenshots_dir, exist_ok=True)
+    _ensure_report_dirs()
     
-    # Configure logging
-    logger.add(
-        f"{config.reports_dir}/test_execution.log",
+    # Sinks follow LOG_LEVEL so disabled debug calls in page objects return
+    # before any formatting or frame inspection
+    try:
+        logger.remove(0)
+    except ValueError:
+        pass  # default stderr sink already replaced earlier in this process
+    else:
+        logger.add(sys.stderr, level=settings.log_level)
+    
+    _LOG_HANDLER_ID = logger.add(
+        f"{settings.reports_dir}/{log_name}",
         rotation="10 MB",
         retention="10 days",
-        level="DEBUG",
-        format="{time:YYYY-MM-DD HH:mm:ss} | {level} | {name}:{function}:{line} | {message}"
+        level=settings.log_level,
+        format="{time:YYYY-MM-DD HH:mm:ss} | {level} | {name}:{function}:{line} | {message}",
+        # In CI nobody reads colors or variable dumps; format off the test thread
+        colorize=False,
+        backtrace=not settings.is_ci_environment,
+        diagnose=not settings.is_ci_environment,
+        enqueue=settings.is_ci_environment
     )
     
     logger.info("=== Test Execution Started ===")
-    logger.info(f"Browser: {os.environ.get('BROWSER', 'chrome')}")
-    logger.info(f"Base URL: {os.environ.get('BASE_URL', config.base_url)}")
-    logger.info(f"Environment: {os.environ.get('TEST_ENVIRONMENT', 'LOCAL')}")
+    env = settings.env
+    logger.info(f"Browser: {env['BROWSER']}")
+    logger.info(f"Base URL: {env['BASE_URL'] or settings.base_url}")
+    logger.info(f"Environment: {env['TEST_ENVIRONMENT']}")
 
 
-def pytest_collection_modifyitems(config_obj, items):
+def pytest_collection_modifyitems(config, items):
     """Modify test collection based on command line options"""
-    if config_obj.getoption("--smoke-only"):
-        # Run only smoke tests
-        selected_items = []
-        for item in items:
-            if "smoke" in item.keywords:
-                selected_items.append(item)
-        items[:] = selected_items
-    
-    if not config_obj.getoption("--slow"):
-        # Skip slow tests unless explicitly requested
-        skip_slow = pytest.mark.skip(reason="Slow test skipped (use --slow to run)")
-        for item in items:
-            if "slow" in item.keywords:
-                item.add_marker(skip_slow)
+    smoke_only = config.getoption("--smoke-only")
+    run_slow = config.getoption("--slow")
+    
+    if not smoke_only and run_slow:
+        return
+    
+    # Skip slow tests unless explicitly requested
+    skip_slow = pytest.mark.skip(reason="Slow test skipped (use --slow to run)")
+    
+    # Single pass: drop non-smoke tests and mark slow ones as skipped
+    selected_items = []
+    keep = selected_items.append
+    for item in items:
+        keywords = item.keywords
+        if smoke_only and "smoke" not in keywords:
+            continue
+        if not run_slow and "slow" in keywords:
+            item.add_marker(skip_slow)
+        keep(item)
+    items[:] = selected_items
 
 
 @pytest.fixture(scope="session")
@@ -108,56 +202,210 @@ def test_config():
     Returns:
         dict: Test configuration
     """
-    env_config = TestEnvironments.get_environment(
-        os.environ.get('TEST_ENVIRONMENT', 'LOCAL')
-    )
+    env = settings.env
+    env_config = TestEnvironments.get_environment(env['TEST_ENVIRONMENT'])
     
     test_config = {
-        'base_url': os.environ.get('BASE_URL', env_config['base_url']),
-        'admin_url': os.environ.get('ADMIN_URL', env_config['admin_url']),
-        'browser': os.environ.get('BROWSER', 'chrome'),
-        'headless': os.environ.get('HEADLESS', 'false').lower() == 'true',
-        'environment': os.environ.get('TEST_ENVIRONMENT', 'LOCAL')
+        'base_url': env['BASE_URL'] if env['BASE_URL'] is not None else env_config['base_url'],
+        'admin_url': env['ADMIN_URL'] if env['ADMIN_URL'] is not None else env_config['admin_url'],
+        'browser': env['BROWSER'],
+        'headless': env['HEADLESS'] == 'true',
+        'environment': env['TEST_ENVIRONMENT']
     }
     
     logger.info(f"Test configuration: {test_config}")
     return test_config
 
 
+@pytest.fixture(scope="session")
+def driver_pool() -> Generator[dict, None, None]:
+    """
+    Session-scoped pool of DriverManagers keyed by (browser, worker id)
+    
+    Each pytest-xdist worker is its own process, so every worker gets
+    its own pool and browsers are never shared between workers.
+    
+    Yields:
+        dict: Mapping of (browser, worker id) to DriverManager
+    """
+    pool = {}
+    yield pool
+    
+    for manager in pool.values():
+        manager.quit_driver()
+    pool.clear()
+    logger.info("Pooled WebDrivers cleaned up")
+
+
+# Store pages loaded once by each new pooled browser to fill its HTTP cache
+# with the theme's CSS, JS and images before the first test
+WARMUP_PATHS = (
+    "",
+    "index.php?route=product/category&path=20",
+)
+
+# Upper bound for the warm-up home page to finish loading its resources
+WARMUP_TIMEOUT = 15  # seconds
+
+
+def _warm_up_browser(driver_instance, base_url: str):
+    """
+    Load WARMUP_PATHS so later tests find static resources in the browser cache
+    
+    Args:
+        driver_instance: Newly started WebDriver
+        base_url: Base URL of OpenCart installation
+    """
+    from selenium.common.exceptions import WebDriverException
+    from selenium.webdriver.support.ui import WebDriverWait
+    
+    start_time = time.perf_counter()
+    try:
+        for path in WARMUP_PATHS:
+            driver_instance.get(f"{base_url.rstrip('/')}/{path}")
+            # An 'eager' get() returns before images and other subresources
+            WebDriverWait(driver_instance, WARMUP_TIMEOUT).until(
+                lambda d: d.execute_script("return document.readyState") == "complete"
+            )
+    except WebDriverException as e:
+        logger.warning(f"Browser warm-up incomplete: {e}")
+    logger.debug("Browser warm-up took {:.2f} seconds", time.perf_counter() - start_time)
+
+
+def _acquire_pooled_driver(test_config: dict, driver_pool: dict, browser: str = None):
+    """
+    DriverManager of this worker's pooled browser, started and warmed up
+    
+    Args:
+        test_config: Test configuration from session fixture
+        driver_pool: Session pool of driver managers
+        browser: Browser to use instead of the configured one
+        
+    Returns:
+        DriverManager: Manager whose driver is running
+    """
+    from utils.driver_manager import DriverManager
+    
+    browser = browser or test_config['browser']
+    key = (browser, os.environ.get('PYTEST_XDIST_WORKER', 'master'))
+    
+    driver_manager = driver_pool.get(key)
+    if driver_manager is None:
+        driver_manager = driver_pool[key] = DriverManager(browser)
+    is_new_browser = driver_manager.driver is None
+    driver_instance = driver_manager.get_driver()
+    
+    if is_new_browser:
+        _warm_up_browser(driver_instance, test_config['base_url'])
+        driver_manager.reset_driver()
+    
+    return driver_manager
+
+
 @pytest.fixture(scope="function")
-def driver(test_config) -> Generator[webdriver.Remote, None, None]:
+def driver(request, test_config, driver_pool) -> Generator[webdriver.Remote, None, None]:
     """
-    Function-scoped WebDriver fixture
+    Function-scoped WebDriver fixture backed by the session driver pool
+    
+    The browser is started once per worker and reset between tests
+    (cookies, web storage, about:blank) instead of being quit. The reset
+    stays synchronous: the worker's next test runs on the same browser, and
+    overlapping work comes from running more xdist workers, not from a
+    second background session per worker.
     
     Args:
+        request: Pytest request for the test using the driver
         test_config: Test configuration from session fixture
+        driver_pool: Session pool of driver managers
         
     Yields:
         webdriver.Remote: WebDriver instance
     """
-    browser = test_config['browser']
-    driver_instance = None
+    # Tests parametrized over "browser" run on that browser's pooled driver,
+    # so each case of a browser matrix can land on its own xdist worker
+    callspec = getattr(request.node, "callspec", None)
+    browser = callspec.params.get("browser") if callspec else None
+    browser = browser or test_config['browser']
     
     try:
-        # Create driver instance
-        driver_manager = DriverManager(browser)
-        driver_instance = driver_manager.create_driver()
+        driver_manager = _acquire_pooled_driver(test_config, driver_pool, browser)
+        driver_instance = driver_manager.driver
         
-        logger.info(f"WebDriver created for test: {browser}")
-        yield driver_instance
+        logger.info(f"Pooled WebDriver acquired for test: {browser}")
+        
+        # Let the report hook find the driver without probing fixtures
+        request.node.stash[DRIVER_KEY] = driver_instance
         
     except Exception as e:
         logger.error(f"Failed to create WebDriver: {e}")
         raise
     
+    yield driver_instance
+    
+    # Release the driver back to the pool
+    from pages.base_page import clear_element_cache
+    clear_element_cache(driver_instance)
+    try:
+        driver_manager.reset_driver()
+        logger.info("WebDriver reset after test")
+    except Exception as e:
+        # A browser that cannot be reset is discarded and recreated on next use
+        logger.warning(f"Error during WebDriver reset, discarding driver: {e}")
+        driver_manager.quit_driver()
+
+
+@pytest.fixture(scope="session")
+def registered_user(test_config, driver_pool, test_data_pool) -> dict:
+    """
+    Customer account registered once per session (and per xdist worker)
+    
+    Tests that only need valid credentials log in with this account
+    instead of registering their own through the form. The account is
+    created with a plain HTTP form post, falling back to the browser.
+    
+    Args:
+        test_config: Test configuration from session fixture
+        driver_pool: Session pool of driver managers
+        test_data_pool: Pre-generated test data records
+        
+    Returns:
+        dict: Registration data, including email and password
+    """
+    import requests
+    from pages.frontend.home_page import HomePage
+    from pages.frontend.registration_page import RegistrationPage
+    from utils.account_api import register_customer
+    
+    user_data = dict(
+        next(test_data_pool)['user'],
+        email=RegistrationPage.generate_unique_email(),
+        newsletter=False
+    )
+    user_data['confirm_password'] = user_data['password']
+    
+    # Posting the form directly skips the browser entirely
+    try:
+        if register_customer(user_data, test_config['base_url']):
+            logger.info(f"Session test user registered over HTTP: {user_data['email']}")
+            return user_data
+        logger.warning("HTTP registration was not accepted, registering in the browser")
+    except requests.RequestException as e:
+        logger.warning(f"HTTP registration failed, registering in the browser: {e}")
+    
+    driver_manager = _acquire_pooled_driver(test_config, driver_pool)
+    try:
+        home_page = HomePage(driver_manager.driver, test_config['base_url'])
+        home_page.click_register()
+        registration_page = RegistrationPage(driver_manager.driver)
+        registration_page.fast_submit(user_data)
+        if not registration_page.is_registration_successful():
+            pytest.fail("Could not register the session test user")
     finally:
-        # Cleanup
-        if driver_instance:
-            try:
-                driver_manager.quit_driver()
-                logger.info("WebDriver cleaned up after test")
-            except Exception as e:
-                logger.warning(f"Error during WebDriver cleanup: {e}")
+        # Registration logs the new customer in; tests expect to start logged out
+        driver_manager.reset_driver()
+    
+    logger.info(f"Session test user registered: {user_data['email']}")
+    return user_data
 
 
 @pytest.fixture(scope="class")
@@ -171,6 +419,8 @@ def class_driver(test_config) -> Generator[webdriver.Remote, None, None]:
     Yields:
         webdriver.Remote: WebDriver instance
     """
+    from utils.driver_manager import DriverManager
+    
     browser = test_config['browser']
     driver_instance = None
     
@@ -199,34 +449,41 @@ def pytest_runtest_makereport(item, call):
     outcome = yield
     report = outcome.get_result()
     
+    # Metadata, screenshots and result logging only apply to the call phase
+    if report.when != "call":
+        return
+    
     # Add test metadata
+    markers = item.stash.get(MARKERS_KEY, None)
+    if markers is None:
+        markers = item.stash[MARKERS_KEY] = tuple(marker.name for marker in item.iter_markers())
     report.test_name = item.name
     report.test_file = item.fspath
-    report.test_markers = [marker.name for marker in item.iter_markers()]
+    report.test_markers = markers
     
     # Handle test failure
-    if report.when == "call" and report.failed:
+    if report.failed:
         logger.error(f"Test failed: {item.name}")
         
         # Take screenshot on failure if driver is available
-        if config.screenshot_on_failure:
+        if settings.screenshot_on_failure:
             try:
-                # Try to get driver from test fixtures
-                if hasattr(item, "funcargs") and "driver" in item.funcargs:
-                    driver_instance = item.funcargs["driver"]
-                elif hasattr(item, "funcargs") and "class_driver" in item.funcargs:
-                    driver_instance = item.funcargs["class_driver"]
-                else:
-                    # Try to get driver from driver manager
-                    driver_manager = DriverManager()
-                    driver_instance = driver_manager.driver
+                # Driver stored by the driver fixture, then other fixtures
+                driver_instance = item.stash.get(DRIVER_KEY, None)
+                if driver_instance is None:
+                    funcargs = getattr(item, "funcargs", None) or {}
+                    driver_instance = funcargs.get("class_driver")
+                if driver_instance is None:
+                    # Try to get an already running driver from the driver manager
+                    from utils.driver_manager import DriverManager
+                    driver_instance = DriverManager.get_active_driver()
                 
                 if driver_instance:
-                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                    screenshot_name = f"FAILED_{item.name}_{timestamp}.png"
-                    screenshot_path = os.path.join(config.screenshots_dir, screenshot_name)
+                    timestamp = time.strftime("%Y%m%d_%H%M%S")
+                    screenshot_path = f"{SCREENSHOTS_DIR}{os.sep}FAILED_{item.name}_{timestamp}.png"
                     
-                    driver_instance.save_screenshot(screenshot_path)
+                    # Encode once and write directly instead of save_screenshot's file round-trip
+                    Path(screenshot_path).write_bytes(driver_instance.get_screenshot_as_png())
                     logger.info(f"Failure screenshot saved: {screenshot_path}")
                     
                     # Add screenshot to report
@@ -236,24 +493,23 @@ def pytest_runtest_makereport(item, call):
                 logger.warning(f"Could not take failure screenshot: {e}")
     
     # Log test results
-    if report.when == "call":
-        duration = report.duration
-        if report.passed:
-            logger.info(f"✅ Test passed: {item.name} ({duration:.2f}s)")
-        elif report.failed:
-            logger.error(f"❌ Test failed: {item.name} ({duration:.2f}s)")
-        elif report.skipped:
-            logger.warning(f"⏭️  Test skipped: {item.name}")
+    duration = report.duration
+    if report.passed:
+        logger.info("✅ Test passed: {} ({:.2f}s)", item.name, duration)
+    elif report.failed:
+        logger.error("❌ Test failed: {} ({:.2f}s)", item.name, duration)
+    elif report.skipped:
+        logger.warning("⏭️  Test skipped: {}", item.name)
 
 
 @pytest.fixture(autouse=True)
 def test_timing():
     """Auto-used fixture to log test timing"""
-    start_time = time.time()
+    start_time = time.perf_counter()
     yield
-    end_time = time.time()
-    duration = end_time - start_time
-    logger.debug(f"Test execution time: {duration:.2f} seconds")
+    duration = time.perf_counter() - start_time
+    # loguru only formats the arguments if a handler accepts DEBUG records
+    logger.debug("Test execution time: {:.2f} seconds", duration)
 
 
 @pytest.fixture
@@ -267,18 +523,34 @@ def wait_time():
     }
 
 
-@pytest.fixture
-def test_data():
-    """Fixture providing test data"""
-    from faker import Faker
-    fake = Faker()
+# Number of pre-generated test data records handed out per session
+TEST_DATA_POOL_SIZE = 256
+
+# Seed for generated test data; unique emails don't depend on it
+TEST_DATA_SEED = int(os.getenv('TEST_SEED', '1234'))
+
+
+def _fast_phone(rng) -> str:
+    """
+    US-style phone number from a random generator
     
+    Faker's phone_number() expands locale patterns through regexes; a
+    single randint is enough for a registration telephone field.
+    
+    Args:
+        rng: random.Random instance, e.g. the Faker instance's seeded one
+    """
+    return f"+1{rng.randint(2000000000, 9999999999)}"
+
+
+def _generate_test_data(fake) -> dict:
+    """Build one test data record from a Faker instance"""
     return {
         'user': {
             'firstname': fake.first_name(),
             'lastname': fake.last_name(),
             'email': fake.email(),
-            'telephone': fake.phone_number()[:15],
+            'telephone': _fast_phone(fake.random),
             'password': 'TestPassword123!',
         },
         'product': {
@@ -296,17 +568,53 @@ def test_data():
     }
 
 
+@pytest.fixture(scope="session")
+def faker_instance():
+    """
+    Session-scoped Faker instance (construction loads every provider)
+    
+    Seeded from TEST_SEED so a failing run's data can be reproduced.
+    """
+    from faker import Faker
+    fake = Faker()
+    fake.seed_instance(TEST_DATA_SEED)
+    logger.info("Test data seed: {}", TEST_DATA_SEED)
+    return fake
+
+
+@pytest.fixture(scope="session")
+def test_data_pool(faker_instance) -> Iterator[dict]:
+    """
+    Session-scoped iterator over a pre-generated batch of test data
+    
+    Returns:
+        Iterator[dict]: Endless cycle over TEST_DATA_POOL_SIZE records
+    """
+    pool = [_generate_test_data(faker_instance) for _ in range(TEST_DATA_POOL_SIZE)]
+    return itertools.cycle(pool)
+
+
+@pytest.fixture
+def test_data(test_data_pool):
+    """Fixture providing test data"""
+    record = next(test_data_pool)
+    # Copy the sections so a test mutating its data can't leak into others
+    return {section: dict(values) for section, values in record.items()}
+
+
 def pytest_sessionstart(session):
     """Called after Session object has been created"""
     logger.info("=== Test Session Started ===")
-    logger.info(f"Python version: {session.config.getini('python_version')}")
+    logger.info(f"Python version: {PYTHON_VERSION}")
     logger.info(f"Pytest version: {pytest.__version__}")
 
 
 def pytest_sessionfinish(session, exitstatus):
     """Called after test session finishes"""
-    # Cleanup all drivers
-    DriverManager.cleanup_all_drivers()
+    # Cleanup all drivers (nothing to do if no fixture ever loaded the manager)
+    driver_manager_module = sys.modules.get('utils.driver_manager')
+    if driver_manager_module is not None:
+        driver_manager_module.DriverManager.cleanup_all_drivers()
     
     # Log session summary
     if hasattr(session, 'testscollected'):
@@ -317,10 +625,16 @@ def pytest_sessionfinish(session, exitstatus):
     
     logger.info(f"Session exit status: {exitstatus}")
     logger.info("=== Test Session Finished ===")
+    
+    # Detach the execution log file handler
+    global _LOG_HANDLER_ID
+    if _LOG_HANDLER_ID is not None:
+        logger.remove(_LOG_HANDLER_ID)
+        _LOG_HANDLER_ID = None
 
 
 # Custom markers for test organization
 pytest_plugins = [
     "pytest_html",
-    "pytest_json_report",
+    "pytest_jsonreport",
 ]
\ No newline at end of file
@@ -4,8 +4,17 @@ Foundation class for all page objects with common functionality
 Author: Lucas Maidana
 """
 
+import os
+import json
 import time
-from typing import List, Optional, Tuple
+import random
+import itertools
+import weakref
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from string import Template
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
@@ -14,19 +23,203 @@ from selenium.webdriver.support.ui import Select
 from selenium.common.exceptions import (
     TimeoutException, 
     NoSuchElementException, 
-    ElementClickInterceptedException
+    ElementClickInterceptedException,
+    StaleElementReferenceException
 )
 from loguru import logger
 
 from config.settings import config
 
 
+# Disambiguates screenshots taken within the same second
+_SCREENSHOT_COUNTER = itertools.count(1)
+
+
+@lru_cache(maxsize=None)
+def _ensure_dir(path: str) -> str:
+    """Create a directory once per process and return it"""
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+# Located elements per WebDriver, shared by every page object driving it
+_ELEMENT_CACHES: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def _element_cache_for(driver) -> "OrderedDict":
+    """Get the element cache shared by all page objects on a driver"""
+    try:
+        cache = _ELEMENT_CACHES.get(driver)
+        if cache is None:
+            cache = _ELEMENT_CACHES[driver] = OrderedDict()
+        return cache
+    except TypeError:
+        # Drivers that can't be weakly referenced get a cache per page object
+        return OrderedDict()
+
+
+def clear_element_cache(driver):
+    """
+    Forget every element cached for a driver
+    
+    For callers that navigate the driver outside any page object (e.g. the
+    pooled driver reset between tests), so the next test starts without
+    stale entries to trip over.
+    """
+    try:
+        _ELEMENT_CACHES.pop(driver, None)
+    except TypeError:
+        pass
+
+
+class _LocatorValues(dict):
+    """Template mapping resolving $NAME to a page locator value as a JS string literal"""
+    
+    def __init__(self, page_class):
+        super().__init__()
+        self.page_class = page_class
+    
+    def __missing__(self, name: str) -> str:
+        return json.dumps(getattr(self.page_class, name).value)
+
+
+@lru_cache(maxsize=None)
+def _compile_macro(page_class: type, macro_name: str) -> str:
+    """Expand a page class macro template once per class"""
+    return Template(page_class.MACROS[macro_name]).substitute(_LocatorValues(page_class))
+
+
+class Locator(NamedTuple):
+    """
+    Element locator usable both as a (By, value) tuple and by field name
+    
+    Unpacks like the plain tuples used elsewhere (driver.find_element(*locator)),
+    while JavaScript fast paths can read the raw selector from .value.
+    """
+    by: str
+    value: str
+
+
 class BasePage:
     """
     Base page object providing common functionality for all page objects
     Implements advanced WebDriver operations with robust error handling
     """
     
+    # Synchronous scroll: no smooth-scroll animation that needs a pause
+    SCROLL_INTO_VIEW_SCRIPT = "arguments[0].scrollIntoView({block: 'center', behavior: 'instant'});"
+    SCROLL_POLL_FREQUENCY = 0.1  # seconds
+    
+    # click_element retry backoff (seconds): uniform(0, min(cap, base * 2 ** attempt))
+    RETRY_BACKOFF_BASE = 0.25
+    RETRY_BACKOFF_CAP = 2.0
+    
+    # Overlays that commonly intercept clicks (modal backdrops, loading masks)
+    OVERLAY_LOCATORS = (
+        Locator(By.CSS_SELECTOR, ".modal-backdrop"),
+        Locator(By.CSS_SELECTOR, "#loading"),
+    )
+    OVERLAY_TIMEOUT = 2  # seconds
+    
+    # Instant existence/visibility check for any By strategy; defines probeElement()
+    _PROBE_ELEMENT_JS = """
+        function probeElement(by, value, requireVisible) {
+            function linkMatching(matches) {
+                return Array.from(document.querySelectorAll('a')).find(function (link) {
+                    return matches(link.textContent.trim());
+                }) || null;
+            }
+            var element;
+            switch (by) {
+                case 'css selector': element = document.querySelector(value); break;
+                case 'id': element = document.getElementById(value); break;
+                case 'name': element = document.getElementsByName(value)[0]; break;
+                case 'tag name': element = document.getElementsByTagName(value)[0]; break;
+                case 'class name': element = document.getElementsByClassName(value)[0]; break;
+                case 'xpath':
+                    element = document.evaluate(value, document, null,
+                        XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+                    break;
+                case 'link text':
+                    element = linkMatching(function (text) { return text === value; }); break;
+                case 'partial link text':
+                    element = linkMatching(function (text) { return text.indexOf(value) !== -1; }); break;
+            }
+            if (!element) { return false; }
+            if (!requireVisible) { return true; }
+            var style = window.getComputedStyle(element);
+            return style.display !== 'none' && style.visibility !== 'hidden'
+                && style.opacity !== '0' && element.getClientRects().length > 0;
+        }
+    """
+    
+    # Arguments: by, value, require visibility
+    PROBE_ELEMENT_SCRIPT = _PROBE_ELEMENT_JS + "return probeElement(arguments[0], arguments[1], arguments[2]);"
+    
+    # Whether every locator is visible (argument: list of [by, value] pairs)
+    PROBE_ALL_VISIBLE_SCRIPT = _PROBE_ELEMENT_JS + """
+        return arguments[0].every(function (locator) {
+            return probeElement(locator[0], locator[1], true);
+        });
+    """
+    
+    # Maximum number of located elements kept per driver
+    ELEMENT_CACHE_SIZE = 64
+    
+    # Visible text of several elements in one call (argument: names mapped to
+    # ID or CSS selector locators); missing or hidden elements read as ''
+    BATCH_TEXT_SCRIPT = """
+        var locators = arguments[0], texts = {};
+        for (var name in locators) {
+            var by = locators[name][0], value = locators[name][1];
+            var element = by === 'id' ? document.getElementById(value) : document.querySelector(value);
+            texts[name] = element ? (element.innerText || '').trim() : '';
+        }
+        return texts;
+    """
+    
+    # Whether any of several elements has visible text, stopping at the first
+    # (argument: list of [by, value] ID or CSS selector locators)
+    ANY_TEXT_SCRIPT = """
+        return arguments[0].some(function (locator) {
+            var element = locator[0] === 'id' ? document.getElementById(locator[1])
+                                              : document.querySelector(locator[1]);
+            return !!element && (element.innerText || '').trim() !== '';
+        });
+    """
+    
+    # Visible text of every element matching a CSS selector (argument: selector)
+    TEXT_ALL_SCRIPT = """
+        return Array.from(document.querySelectorAll(arguments[0])).map(function (element) {
+            return (element.innerText || '').trim();
+        });
+    """
+    
+    # Set an input's value as typing would leave it: appends unless clearing,
+    # respects maxlength and fires input/change. Arguments: element, text,
+    # clear first. Returns the resulting value.
+    SET_VALUE_SCRIPT = """
+        var element = arguments[0], text = arguments[1], clearFirst = arguments[2];
+        var value = clearFirst ? text : element.value + text;
+        if (element.maxLength >= 0) { value = value.slice(0, element.maxLength); }
+        element.value = value;
+        element.dispatchEvent(new Event('input', {bubbles: true}));
+        element.dispatchEvent(new Event('change', {bubbles: true}));
+        return element.value;
+    """
+    
+    # Short waits for elements that may legitimately be absent (e.g. field errors)
+    OPTIONAL_POLL_FREQUENCY = 0.1  # seconds
+    
+    # Re-rendered elements are polled again rather than failing the wait
+    # (NoSuchElementException is ignored by WebDriverWait already)
+    WAIT_IGNORED_EXCEPTIONS = (StaleElementReferenceException,)
+    
+    # Named in-browser flows for execute_macro(). Each is an async script template
+    # where $LOCATOR_NAME expands to that locator's value as a JS string ($$ for a
+    # literal $); arguments[0] holds the keyword parameters of the call.
+    MACROS: Dict[str, str] = {}
+    
     def __init__(self, driver):
         """
         Initialize base page with WebDriver instance
@@ -35,20 +228,50 @@ class BasePage:
             driver: WebDriver instance
         """
         self.driver = driver
-        self.wait = WebDriverWait(driver, config.explicit_wait)
+        self.wait = WebDriverWait(driver, config.explicit_wait, poll_frequency=config.poll_frequency,
+                                  ignored_exceptions=self.WAIT_IGNORED_EXCEPTIONS)
         self.actions = ActionChains(driver)
+        self._element_cache: "OrderedDict[Tuple[str, str], object]" = _element_cache_for(driver)
+        self._waits: Dict[Tuple[float, float], WebDriverWait] = {
+            (config.explicit_wait, config.poll_frequency): self.wait
+        }
+    
+    def _get_wait(self, timeout: float, poll_frequency: float = None) -> WebDriverWait:
+        """
+        Get a reusable WebDriverWait for a timeout and poll frequency
+        
+        WebDriverWait computes its deadline when until() is called,
+        so one instance per (timeout, poll frequency) can be shared.
+        
+        Args:
+            timeout: Wait timeout in seconds
+            poll_frequency: Optional poll interval override
+            
+        Returns:
+            WebDriverWait: Cached wait instance
+        """
+        key = (timeout, poll_frequency or config.poll_frequency)
+        wait = self._waits.get(key)
+        if wait is None:
+            wait = self._waits[key] = WebDriverWait(self.driver, key[0], poll_frequency=key[1],
+                                                    ignored_exceptions=self.WAIT_IGNORED_EXCEPTIONS)
+        return wait
     
     # ====================
     # ELEMENT INTERACTION
     # ====================
     
-    def find_element(self, locator: Tuple[str, str], timeout: int = None) -> object:
+    def find_element(self, locator: Tuple[str, str], timeout: int = None,
+                     use_cache: bool = False) -> object:
         """
         Find element with explicit wait and error handling
         
         Args:
             locator: Tuple of (By, value)
             timeout: Optional timeout override
+            use_cache: Return a previously located element for this locator
+                without a WebDriver round-trip. The element may be stale if
+                the DOM changed since it was located.
             
         Returns:
             WebElement: Found element
@@ -56,15 +279,59 @@ class BasePage:
         Raises:
             TimeoutException: If element not found within timeout
         """
+        if use_cache:
+            element = self._element_cache.get(locator)
+            if element is not None:
+                self._element_cache.move_to_end(locator)
+                return element
+        
+        # Lookups stay on the WebDriver protocol: execute_cdp_cmd is proxied by
+        # chromedriver over the same HTTP session, and a CDP object handle can't
+        # become a WebElement. Batch reads go through execute_script instead.
         timeout = timeout or config.explicit_wait
         try:
-            wait = WebDriverWait(self.driver, timeout)
+            wait = self._get_wait(timeout)
             element = wait.until(EC.presence_of_element_located(locator))
-            logger.debug(f"Element found: {locator}")
-            return element
+            logger.debug("Element found: {}", locator)
         except TimeoutException:
             logger.error(f"Element not found within {timeout}s: {locator}")
             raise
+        
+        self._element_cache[locator] = element
+        self._element_cache.move_to_end(locator)
+        if len(self._element_cache) > self.ELEMENT_CACHE_SIZE:
+            self._element_cache.popitem(last=False)
+        return element
+    
+    def invalidate_cache(self):
+        """
+        Forget all cached elements (call after navigation or DOM rebuilds)
+        
+        The cache is shared by every page object using this driver, so
+        this clears it for all of them.
+        """
+        self._element_cache.clear()
+    
+    def _with_element(self, locator: Tuple[str, str], action: Callable,
+                      timeout: int = None):
+        """
+        Run an action on a (possibly cached) element, re-locating it once if stale
+        
+        Args:
+            locator: Tuple of (By, value)
+            action: Callable receiving the WebElement
+            timeout: Optional timeout override
+            
+        Returns:
+            Any: Result of the action
+        """
+        element = self.find_element(locator, timeout, use_cache=True)
+        try:
+            return action(element)
+        except StaleElementReferenceException:
+            self._element_cache.pop(locator, None)
+            logger.debug("Cached element went stale, re-locating: {}", locator)
+            return action(self.find_element(locator, timeout))
     
     def find_elements(self, locator: Tuple[str, str], timeout: int = None) -> List[object]:
         """
@@ -79,75 +346,112 @@ class BasePage:
         """
         timeout = timeout or config.explicit_wait
         try:
-            wait = WebDriverWait(self.driver, timeout)
+            wait = self._get_wait(timeout)
             wait.until(EC.presence_of_element_located(locator))
             elements = self.driver.find_elements(*locator)
-            logger.debug(f"Found {len(elements)} elements: {locator}")
+            logger.debug("Found {} elements: {}", len(elements), locator)
             return elements
         except TimeoutException:
             logger.warning(f"No elements found within {timeout}s: {locator}")
             return []
     
-    def click_element(self, locator: Tuple[str, str], timeout: int = None):
+    def click_element(self, locator: Tuple[str, str], timeout: int = None,
+                      mutates_dom: bool = False):
         """
         Click element with retry mechanism and advanced error handling
         
         Args:
             locator: Tuple of (By, value)
             timeout: Optional timeout override
+            mutates_dom: Drop cached elements after the click (e.g. the click
+                re-renders part of the page without navigating)
         """
         timeout = timeout or config.explicit_wait
         max_retries = 3
         
         for attempt in range(max_retries):
+            element = None
             try:
-                wait = WebDriverWait(self.driver, timeout)
+                wait = self._get_wait(timeout)
                 element = wait.until(EC.element_to_be_clickable(locator))
                 
-                # Scroll element into view
-                self.driver.execute_script("arguments[0].scrollIntoView(true);", element)
-                time.sleep(0.5)  # Brief pause for scroll animation
+                # Scroll element into view (instant, so no animation to wait for)
+                self.driver.execute_script(self.SCROLL_INTO_VIEW_SCRIPT, element)
+                element = self._get_wait(timeout, self.SCROLL_POLL_FREQUENCY).until(
+                    EC.element_to_be_clickable(locator)
+                )
                 
                 element.click()
-                logger.debug(f"Element clicked successfully: {locator}")
+                if mutates_dom:
+                    self.invalidate_cache()
+                logger.debug("Element clicked successfully: {}", locator)
                 return
                 
             except ElementClickInterceptedException:
-                # Try JavaScript click as fallback
+                # Give transient overlays a moment to go away, then JavaScript click
                 logger.warning(f"Click intercepted, trying JavaScript click: {locator}")
-                element = self.find_element(locator, timeout)
+                self._wait_for_overlays_to_clear()
+                if element is None:
+                    element = self.find_element(locator, timeout)
                 self.driver.execute_script("arguments[0].click();", element)
+                if mutates_dom:
+                    self.invalidate_cache()
                 return
                 
-            except TimeoutException:
+            except (TimeoutException, StaleElementReferenceException):
                 if attempt == max_retries - 1:
                     logger.error(f"Element not clickable after {max_retries} attempts: {locator}")
                     raise
                 logger.warning(f"Click attempt {attempt + 1} failed, retrying: {locator}")
-                time.sleep(1)
+                # Full-jitter exponential backoff so parallel sessions don't retry in lockstep
+                time.sleep(random.uniform(
+                    0, min(self.RETRY_BACKOFF_CAP, self.RETRY_BACKOFF_BASE * (2 ** attempt))
+                ))
     
-    def enter_text(self, locator: Tuple[str, str], text: str, clear_first: bool = True):
+    def _wait_for_overlays_to_clear(self):
+        """Briefly wait for known overlay elements to disappear"""
+        for overlay in self.OVERLAY_LOCATORS:
+            try:
+                self._get_wait(self.OVERLAY_TIMEOUT, self.SCROLL_POLL_FREQUENCY).until(
+                    EC.invisibility_of_element_located(overlay)
+                )
+            except TimeoutException:
+                logger.debug("Overlay still visible: {}", overlay)
+    
+    def enter_text(self, locator: Tuple[str, str], text: str, clear_first: bool = True,
+                   validate: bool = False, use_keyboard: bool = False):
         """
-        Enter text into input field with validation
+        Enter text into input field with optional validation
+        
+        By default the value is set in one script call that fires input and
+        change events, instead of clear() plus send_keys().
         
         Args:
             locator: Tuple of (By, value)
             text: Text to enter
             clear_first: Whether to clear field before entering text
-        """
-        element = self.find_element(locator)
-        
-        if clear_first:
-            element.clear()
-        
-        element.send_keys(text)
+            validate: Read the field value back and warn if it differs
+                (costs one extra WebDriver round-trip when typing)
+            use_keyboard: Type with real key events, for tests exercising
+                keydown/keyup handlers or file inputs
+        """
+        def type_text(element):
+            if not use_keyboard:
+                value = self.driver.execute_script(self.SET_VALUE_SCRIPT, element, text, clear_first)
+                return value if validate else text
+            if clear_first:
+                element.clear()
+            element.send_keys(text)
+            if validate:
+                return self.driver.execute_script("return arguments[0].value;", element)
+            return text
         
         # Validate text was entered correctly
-        entered_text = element.get_attribute('value')
+        entered_text = self._with_element(locator, type_text)
         if entered_text != text:
             logger.warning(f"Text validation failed. Expected: '{text}', Got: '{entered_text}'")
         
-        logger.debug(f"Text entered: '{text}' into {locator}")
+        logger.debug("Text entered: '{}' into {}", text, locator)
     
     def get_element_text(self, locator: Tuple[str, str], timeout: int = None) -> str:
         """
@@ -160,9 +464,8 @@ class BasePage:
         Returns:
             str: Element text content
         """
-        element = self.find_element(locator, timeout)
-        text = element.text.strip()
-        logger.debug(f"Element text retrieved: '{text}' from {locator}")
+        text = self._with_element(locator, lambda element: element.text.strip(), timeout)
+        logger.debug("Element text retrieved: '{}' from {}", text, locator)
         return text
     
     def get_element_attribute(self, locator: Tuple[str, str], attribute: str, timeout: int = None) -> str:
@@ -177,9 +480,10 @@ class BasePage:
         Returns:
             str: Attribute value
         """
-        element = self.find_element(locator, timeout)
-        value = element.get_attribute(attribute)
-        logger.debug(f"Attribute '{attribute}' value: '{value}' from {locator}")
+        value = self._with_element(
+            locator, lambda element: element.get_attribute(attribute), timeout
+        )
+        logger.debug("Attribute '{}' value: '{}' from {}", attribute, value, locator)
         return value
     
     def select_dropdown_by_text(self, locator: Tuple[str, str], text: str):
@@ -190,10 +494,8 @@ class BasePage:
             locator: Tuple of (By, value)
             text: Visible text to select
         """
-        element = self.find_element(locator)
-        select = Select(element)
-        select.select_by_visible_text(text)
-        logger.debug(f"Dropdown option selected: '{text}' in {locator}")
+        self._with_element(locator, lambda element: Select(element).select_by_visible_text(text))
+        logger.debug("Dropdown option selected: '{}' in {}", text, locator)
     
     def select_dropdown_by_value(self, locator: Tuple[str, str], value: str):
         """
@@ -203,15 +505,66 @@ class BasePage:
             locator: Tuple of (By, value)
             value: Value to select
         """
-        element = self.find_element(locator)
-        select = Select(element)
-        select.select_by_value(value)
-        logger.debug(f"Dropdown value selected: '{value}' in {locator}")
+        self._with_element(locator, lambda element: Select(element).select_by_value(value))
+        logger.debug("Dropdown value selected: '{}' in {}", value, locator)
     
     # ====================
     # WAIT CONDITIONS
     # ====================
     
+    def _safe_text(self, locator: Tuple[str, str], timeout: float = 0.5) -> str:
+        """
+        Get text of an optional element, polling briefly for it to become visible
+        
+        Args:
+            locator: Tuple of (By, value)
+            timeout: Seconds to wait before giving up
+            
+        Returns:
+            str: Element text, or "" if it did not become visible in time
+        """
+        try:
+            wait = self._get_wait(timeout, self.OPTIONAL_POLL_FREQUENCY)
+            return wait.until(EC.visibility_of_element_located(locator)).text
+        except TimeoutException:
+            return ""
+    
+    def _js_batch_text(self, locators: Dict[str, Tuple[str, str]]) -> Dict[str, str]:
+        """
+        Get the visible text of several elements in a single script call
+        
+        Args:
+            locators: Names mapped to ID or CSS selector locators
+            
+        Returns:
+            dict: The same names mapped to element text ("" if missing or hidden)
+        """
+        return self.driver.execute_script(self.BATCH_TEXT_SCRIPT, dict(locators))
+    
+    def _js_any_text(self, locators) -> bool:
+        """
+        Check whether any of several elements has visible text in a single script call
+        
+        Args:
+            locators: Iterable of ID or CSS selector locators, checked in order
+            
+        Returns:
+            bool: True as soon as one element has non-empty text
+        """
+        return bool(self.driver.execute_script(self.ANY_TEXT_SCRIPT, [list(locator) for locator in locators]))
+    
+    def _js_text_all(self, css: str) -> List[str]:
+        """
+        Get the visible text of all elements matching a CSS selector in one call
+        
+        Args:
+            css: CSS selector
+            
+        Returns:
+            list: Text of each matching element in document order
+        """
+        return self.driver.execute_script(self.TEXT_ALL_SCRIPT, css)
+    
     def wait_for_element_visible(self, locator: Tuple[str, str], timeout: int = None) -> object:
         """
         Wait for element to be visible
@@ -224,9 +577,9 @@ class BasePage:
             WebElement: Visible element
         """
         timeout = timeout or config.explicit_wait
-        wait = WebDriverWait(self.driver, timeout)
+        wait = self._get_wait(timeout)
         element = wait.until(EC.visibility_of_element_located(locator))
-        logger.debug(f"Element visible: {locator}")
+        logger.debug("Element visible: {}", locator)
         return element
     
     def wait_for_element_clickable(self, locator: Tuple[str, str], timeout: int = None) -> object:
@@ -241,9 +594,9 @@ class BasePage:
             WebElement: Clickable element
         """
         timeout = timeout or config.explicit_wait
-        wait = WebDriverWait(self.driver, timeout)
+        wait = self._get_wait(timeout)
         element = wait.until(EC.element_to_be_clickable(locator))
-        logger.debug(f"Element clickable: {locator}")
+        logger.debug("Element clickable: {}", locator)
         return element
     
     def wait_for_text_in_element(self, locator: Tuple[str, str], text: str, timeout: int = None) -> bool:
@@ -259,9 +612,9 @@ class BasePage:
             bool: True if text found
         """
         timeout = timeout or config.explicit_wait
-        wait = WebDriverWait(self.driver, timeout)
+        wait = self._get_wait(timeout)
         result = wait.until(EC.text_to_be_present_in_element(locator, text))
-        logger.debug(f"Text '{text}' found in element: {locator}")
+        logger.debug("Text '{}' found in element: {}", text, locator)
         return result
     
     def wait_for_url_contains(self, url_fragment: str, timeout: int = None) -> bool:
@@ -276,15 +629,35 @@ class BasePage:
             bool: True if URL contains fragment
         """
         timeout = timeout or config.explicit_wait
-        wait = WebDriverWait(self.driver, timeout)
+        wait = self._get_wait(timeout)
         result = wait.until(EC.url_contains(url_fragment))
-        logger.debug(f"URL contains: '{url_fragment}'")
+        logger.debug("URL contains: '{}'", url_fragment)
         return result
     
     # ====================
     # UTILITY METHODS
     # ====================
     
+    def _probe_element(self, locator: Tuple[str, str], visible: bool = False) -> bool:
+        """
+        Check the DOM for an element right now, without polling
+        
+        Script execution is not subject to the driver's implicit wait,
+        so a miss costs a single round-trip.
+        
+        Args:
+            locator: Tuple of (By, value)
+            visible: Also require the element to be displayed
+            
+        Returns:
+            bool: True if found (and visible when requested)
+        """
+        try:
+            return bool(self.driver.execute_script(self.PROBE_ELEMENT_SCRIPT, *locator, visible))
+        except Exception as e:
+            logger.debug("Element probe failed for {}: {}", locator, e)
+            return False
+    
     def is_element_present(self, locator: Tuple[str, str], timeout: int = 5) -> bool:
         """
         Check if element is present without throwing exception
@@ -296,8 +669,10 @@ class BasePage:
         Returns:
             bool: True if element present
         """
+        if self._probe_element(locator):
+            return True
         try:
-            wait = WebDriverWait(self.driver, timeout)
+            wait = self._get_wait(timeout)
             wait.until(EC.presence_of_element_located(locator))
             return True
         except TimeoutException:
@@ -314,13 +689,35 @@ class BasePage:
         Returns:
             bool: True if element visible
         """
+        if self._probe_element(locator, visible=True):
+            return True
         try:
-            wait = WebDriverWait(self.driver, timeout)
+            wait = self._get_wait(timeout)
             wait.until(EC.visibility_of_element_located(locator))
             return True
         except TimeoutException:
             return False
     
+    def are_elements_visible(self, locators, timeout: int = 5) -> bool:
+        """
+        Check that several elements are visible, checking all of them in one
+        script call per poll instead of waiting for each in turn
+        
+        Args:
+            locators: Iterable of (By, value) tuples
+            timeout: Timeout for the check as a whole
+            
+        Returns:
+            bool: True once all elements are visible
+        """
+        pairs = [list(locator) for locator in locators]
+        try:
+            wait = self._get_wait(timeout)
+            wait.until(lambda driver: driver.execute_script(self.PROBE_ALL_VISIBLE_SCRIPT, pairs))
+            return True
+        except TimeoutException:
+            return False
+    
     def scroll_to_element(self, locator: Tuple[str, str]):
         """
         Scroll element into view
@@ -328,10 +725,11 @@ class BasePage:
         Args:
             locator: Tuple of (By, value)
         """
-        element = self.find_element(locator)
-        self.driver.execute_script("arguments[0].scrollIntoView(true);", element)
-        time.sleep(0.5)  # Brief pause for scroll animation
-        logger.debug(f"Scrolled to element: {locator}")
+        self._with_element(
+            locator,
+            lambda element: self.driver.execute_script(self.SCROLL_INTO_VIEW_SCRIPT, element)
+        )
+        logger.debug("Scrolled to element: {}", locator)
     
     def hover_over_element(self, locator: Tuple[str, str]):
         """
@@ -340,9 +738,8 @@ class BasePage:
         Args:
             locator: Tuple of (By, value)
         """
-        element = self.find_element(locator)
-        self.actions.move_to_element(element).perform()
-        logger.debug(f"Hovered over element: {locator}")
+        self._with_element(locator, lambda element: self.actions.move_to_element(element).perform())
+        logger.debug("Hovered over element: {}", locator)
     
     def switch_to_frame(self, locator: Tuple[str, str] = None, frame_index: int = None):
         """
@@ -358,7 +755,7 @@ class BasePage:
         elif frame_index is not None:
             self.driver.switch_to.frame(frame_index)
         
-        logger.debug(f"Switched to frame: {locator or frame_index}")
+        logger.debug("Switched to frame: {}", locator or frame_index)
     
     def switch_to_default_content(self):
         """Switch back to main content from iframe"""
@@ -368,28 +765,31 @@ class BasePage:
     def get_current_url(self) -> str:
         """Get current page URL"""
         url = self.driver.current_url
-        logger.debug(f"Current URL: {url}")
+        logger.debug("Current URL: {}", url)
         return url
     
     def get_page_title(self) -> str:
         """Get current page title"""
         title = self.driver.title
-        logger.debug(f"Page title: {title}")
+        logger.debug("Page title: {}", title)
         return title
     
     def refresh_page(self):
         """Refresh current page"""
         self.driver.refresh()
+        self.invalidate_cache()
         logger.debug("Page refreshed")
     
     def navigate_back(self):
         """Navigate back in browser history"""
         self.driver.back()
+        self.invalidate_cache()
         logger.debug("Navigated back")
     
     def navigate_forward(self):
         """Navigate forward in browser history"""
         self.driver.forward()
+        self.invalidate_cache()
         logger.debug("Navigated forward")
     
     def execute_javascript(self, script: str, *args):
@@ -404,7 +804,23 @@ class BasePage:
             Any: Script execution result
         """
         result = self.driver.execute_script(script, *args)
-        logger.debug(f"JavaScript executed: {script[:50]}...")
+        logger.debug("JavaScript executed: {}...", script[:50])
+        return result
+    
+    def execute_macro(self, macro_name: str, **params):
+        """
+        Run a multi-step flow from MACROS in the browser in one round-trip
+        
+        Args:
+            macro_name: Key of the macro in MACROS
+            **params: Values passed to the macro as arguments[0]
+            
+        Returns:
+            Any: Value the macro resolves to
+        """
+        script = _compile_macro(type(self), macro_name)
+        result = self.driver.execute_async_script(script, params)
+        logger.debug("Macro executed: {}", macro_name)
         return result
     
     def take_screenshot(self, filename: str = None) -> str:
@@ -417,13 +833,12 @@ class BasePage:
         Returns:
             str: Screenshot file path
         """
-        timestamp = time.strftime("%Y%m%d_%H%M%S")
-        filename = filename or f"screenshot_{timestamp}.png"
+        if not filename:
+            timestamp = time.strftime("%Y%m%d_%H%M%S")
+            filename = f"screenshot_{timestamp}_{next(_SCREENSHOT_COUNTER)}.png"
         
-        import os
-        os.makedirs(config.screenshots_dir, exist_ok=True)
-        filepath = os.path.join(config.screenshots_dir, filename)
+        filepath = os.path.join(_ensure_dir(config.screenshots_dir), filename)
         
-        self.driver.save_screenshot(filepath)
+        Path(filepath).write_bytes(self.driver.get_screenshot_as_png())
         logger.info(f"Screenshot saved: {filepath}")
         return filepath
\ No newline at end of file
@@ -4,8 +4,15 @@ Shopping cart functionality for OpenCart frontend
 Author: Lucas Maidana
 """
 
+from contextlib import contextmanager
+from types import MappingProxyType
+from typing import Callable, Iterator, List, Optional
 from selenium.webdriver.common.by import By
-from pages.base_page import BasePage
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import (
+    StaleElementReferenceException, TimeoutException, WebDriverException
+)
+from pages.base_page import BasePage, Locator
 from loguru import logger
 
 
@@ -16,56 +23,341 @@ class CartPage(BasePage):
     """
     
     # Page elements
-    PAGE_TITLE = (By.CSS_SELECTOR, "h1")
-    CART_TABLE = (By.CSS_SELECTOR, ".table.table-bordered")
+    PAGE_TITLE = Locator(By.CSS_SELECTOR, "h1")
+    CART_TABLE = Locator(By.CSS_SELECTOR, ".table.table-bordered")
     
     # Cart items
-    CART_ITEMS = (By.CSS_SELECTOR, ".table tbody tr")
-    ITEM_IMAGE = (By.CSS_SELECTOR, "td:nth-child(1) img")
-    ITEM_NAME = (By.CSS_SELECTOR, "td:nth-child(2) a")
-    ITEM_MODEL = (By.CSS_SELECTOR, "td:nth-child(3)")
-    ITEM_QUANTITY_INPUT = (By.CSS_SELECTOR, "td:nth-child(4) input[name^='quantity']")
-    ITEM_UNIT_PRICE = (By.CSS_SELECTOR, "td:nth-child(5)")
-    ITEM_TOTAL_PRICE = (By.CSS_SELECTOR, "td:nth-child(6)")
-    REMOVE_ITEM_BUTTON = (By.CSS_SELECTOR, "td:nth-child(7) button")
-    UPDATE_QUANTITY_BUTTON = (By.CSS_SELECTOR, "button[title='Update']")
+    CART_ITEMS = Locator(By.CSS_SELECTOR, ".table tbody tr")
+    ITEM_IMAGE = Locator(By.CSS_SELECTOR, "td:nth-child(1) img")
+    ITEM_NAME = Locator(By.CSS_SELECTOR, "td:nth-child(2) a")
+    ITEM_MODEL = Locator(By.CSS_SELECTOR, "td:nth-child(3)")
+    ITEM_QUANTITY_INPUT = Locator(By.CSS_SELECTOR, "td:nth-child(4) input[name^='quantity']")
+    ITEM_UNIT_PRICE = Locator(By.CSS_SELECTOR, "td:nth-child(5)")
+    ITEM_TOTAL_PRICE = Locator(By.CSS_SELECTOR, "td:nth-child(6)")
+    REMOVE_ITEM_BUTTON = Locator(By.CSS_SELECTOR, "td:nth-child(7) button")
+    UPDATE_QUANTITY_BUTTON = Locator(By.CSS_SELECTOR, "button[title='Update']")
+    
+    # Row element operations re-fetch the rows when they go stale after a re-render
+    ROW_OP_ATTEMPTS = 3
+    
+    # CSS selectors handed to the row scripts below
+    ROW_SELECTORS = MappingProxyType({
+        'row': CART_ITEMS.value,
+        'name': ITEM_NAME.value,
+        'model': ITEM_MODEL.value,
+        'quantity': ITEM_QUANTITY_INPUT.value,
+        'unit_price': ITEM_UNIT_PRICE.value,
+        'total_price': ITEM_TOTAL_PRICE.value,
+    })
     
     # Cart totals
-    CART_TOTALS_SECTION = (By.CSS_SELECTOR, ".col-sm-4.offset-sm-8")
-    SUBTOTAL = (By.CSS_SELECTOR, "tr:contains('Sub-Total') td:last-child")
-    SHIPPING_COST = (By.CSS_SELECTOR, "tr:contains('Shipping') td:last-child")
-    TAX_AMOUNT = (By.CSS_SELECTOR, "tr:contains('Tax') td:last-child")
-    TOTAL_AMOUNT = (By.CSS_SELECTOR, "tr:contains('Total') td:last-child")
+    CART_TOTALS_SECTION = Locator(By.CSS_SELECTOR, ".col-sm-4.offset-sm-8")
+    SUBTOTAL = Locator(By.XPATH, "//tr[td[1][contains(normalize-space(.), 'Sub-Total')]]/td[last()]")
+    SHIPPING_COST = Locator(By.XPATH, "//tr[td[1][contains(normalize-space(.), 'Shipping')]]/td[last()]")
+    TAX_AMOUNT = Locator(By.XPATH, "//tr[td[1][contains(normalize-space(.), 'Tax')]]/td[last()]")
+    TOTAL_AMOUNT = Locator(By.XPATH, "//tr[td[1][starts-with(normalize-space(.), 'Total')]]/td[last()]")
+    
+    # Instant empty check: no item rows or a visible empty-cart message
+    # (arguments: item row and empty message selectors)
+    IS_CART_EMPTY_SCRIPT = """
+        var empty = document.querySelector(arguments[1]);
+        return document.querySelectorAll(arguments[0]).length === 0
+            || !!(empty && empty.offsetParent !== null);
+    """
+    
+    # Every column of every cart row as plain values; defines cartRows(). Takes
+    # the ROW_SELECTORS mapping. Quantities are read from the value attribute
+    # when the document is not the live page (e.g. a parsed fetch response).
+    _CART_ROWS_JS = """
+        function cartRows(root, s) {
+            function text(row, selector) {
+                var cell = row.querySelector(selector);
+                return cell ? cell.textContent.trim() : '';
+            }
+            return Array.from(root.querySelectorAll(s.row)).map(function (row) {
+                var quantity = row.querySelector(s.quantity);
+                var value = quantity && (root === document ? quantity.value : quantity.getAttribute('value'));
+                return {
+                    name: text(row, s.name),
+                    model: text(row, s.model),
+                    quantity: parseInt(value, 10) || 0,
+                    unit_price: text(row, s.unit_price),
+                    total_price: text(row, s.total_price)
+                };
+            });
+        }
+    """
+    
+    # All cart rows in one call (argument: ROW_SELECTORS)
+    CART_ROWS_SCRIPT = _CART_ROWS_JS + "return cartRows(document, arguments[0]);"
+    
+    # Reads the four cart totals from label rows of a document (the live page
+    # by default); defines cartTotals() for the scripts below
+    _CART_TOTALS_JS = """
+        function cartTotals(root) {
+            var rows = Array.from((root || document).querySelectorAll('tr'));
+            function total(matches) {
+                for (var i = 0; i < rows.length; i++) {
+                    var cells = rows[i].querySelectorAll('td');
+                    if (cells.length && matches(cells[0].textContent.replace(/\\s+/g, ' ').trim())) {
+                        return cells[cells.length - 1].textContent.trim();
+                    }
+                }
+                return '0.00';
+            }
+            return {
+                subtotal: total(function (label) { return label.indexOf('Sub-Total') !== -1; }),
+                shipping: total(function (label) { return label.indexOf('Shipping') !== -1; }),
+                tax: total(function (label) { return label.indexOf('Tax') !== -1; }),
+                total: total(function (label) { return label.indexOf('Total') === 0; })
+            };
+        }
+    """
+    
+    # All four totals in one call
+    CART_TOTALS_SCRIPT = _CART_TOTALS_JS + "return cartTotals();"
+    
+    # Builds the get_cart_summary() dict from a document; defines cartSummary()
+    _CART_SUMMARY_JS = _CART_ROWS_JS + _CART_TOTALS_JS + """
+        function cartSummary(root, s, emptyVisible) {
+            var items = cartRows(root, s).map(function (row) {
+                return {name: row.name, quantity: row.quantity};
+            });
+            
+            var totals = cartTotals(root);
+            
+            return {
+                item_count: items.length,
+                items: items,
+                subtotal: totals.subtotal,
+                shipping: totals.shipping,
+                tax: totals.tax,
+                total: totals.total,
+                is_empty: emptyVisible || items.length === 0
+            };
+        }
+    """
+    
+    # Whole cart summary in one call, same shape as get_cart_summary() returns.
+    # Arguments: ROW_SELECTORS, the empty message selector and optionally the
+    # page title selector; with a title selector, returns null off the cart page.
+    CART_SUMMARY_SCRIPT = _CART_SUMMARY_JS + """
+        if (arguments[2]) {
+            var title = document.querySelector(arguments[2]);
+            if (!title || title.textContent.indexOf('Shopping Cart') === -1) { return null; }
+        }
+        var empty = document.querySelector(arguments[1]);
+        return cartSummary(document, arguments[0], !!(empty && empty.offsetParent !== null));
+    """
+    
+    # Cart summary without leaving the current page: fetches the cart page with
+    # the session cookies and parses it off-screen. Argument: ROW_SELECTORS,
+    # resolves to null if the request fails.
+    FETCH_CART_SUMMARY_SCRIPT = _CART_SUMMARY_JS + """
+        var done = arguments[arguments.length - 1], selectors = arguments[0];
+        fetch('index.php?route=checkout/cart', {credentials: 'same-origin'})
+            .then(function (response) {
+                if (!response.ok) { throw new Error(response.status); }
+                return response.text();
+            })
+            .then(function (html) {
+                var page = new DOMParser().parseFromString(html, 'text/html');
+                done(cartSummary(page, selectors, false));
+            })
+            .catch(function () { done(null); });
+    """
+    
+    # Totals render with the cart page, so a missing row means it doesn't exist
+    TOTALS_TIMEOUT = 2  # seconds
     
     # Action buttons
-    CONTINUE_SHOPPING_BUTTON = (By.LINK_TEXT, "Continue Shopping")
-    CHECKOUT_BUTTON = (By.LINK_TEXT, "Checkout")
+    CONTINUE_SHOPPING_BUTTON = Locator(By.CSS_SELECTOR, "#content a[href*='common/home']")
+    CHECKOUT_BUTTON = Locator(By.CSS_SELECTOR, "#content a[href*='checkout/checkout']")
     
     # Coupon section
-    COUPON_SECTION = (By.ID, "collapse-coupon")
-    COUPON_CODE_INPUT = (By.ID, "input-coupon")
-    APPLY_COUPON_BUTTON = (By.ID, "button-coupon")
-    COUPON_TOGGLE = (By.CSS_SELECTOR, "a[href='#collapse-coupon']")
+    COUPON_SECTION = Locator(By.ID, "collapse-coupon")
+    COUPON_CODE_INPUT = Locator(By.ID, "input-coupon")
+    APPLY_COUPON_BUTTON = Locator(By.ID, "button-coupon")
+    COUPON_TOGGLE = Locator(By.CSS_SELECTOR, "a[href='#collapse-coupon']")
     
     # Shipping estimate
-    SHIPPING_SECTION = (By.ID, "collapse-shipping")
-    SHIPPING_TOGGLE = (By.CSS_SELECTOR, "a[href='#collapse-shipping']")
-    COUNTRY_SELECT = (By.ID, "input-country")
-    REGION_SELECT = (By.ID, "input-zone")
-    POSTCODE_INPUT = (By.ID, "input-postcode")
-    GET_QUOTES_BUTTON = (By.ID, "button-quote")
+    SHIPPING_SECTION = Locator(By.ID, "collapse-shipping")
+    SHIPPING_TOGGLE = Locator(By.CSS_SELECTOR, "a[href='#collapse-shipping']")
+    COUNTRY_SELECT = Locator(By.ID, "input-country")
+    REGION_SELECT = Locator(By.ID, "input-zone")
+    POSTCODE_INPUT = Locator(By.ID, "input-postcode")
+    GET_QUOTES_BUTTON = Locator(By.ID, "button-quote")
+    SHIPPING_QUOTE_MODAL = Locator(By.ID, "modal-shipping")
+    
+    # Fills and submits the shipping estimate form; defines fillShippingEstimate().
+    # The zone list is reloaded via AJAX after the country changes, so the region
+    # is polled for. Takes the country, region, postcode and quote button ids and
+    # the country, region and postcode values; calls back with '' or an error.
+    _FILL_SHIPPING_JS = """
+        function fillShippingEstimate(ids, values, callback) {
+            var country = document.getElementById(ids[0]),
+                zone = document.getElementById(ids[1]),
+                postcode = document.getElementById(ids[2]),
+                button = document.getElementById(ids[3]);
+            var countryText = values[0], regionText = values[1], postcodeText = values[2];
+            
+            function select(element, text) {
+                var option = Array.from(element.options).find(function (o) {
+                    return o.text.trim() === text;
+                });
+                if (!option) { return false; }
+                element.value = option.value;
+                element.dispatchEvent(new Event('change', {bubbles: true}));
+                return true;
+            }
+            
+            function finish() {
+                if (postcodeText) {
+                    postcode.value = postcodeText;
+                    postcode.dispatchEvent(new Event('input', {bubbles: true}));
+                    postcode.dispatchEvent(new Event('change', {bubbles: true}));
+                }
+                button.click();
+                callback('');
+            }
+            
+            if (!country || !zone || !postcode || !button) { return callback('form not found'); }
+            if (!select(country, countryText)) { return callback('country not found'); }
+            if (!regionText) { return finish(); }
+            
+            var attempts = 0;
+            var timer = setInterval(function () {
+                if (select(zone, regionText)) {
+                    clearInterval(timer);
+                    finish();
+                } else if (++attempts >= 50) {
+                    clearInterval(timer);
+                    callback('region not found');
+                }
+            }, 100);
+        }
+    """
+    
+    # Fill and submit the shipping estimate form in one call.
+    # Arguments: country, region, postcode and quote button ids, then the
+    # country, region and postcode values. Resolves to '' or an error message.
+    ESTIMATE_SHIPPING_SCRIPT = _FILL_SHIPPING_JS + """
+        fillShippingEstimate(
+            Array.prototype.slice.call(arguments, 0, 4),
+            Array.prototype.slice.call(arguments, 4, 7),
+            arguments[arguments.length - 1]
+        );
+    """
     
     # Messages
-    SUCCESS_MESSAGE = (By.CSS_SELECTOR, ".alert.alert-success")
-    ERROR_MESSAGE = (By.CSS_SELECTOR, ".alert.alert-danger")
-    WARNING_MESSAGE = (By.CSS_SELECTOR, ".alert.alert-warning")
+    SUCCESS_MESSAGE = Locator(By.CSS_SELECTOR, ".alert.alert-success")
+    ERROR_MESSAGE = Locator(By.CSS_SELECTOR, ".alert.alert-danger")
+    WARNING_MESSAGE = Locator(By.CSS_SELECTOR, ".alert.alert-warning")
+    ALERT_SELECTORS = f"{SUCCESS_MESSAGE.value}, {ERROR_MESSAGE.value}, {WARNING_MESSAGE.value}"
     
     # Empty cart
-    EMPTY_CART_MESSAGE = (By.CSS_SELECTOR, ".text-center p")
+    EMPTY_CART_MESSAGE = Locator(By.CSS_SELECTOR, ".text-center p")
+    
+    # Bulk removal: read each row's cart.remove('<key>') and POST all keys at once.
+    # Resolves to the number of removed keys, or -1 if any request failed.
+    REMOVE_ALL_BUTTONS_CSS = f"{CART_ITEMS.value} {REMOVE_ITEM_BUTTON.value}"
+    REMOVE_ALL_ITEMS_SCRIPT = """
+        var done = arguments[arguments.length - 1];
+        var keys = Array.from(document.querySelectorAll(arguments[0]))
+            .map(function (button) {
+                var match = /cart\\.remove\\('([^']+)'\\)/.exec(button.getAttribute('onclick') || '');
+                return match && match[1];
+            })
+            .filter(Boolean);
+        Promise.all(keys.map(function (key) {
+            return fetch('index.php?route=checkout/cart/remove', {
+                method: 'POST',
+                credentials: 'same-origin',
+                headers: {'Content-Type': 'application/x-www-form-urlencoded'},
+                body: 'key=' + encodeURIComponent(key)
+            }).then(function (response) {
+                if (!response.ok) { throw new Error(response.status); }
+            });
+        })).then(function () { done(keys.length); }, function () { done(-1); });
+    """
+    
+    # Macro helpers: pageState() is taken before a form submit; afterResponse()
+    # then waits (up to ~5s) for a new alert, the shipping quote modal or a change
+    # in totals and resolves to the totals plus the alert text. Needs cartTotals().
+    _AFTER_RESPONSE_JS = """
+        var ALERTS = [$SUCCESS_MESSAGE, $ERROR_MESSAGE, $WARNING_MESSAGE].join(', ');
+        
+        function pageState() {
+            return {
+                totals: JSON.stringify(cartTotals()),
+                alerts: Array.from(document.querySelectorAll(ALERTS))
+            };
+        }
+        
+        function afterResponse(before, done) {
+            function shown(element) { return !!element && element.getClientRects().length > 0; }
+            var attempts = 0;
+            var timer = setInterval(function () {
+                var alert = Array.from(document.querySelectorAll(ALERTS)).find(function (element) {
+                    return before.alerts.indexOf(element) === -1 && shown(element);
+                });
+                var totals = cartTotals();
+                if (alert || shown(document.getElementById($SHIPPING_QUOTE_MODAL))
+                        || JSON.stringify(totals) !== before.totals || ++attempts >= 50) {
+                    clearInterval(timer);
+                    totals.message = alert ? alert.textContent.trim() : '';
+                    done(totals);
+                }
+            }, 100);
+        }
+    """
+    
+    # Whole "submit and read totals" flows for execute_macro(); resolve to the
+    # totals dict with a message, or to {error: ...} when the form is missing
+    MACROS = {
+        'apply_coupon_and_read_totals': _CART_TOTALS_JS + _AFTER_RESPONSE_JS + """
+            var done = arguments[arguments.length - 1], params = arguments[0];
+            var input = document.getElementById($COUPON_CODE_INPUT),
+                button = document.getElementById($APPLY_COUPON_BUTTON);
+            if (!input || !button) { return done({error: 'form not found'}); }
+            
+            var before = pageState();
+            input.value = params.coupon;
+            input.dispatchEvent(new Event('input', {bubbles: true}));
+            input.dispatchEvent(new Event('change', {bubbles: true}));
+            button.click();
+            afterResponse(before, done);
+        """,
+        'estimate_shipping_and_read_totals': _CART_TOTALS_JS + _AFTER_RESPONSE_JS + _FILL_SHIPPING_JS + """
+            var done = arguments[arguments.length - 1], params = arguments[0];
+            var before = pageState();
+            fillShippingEstimate(
+                [$COUNTRY_SELECT, $REGION_SELECT, $POSTCODE_INPUT, $GET_QUOTES_BUTTON],
+                [params.country, params.region, params.postcode],
+                function (error) {
+                    if (error) { return done({error: error}); }
+                    afterResponse(before, done);
+                }
+            );
+        """,
+    }
+    
+    # Text of the first alert on the page (argument: alert selectors)
+    ALERT_TEXT_SCRIPT = """
+        var alert = document.querySelector(arguments[0]);
+        return alert ? alert.textContent.trim() : '';
+    """
     
     def __init__(self, driver):
         """Initialize cart page"""
         super().__init__(driver)
+        self._snapshot: Optional[List[dict]] = None
+        self._snapshot_depth = 0
+    
+    def invalidate_cache(self):
+        """Forget cached elements and any cart row snapshot"""
+        super().invalidate_cache()
+        self._snapshot = None
     
     def navigate_to_cart(self, base_url: str):
         """
@@ -76,6 +368,9 @@ class CartPage(BasePage):
         """
         cart_url = f"{base_url}/index.php?route=checkout/cart"
         self.driver.get(cart_url)
+        self.invalidate_cache()
+        # With an 'eager' page load strategy get() returns at DOMContentLoaded
+        self.wait_for_element_visible(self.PAGE_TITLE)
         logger.info("Navigated to cart page")
         return self
     
@@ -130,65 +425,129 @@ class CartPage(BasePage):
             bool: True if cart is empty
         """
         try:
-            empty_message = self.is_element_visible(self.EMPTY_CART_MESSAGE, timeout=5)
-            item_count = self.get_cart_item_count()
-            is_empty = empty_message or item_count == 0
+            is_empty = bool(self.driver.execute_script(
+                self.IS_CART_EMPTY_SCRIPT, self.CART_ITEMS.value, self.EMPTY_CART_MESSAGE.value
+            ))
             logger.info(f"Cart empty: {is_empty}")
             return is_empty
         except:
             return True
     
-    def get_item_name(self, item_index: int = 0) -> str:
+    def snapshot(self) -> List[dict]:
+        """
+        Get every cart row as a plain dict in a single script call
+        
+        Inside snapshot_cached() the rows are fetched once and shared.
+        
+        Returns:
+            list: Rows with name, model, quantity, unit_price and total_price
+        """
+        if self._snapshot is not None:
+            return self._snapshot
+        
+        rows = self.driver.execute_script(self.CART_ROWS_SCRIPT, dict(self.ROW_SELECTORS))
+        if self._snapshot_depth:
+            self._snapshot = rows
+        return rows
+    
+    @contextmanager
+    def snapshot_cached(self) -> Iterator[List[dict]]:
+        """
+        Share one cart row snapshot across the accessors called in the block
+        
+        Cart mutations made through this page drop the snapshot, so the next
+        read inside the block fetches fresh rows.
+        """
+        self._snapshot_depth += 1
+        try:
+            yield self.snapshot()
+        finally:
+            self._snapshot_depth -= 1
+            if not self._snapshot_depth:
+                self._snapshot = None
+    
+    def _row_op(self, item_index: int, action: Callable, items: list = None):
+        """
+        Run an action on one cart row element, re-fetching the rows if they go stale
+        
+        Args:
+            item_index: Index of item (0-based)
+            action: Callable taking the row element
+            items: Cart item rows already fetched with get_cart_items()
+            
+        Returns:
+            Any: Result of the action
+        """
+        for attempt in range(self.ROW_OP_ATTEMPTS):
+            if items is None or attempt:
+                items = self.get_cart_items()
+            if item_index >= len(items):
+                raise IndexError(f"Item index {item_index} out of range")
+            try:
+                return action(items[item_index])
+            except StaleElementReferenceException:
+                if attempt == self.ROW_OP_ATTEMPTS - 1:
+                    raise
+                logger.debug("Cart row {} went stale, re-fetching rows", item_index)
+    
+    def get_item_name(self, item_index: int = 0, items: list = None) -> str:
         """
         Get name of cart item by index
         
         Args:
             item_index: Index of item (0-based)
+            items: Cart item rows already fetched with get_cart_items()
             
         Returns:
             str: Item name
         """
-        items = self.get_cart_items()
-        if item_index < len(items):
-            item_row = items[item_index]
-            name_element = item_row.find_element(*self.ITEM_NAME)
-            name = name_element.text
-            logger.info(f"Item {item_index} name: {name}")
-            return name
+        if items is None:
+            rows = self.snapshot()
+            if item_index >= len(rows):
+                raise IndexError(f"Item index {item_index} out of range")
+            name = rows[item_index]['name']
         else:
-            raise IndexError(f"Item index {item_index} out of range")
+            name = self._row_op(
+                item_index, lambda row: row.find_element(*self.ITEM_NAME).text, items
+            )
+        logger.info(f"Item {item_index} name: {name}")
+        return name
     
-    def get_item_quantity(self, item_index: int = 0) -> int:
+    def get_item_quantity(self, item_index: int = 0, items: list = None) -> int:
         """
         Get quantity of cart item by index
         
         Args:
             item_index: Index of item (0-based)
+            items: Cart item rows already fetched with get_cart_items()
             
         Returns:
             int: Item quantity
         """
-        items = self.get_cart_items()
-        if item_index < len(items):
-            item_row = items[item_index]
-            quantity_input = item_row.find_element(*self.ITEM_QUANTITY_INPUT)
-            quantity = int(quantity_input.get_attribute("value"))
-            logger.info(f"Item {item_index} quantity: {quantity}")
-            return quantity
+        if items is None:
+            rows = self.snapshot()
+            if item_index >= len(rows):
+                raise IndexError(f"Item index {item_index} out of range")
+            quantity = rows[item_index]['quantity']
         else:
-            raise IndexError(f"Item index {item_index} out of range")
+            quantity = self._row_op(
+                item_index,
+                lambda row: int(row.find_element(*self.ITEM_QUANTITY_INPUT).get_attribute("value")),
+                items
+            )
+        logger.info(f"Item {item_index} quantity: {quantity}")
+        return quantity
     
-    def update_item_quantity(self, item_index: int, new_quantity: int):
+    def update_item_quantity(self, item_index: int, new_quantity: int, items: list = None):
         """
         Update quantity of cart item
         
         Args:
             item_index: Index of item (0-based)
             new_quantity: New quantity value
+            items: Cart item rows already fetched with get_cart_items()
         """
-        items = self.get_cart_items()
-        if item_index < len(items):
-            item_row = items[item_index]
+        def update(item_row):
             quantity_input = item_row.find_element(*self.ITEM_QUANTITY_INPUT)
             quantity_input.clear()
             quantity_input.send_keys(str(new_quantity))
@@ -196,35 +555,54 @@ class CartPage(BasePage):
             # Click update button
             update_button = item_row.find_element(*self.UPDATE_QUANTITY_BUTTON)
             update_button.click()
-            
-            logger.info(f"Updated item {item_index} quantity to {new_quantity}")
-        else:
-            raise IndexError(f"Item index {item_index} out of range")
+        
+        self._row_op(item_index, update, items)
+        self.invalidate_cache()
+        logger.info(f"Updated item {item_index} quantity to {new_quantity}")
         return self
     
-    def remove_item(self, item_index: int = 0):
+    def remove_item(self, item_index: int = 0, items: list = None):
         """
         Remove item from cart by index
         
         Args:
             item_index: Index of item to remove (0-based)
+            items: Cart item rows already fetched with get_cart_items()
         """
-        items = self.get_cart_items()
-        if item_index < len(items):
-            item_row = items[item_index]
-            remove_button = item_row.find_element(*self.REMOVE_ITEM_BUTTON)
-            remove_button.click()
-            logger.info(f"Removed item {item_index} from cart")
-        else:
-            raise IndexError(f"Item index {item_index} out of range")
+        self._row_op(
+            item_index, lambda row: row.find_element(*self.REMOVE_ITEM_BUTTON).click(), items
+        )
+        self.invalidate_cache()
+        logger.info(f"Removed item {item_index} from cart")
         return self
     
     def remove_all_items(self):
-        """Remove all items from cart"""
-        while not self.is_cart_empty():
-            self.remove_item(0)
-            # Wait for page to update
-            self.wait_for_element_visible((By.CSS_SELECTOR, "body"), timeout=5)
+        """
+        Remove all items from cart
+        
+        Posts every removal in parallel from the browser session in a single
+        round-trip, then reloads once. Falls back to clicking each remove
+        button when the cart keys can't be read from the page.
+        """
+        removed = self.driver.execute_async_script(
+            self.REMOVE_ALL_ITEMS_SCRIPT, self.REMOVE_ALL_BUTTONS_CSS
+        )
+        
+        if removed > 0:
+            self.refresh_page()
+            self.wait_for_element_visible(self.EMPTY_CART_MESSAGE, timeout=5)
+        else:
+            if removed < 0:
+                logger.warning("Bulk cart removal failed, removing items one by one")
+            while not self.is_cart_empty():
+                items = self.get_cart_items()
+                self.remove_item(0, items)
+                # The cart table is re-rendered once the removal is processed
+                try:
+                    self._get_wait(5).until(EC.staleness_of(items[0]))
+                except TimeoutException:
+                    logger.warning("Cart did not re-render after removing an item")
+        
         logger.info("Removed all items from cart")
         return self
     
@@ -240,7 +618,7 @@ class CartPage(BasePage):
             str: Subtotal amount
         """
         try:
-            subtotal = self.get_element_text(self.SUBTOTAL)
+            subtotal = self.get_element_text(self.SUBTOTAL, self.TOTALS_TIMEOUT)
             logger.info(f"Cart subtotal: {subtotal}")
             return subtotal
         except:
@@ -254,7 +632,7 @@ class CartPage(BasePage):
             str: Total amount
         """
         try:
-            total = self.get_element_text(self.TOTAL_AMOUNT)
+            total = self.get_element_text(self.TOTAL_AMOUNT, self.TOTALS_TIMEOUT)
             logger.info(f"Cart total: {total}")
             return total
         except:
@@ -268,7 +646,7 @@ class CartPage(BasePage):
             str: Shipping cost
         """
         try:
-            shipping = self.get_element_text(self.SHIPPING_COST)
+            shipping = self.get_element_text(self.SHIPPING_COST, self.TOTALS_TIMEOUT)
             logger.info(f"Shipping cost: {shipping}")
             return shipping
         except:
@@ -282,12 +660,23 @@ class CartPage(BasePage):
             str: Tax amount
         """
         try:
-            tax = self.get_element_text(self.TAX_AMOUNT)
+            tax = self.get_element_text(self.TAX_AMOUNT, self.TOTALS_TIMEOUT)
             logger.info(f"Tax amount: {tax}")
             return tax
         except:
             return "0.00"
     
+    def get_cart_totals(self) -> dict:
+        """
+        Get subtotal, shipping, tax and total in a single script call
+        
+        Returns:
+            dict: Totals keyed by subtotal, shipping, tax and total
+        """
+        totals = self.driver.execute_script(self.CART_TOTALS_SCRIPT)
+        logger.info(f"Cart totals: {totals}")
+        return totals
+    
     # ====================
     # COUPON FUNCTIONALITY
     # ====================
@@ -312,6 +701,47 @@ class CartPage(BasePage):
         logger.info(f"Applied coupon code: {coupon_code}")
         return self
     
+    def apply_coupon_and_read_totals(self, coupon_code: str) -> dict:
+        """
+        Apply coupon code and read the resulting totals in one round-trip
+        
+        Falls back to apply_coupon() when the coupon form can't be found.
+        
+        Args:
+            coupon_code: Coupon code to apply
+            
+        Returns:
+            dict: Totals keyed by subtotal, shipping, tax and total, plus the alert message
+        """
+        return self._run_totals_macro(
+            'apply_coupon_and_read_totals',
+            lambda: self.apply_coupon(coupon_code),
+            coupon=coupon_code
+        )
+    
+    def _run_totals_macro(self, macro_name: str, stepwise: Callable, **params) -> dict:
+        """Run a totals macro, recovering via a page reload or the stepwise flow"""
+        try:
+            result = self.execute_macro(macro_name, **params)
+        except WebDriverException as e:
+            # The store reloaded the cart page before the macro could resolve
+            logger.debug("Macro {} interrupted ({}), reading totals after reload", macro_name, e.msg)
+            self.wait_for_element_visible(self.PAGE_TITLE)
+            result = None
+        else:
+            if result.get('error'):
+                logger.warning(f"Macro {macro_name} failed ({result['error']}), running step by step")
+                stepwise()
+                result = None
+        
+        self.invalidate_cache()
+        if result is None:
+            result = self.get_cart_totals()
+            result['message'] = self.driver.execute_script(self.ALERT_TEXT_SCRIPT, self.ALERT_SELECTORS)
+        
+        logger.info(f"{macro_name}: {result}")
+        return result
+    
     # ====================
     # SHIPPING ESTIMATION
     # ====================
@@ -327,11 +757,51 @@ class CartPage(BasePage):
         """
         Estimate shipping cost
         
+        Fills the form and requests quotes in a single async script call,
+        falling back to step-by-step interaction if the script reports an error.
+        
+        Args:
+            country: Country name
+            region: State/region name
+            postcode: Postal code
+        """
+        error = self.driver.execute_async_script(
+            self.ESTIMATE_SHIPPING_SCRIPT,
+            self.COUNTRY_SELECT.value, self.REGION_SELECT.value,
+            self.POSTCODE_INPUT.value, self.GET_QUOTES_BUTTON.value,
+            country, region, postcode
+        )
+        
+        if error:
+            logger.warning(f"Batched shipping estimate failed ({error}), filling form step by step")
+            self._estimate_shipping_stepwise(country, region, postcode)
+        
+        logger.info(f"Estimated shipping for: {country}, {region}, {postcode}")
+        return self
+    
+    def estimate_shipping_and_read_totals(self, country: str, region: str = "",
+                                          postcode: str = "") -> dict:
+        """
+        Estimate shipping and read the resulting totals in one round-trip
+        
+        Falls back to filling the form step by step when the script reports an error.
+        
         Args:
             country: Country name
             region: State/region name
             postcode: Postal code
+            
+        Returns:
+            dict: Totals keyed by subtotal, shipping, tax and total, plus the alert message
         """
+        return self._run_totals_macro(
+            'estimate_shipping_and_read_totals',
+            lambda: self._estimate_shipping_stepwise(country, region, postcode),
+            country=country, region=region, postcode=postcode
+        )
+    
+    def _estimate_shipping_stepwise(self, country: str, region: str = "", postcode: str = ""):
+        """Fill the shipping estimate form one WebDriver action at a time"""
         self.expand_shipping_section()
         
         # Select country
@@ -347,9 +817,6 @@ class CartPage(BasePage):
         
         # Get quotes
         self.click_element(self.GET_QUOTES_BUTTON)
-        
-        logger.info(f"Estimated shipping for: {country}, {region}, {postcode}")
-        return self
     
     # ====================
     # NAVIGATION
@@ -414,40 +881,63 @@ class CartPage(BasePage):
         Returns:
             bool: True if product is in cart
         """
-        items = self.get_cart_items()
-        for i in range(len(items)):
-            item_name = self.get_item_name(i)
-            if product_name.lower() in item_name.lower():
+        wanted = product_name.lower()
+        for row in self.snapshot():
+            if wanted in row['name'].lower():
                 logger.info(f"Product '{product_name}' found in cart")
                 return True
         
         logger.info(f"Product '{product_name}' not found in cart")
         return False
     
+    def fetch_cart_summary(self) -> Optional[dict]:
+        """
+        Get cart summary without navigating to the cart page
+        
+        Fetches the cart page in the background using the browser session,
+        so cart state can be read from any store page.
+        
+        Returns:
+            dict: Cart summary with items and totals, or None if the fetch failed
+        """
+        return self.driver.execute_async_script(
+            self.FETCH_CART_SUMMARY_SCRIPT, dict(self.ROW_SELECTORS)
+        )
+    
     def get_cart_summary(self) -> dict:
         """
         Get complete cart summary
         
+        Harvested from the DOM in a single script call instead of one
+        WebDriver round-trip per item and total. When the browser is not on
+        the cart page the summary is fetched in the background instead.
+        
         Returns:
             dict: Cart summary with items and totals
         """
-        summary = {
-            'item_count': self.get_cart_item_count(),
-            'items': [],
-            'subtotal': self.get_subtotal(),
-            'shipping': self.get_shipping_cost(),
-            'tax': self.get_tax_amount(),
-            'total': self.get_total_amount(),
-            'is_empty': self.is_cart_empty()
-        }
+        if self._snapshot is not None:
+            rows = self._snapshot
+            summary = dict(
+                self.get_cart_totals(),
+                item_count=len(rows),
+                items=[{'name': row['name'], 'quantity': row['quantity']} for row in rows],
+                is_empty=not rows
+            )
+            logger.info(f"Cart summary: {summary}")
+            return summary
         
-        # Get item details
-        for i in range(summary['item_count']):
-            item = {
-                'name': self.get_item_name(i),
-                'quantity': self.get_item_quantity(i)
-            }
-            summary['items'].append(item)
+        # The cart page check rides along with the summary script
+        selectors = dict(self.ROW_SELECTORS)
+        summary = self.driver.execute_script(
+            self.CART_SUMMARY_SCRIPT, selectors, self.EMPTY_CART_MESSAGE.value, self.PAGE_TITLE.value
+        )
+        if summary is None:
+            summary = self.fetch_cart_summary()
+        
+        if summary is None:
+            summary = self.driver.execute_script(
+                self.CART_SUMMARY_SCRIPT, selectors, self.EMPTY_CART_MESSAGE.value, None
+            )
         
         logger.info(f"Cart summary: {summary}")
         return summary
\ No newline at end of file
@@ -4,10 +4,17 @@ Frontend home page interactions for OpenCart
 Author: Lucas Maidana
 """
 
+from types import MappingProxyType
+from typing import Optional
+from urllib.parse import urlsplit
 from selenium.webdriver.common.by import By
-from pages.base_page import BasePage
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import NoSuchElementException, TimeoutException, WebDriverException
+from pages.base_page import BasePage, Locator
 from loguru import logger
 
+from config.settings import config
+
 
 class HomePage(BasePage):
     """
@@ -16,60 +23,130 @@ class HomePage(BasePage):
     """
     
     # Page locators
-    LOGO = (By.CSS_SELECTOR, "#logo a")
-    SEARCH_INPUT = (By.NAME, "search")
-    SEARCH_BUTTON = (By.CSS_SELECTOR, ".btn.btn-light.btn-lg")
-    CART_BUTTON = (By.ID, "header-cart")
-    CART_TOTAL = (By.CSS_SELECTOR, "#header-cart .btn")
-    ACCOUNT_DROPDOWN = (By.CSS_SELECTOR, ".nav-item.dropdown")
-    LOGIN_LINK = (By.LINK_TEXT, "Login")
-    REGISTER_LINK = (By.LINK_TEXT, "Register")
-    LOGOUT_LINK = (By.LINK_TEXT, "Logout")
-    MY_ACCOUNT_LINK = (By.LINK_TEXT, "My Account")
-    WISHLIST_LINK = (By.ID, "wishlist-total")
-    
-    # Navigation menu
-    MENU_NAVBAR = (By.CSS_SELECTOR, ".navbar-nav")
-    DESKTOPS_MENU = (By.LINK_TEXT, "Desktops")
-    LAPTOPS_MENU = (By.LINK_TEXT, "Laptops & Notebooks")
-    COMPONENTS_MENU = (By.LINK_TEXT, "Components")
-    TABLETS_MENU = (By.LINK_TEXT, "Tablets")
-    SOFTWARE_MENU = (By.LINK_TEXT, "Software")
-    PHONES_MENU = (By.LINK_TEXT, "Phones & PDAs")
-    CAMERAS_MENU = (By.LINK_TEXT, "Cameras")
+    LOGO = Locator(By.CSS_SELECTOR, "#logo a")
+    SEARCH_INPUT = Locator(By.NAME, "search")
+    SEARCH_BUTTON = Locator(By.CSS_SELECTOR, ".btn.btn-light.btn-lg")
+    CART_BUTTON = Locator(By.ID, "header-cart")
+    CART_TOTAL = Locator(By.CSS_SELECTOR, "#header-cart .btn")
+    ACCOUNT_DROPDOWN = Locator(By.CSS_SELECTOR, ".nav-item.dropdown")
+    LOGIN_LINK = Locator(By.CSS_SELECTOR, ".dropdown-menu a[href*='account/login']")
+    REGISTER_LINK = Locator(By.CSS_SELECTOR, ".dropdown-menu a[href*='account/register']")
+    LOGOUT_LINK = Locator(By.CSS_SELECTOR, ".dropdown-menu a[href*='account/logout']")
+    LOGIN_STATE_TIMEOUT = 5  # seconds, login and logout end in a page load
+    MY_ACCOUNT_LINK = Locator(By.CSS_SELECTOR, ".dropdown-menu a[href*='account/account']")
+    WISHLIST_LINK = Locator(By.ID, "wishlist-total")
+    
+    # Navigation menu (top-level category links end in their category path id)
+    MENU_NAVBAR = Locator(By.CSS_SELECTOR, ".navbar-nav")
+    DESKTOPS_MENU = Locator(By.CSS_SELECTOR, "#menu a[href$='path=20']")
+    LAPTOPS_MENU = Locator(By.CSS_SELECTOR, "#menu a[href$='path=18']")
+    COMPONENTS_MENU = Locator(By.CSS_SELECTOR, "#menu a[href$='path=25']")
+    TABLETS_MENU = Locator(By.CSS_SELECTOR, "#menu a[href$='path=57']")
+    SOFTWARE_MENU = Locator(By.CSS_SELECTOR, "#menu a[href$='path=17']")
+    PHONES_MENU = Locator(By.CSS_SELECTOR, "#menu a[href$='path=24']")
+    CAMERAS_MENU = Locator(By.CSS_SELECTOR, "#menu a[href$='path=33']")
+    
+    # Direct routes for menu and account navigation (OpenCart default category ids)
+    CATEGORY_URLS = MappingProxyType({
+        'desktops': 'index.php?route=product/category&path=20',
+        'laptops': 'index.php?route=product/category&path=18',
+        'components': 'index.php?route=product/category&path=25',
+        'tablets': 'index.php?route=product/category&path=57',
+        'software': 'index.php?route=product/category&path=17',
+        'phones': 'index.php?route=product/category&path=24',
+        'cameras': 'index.php?route=product/category&path=33',
+    })
+    ACCOUNT_URLS = MappingProxyType({
+        'login': 'index.php?route=account/login',
+        'register': 'index.php?route=account/register',
+        'account': 'index.php?route=account/account',
+    })
     
     # Featured products
-    FEATURED_PRODUCTS = (By.CSS_SELECTOR, ".product-thumb")
-    PRODUCT_TITLES = (By.CSS_SELECTOR, ".product-thumb h4 a")
-    PRODUCT_PRICES = (By.CSS_SELECTOR, ".product-thumb .price")
-    ADD_TO_CART_BUTTONS = (By.CSS_SELECTOR, ".product-thumb button[onclick*='cart.add']")
-    ADD_TO_WISHLIST_BUTTONS = (By.CSS_SELECTOR, ".product-thumb button[onclick*='wishlist.add']")
-    COMPARE_BUTTONS = (By.CSS_SELECTOR, ".product-thumb button[onclick*='compare.add']")
+    FEATURED_PRODUCTS = Locator(By.CSS_SELECTOR, ".product-thumb")
+    PRODUCT_TITLES = Locator(By.CSS_SELECTOR, ".product-thumb h4 a")
+    PRODUCT_PRICES = Locator(By.CSS_SELECTOR, ".product-thumb .price")
+    ADD_TO_CART_BUTTONS = Locator(By.CSS_SELECTOR, ".product-thumb button[onclick*='cart.add']")
+    ADD_TO_WISHLIST_BUTTONS = Locator(By.CSS_SELECTOR, ".product-thumb button[onclick*='wishlist.add']")
+    COMPARE_BUTTONS = Locator(By.CSS_SELECTOR, ".product-thumb button[onclick*='compare.add']")
+    
+    # Single featured product by position; each .product-thumb sits in its own
+    # column wrapper, so CSS :nth-of-type can't index them but XPath can
+    PRODUCT_THUMB_XPATH = "(//div[contains(concat(' ', normalize-space(@class), ' '), ' product-thumb ')])[{position}]"
+    PRODUCT_ADD_TO_CART_XPATH = "//button[contains(@onclick, 'cart.add')]"
+    PRODUCT_ADD_TO_WISHLIST_XPATH = "//button[contains(@onclick, 'wishlist.add')]"
+    PRODUCT_TITLE_XPATH = "//h4/a"
     
     # Footer links
-    FOOTER = (By.TAG_NAME, "footer")
-    ABOUT_US_LINK = (By.LINK_TEXT, "About Us")
-    CONTACT_US_LINK = (By.LINK_TEXT, "Contact Us")
-    RETURNS_LINK = (By.LINK_TEXT, "Returns")
-    SITE_MAP_LINK = (By.LINK_TEXT, "Site Map")
+    FOOTER = Locator(By.TAG_NAME, "footer")
+    ABOUT_US_LINK = Locator(By.CSS_SELECTOR, "footer a[href*='information_id=4']")
+    CONTACT_US_LINK = Locator(By.CSS_SELECTOR, "footer a[href*='information/contact']")
+    RETURNS_LINK = Locator(By.CSS_SELECTOR, "footer a[href*='account/return']")
+    SITE_MAP_LINK = Locator(By.CSS_SELECTOR, "footer a[href*='information/sitemap']")
     
     # Alert messages
-    SUCCESS_ALERT = (By.CSS_SELECTOR, ".alert.alert-success")
-    ERROR_ALERT = (By.CSS_SELECTOR, ".alert.alert-danger")
-    WARNING_ALERT = (By.CSS_SELECTOR, ".alert.alert-warning")
-    INFO_ALERT = (By.CSS_SELECTOR, ".alert.alert-info")
+    SUCCESS_ALERT = Locator(By.CSS_SELECTOR, ".alert.alert-success")
+    ERROR_ALERT = Locator(By.CSS_SELECTOR, ".alert.alert-danger")
+    WARNING_ALERT = Locator(By.CSS_SELECTOR, ".alert.alert-warning")
+    INFO_ALERT = Locator(By.CSS_SELECTOR, ".alert.alert-info")
+    MESSAGE_TIMEOUT = 0.5  # seconds, alerts may arrive via AJAX
+    
+    # First number in the header cart label, e.g. "2 item(s) - $202.00"
+    # (argument: cart button selector); null if the button or number is missing
+    CART_COUNT_SCRIPT = """
+        var button = document.querySelector(arguments[0]);
+        var match = button && button.textContent.match(/\\d+/);
+        return match ? parseInt(match[0], 10) : null;
+    """
+    
+    # Click a link without opening its (visually hidden) dropdown
+    # (argument: link selector); false if the link isn't in the page
+    CLICK_LINK_SCRIPT = """
+        var link = document.querySelector(arguments[0]);
+        if (!link) { return false; }
+        link.click();
+        return true;
+    """
     
-    def __init__(self, driver):
-        """Initialize home page"""
+    def __init__(self, driver, base_url: Optional[str] = None):
+        """
+        Initialize home page
+        
+        Args:
+            driver: WebDriver instance
+            base_url: Store URL; defaults to BASE_URL, then to the current page's origin
+        """
         super().__init__(driver)
-        self.url = f"{self.driver.current_url.split('/')[0]}//{self.driver.current_url.split('/')[2]}"
+        self._url = base_url or config.env['BASE_URL']
+    
+    @property
+    def url(self) -> str:
+        """Home page URL, derived from the browser only when none was configured"""
+        if self._url is None:
+            parts = urlsplit(self.driver.current_url)
+            self._url = f"{parts.scheme}://{parts.netloc}"
+        return self._url
     
     def navigate_to_home(self):
         """Navigate to home page"""
         self.driver.get(self.url)
+        self.invalidate_cache()
+        # With an 'eager' page load strategy get() returns at DOMContentLoaded
+        self.wait_for_element_visible(self.LOGO)
         logger.info("Navigated to home page")
         return self
     
+    def open_path(self, path: str):
+        """
+        Navigate directly to a store page
+        
+        Args:
+            path: Path relative to the home URL, e.g. a CATEGORY_URLS value
+        """
+        self.driver.get(f"{self.url}/{path}")
+        self.invalidate_cache()
+        return self
+    
     def click_logo(self):
         """Click on site logo to return to home"""
         self.click_element(self.LOGO)
@@ -89,13 +166,34 @@ class HomePage(BasePage):
         """
         self.enter_text(self.SEARCH_INPUT, search_term)
         self.click_element(self.SEARCH_BUTTON)
-        logger.info(f"Searched for product: '{search_term}'")
+        logger.info("Searched for product: '{}'", search_term)
         return self
     
     def get_search_input_value(self) -> str:
-        """Get current value in search input"""
+        """
+        Get current value in search input
+        
+        Samples the value once; use wait_for_search_value() to wait for it to settle.
+        """
         return self.get_element_attribute(self.SEARCH_INPUT, "value")
     
+    def wait_for_search_value(self, expected: str, timeout: int = 5) -> bool:
+        """
+        Wait for the search input value to contain the expected text
+        
+        Args:
+            expected: Text expected in the input value
+            timeout: Timeout in seconds
+            
+        Returns:
+            bool: True once the value matches
+            
+        Raises:
+            TimeoutException: If the value doesn't match within timeout
+        """
+        wait = self._get_wait(timeout, self.OPTIONAL_POLL_FREQUENCY)
+        return wait.until(EC.text_to_be_present_in_element_value(self.SEARCH_INPUT, expected))
+    
     # ====================
     # ACCOUNT NAVIGATION
     # ====================
@@ -108,6 +206,12 @@ class HomePage(BasePage):
     
     def click_login(self):
         """Navigate to login page"""
+        self.open_path(self.ACCOUNT_URLS['login'])
+        logger.info("Navigated to login page")
+        return self
+    
+    def click_login_via_ui(self):
+        """Navigate to login page through the account dropdown"""
         self.open_account_dropdown()
         self.click_element(self.LOGIN_LINK)
         logger.info("Navigated to login page")
@@ -115,6 +219,12 @@ class HomePage(BasePage):
     
     def click_register(self):
         """Navigate to registration page"""
+        self.open_path(self.ACCOUNT_URLS['register'])
+        logger.info("Navigated to registration page")
+        return self
+    
+    def click_register_via_ui(self):
+        """Navigate to registration page through the account dropdown"""
         self.open_account_dropdown()
         self.click_element(self.REGISTER_LINK)
         logger.info("Navigated to registration page")
@@ -122,13 +232,28 @@ class HomePage(BasePage):
     
     def click_logout(self):
         """Logout from account"""
+        if not self.driver.execute_script(self.CLICK_LINK_SCRIPT, self.LOGOUT_LINK.value):
+            return self.click_logout_via_ui()
+        self.invalidate_cache()
+        logger.info("Logged out from account")
+        return self
+    
+    def click_logout_via_ui(self):
+        """Logout from account through the account dropdown"""
         self.open_account_dropdown()
         self.click_element(self.LOGOUT_LINK)
+        self.invalidate_cache()
         logger.info("Logged out from account")
         return self
     
     def click_my_account(self):
         """Navigate to my account page"""
+        self.open_path(self.ACCOUNT_URLS['account'])
+        logger.info("Navigated to my account page")
+        return self
+    
+    def click_my_account_via_ui(self):
+        """Navigate to my account page through the account dropdown"""
         self.open_account_dropdown()
         self.click_element(self.MY_ACCOUNT_LINK)
         logger.info("Navigated to my account page")
@@ -138,14 +263,40 @@ class HomePage(BasePage):
         """
         Check if user is currently logged in
         
+        The logout link is rendered inside the closed dropdown for logged-in
+        customers, so its presence is checked without opening the menu.
+        
         Returns:
             bool: True if user is logged in
         """
-        self.open_account_dropdown()
-        is_logged_in = self.is_element_visible(self.LOGOUT_LINK, timeout=2)
-        logger.info(f"User logged in status: {is_logged_in}")
+        is_logged_in = self._probe_element(self.LOGOUT_LINK)
+        logger.info("User logged in status: {}", is_logged_in)
         return is_logged_in
     
+    def wait_for_login_state(self, logged_in: bool, timeout: float = None) -> bool:
+        """
+        Wait for the header to show the customer as logged in or out
+        
+        Each poll is a single script probe for the logout link.
+        
+        Args:
+            logged_in: Expected login state
+            timeout: Optional timeout override
+            
+        Returns:
+            bool: True if the expected state was reached in time
+        """
+        timeout = timeout or self.LOGIN_STATE_TIMEOUT
+        try:
+            self._get_wait(timeout).until(
+                lambda driver: self._probe_element(self.LOGOUT_LINK) == logged_in
+            )
+        except TimeoutException:
+            logger.warning("User still {} after {}s", "logged out" if logged_in else "logged in", timeout)
+            return False
+        logger.info("User logged in status: {}", logged_in)
+        return True
+    
     # ====================
     # CART FUNCTIONALITY
     # ====================
@@ -164,7 +315,7 @@ class HomePage(BasePage):
             str: Cart total text
         """
         total_text = self.get_element_text(self.CART_TOTAL)
-        logger.info(f"Cart total: {total_text}")
+        logger.info("Cart total: {}", total_text)
         return total_text
     
     def get_cart_item_count(self) -> int:
@@ -174,15 +325,37 @@ class HomePage(BasePage):
         Returns:
             int: Number of items in cart
         """
-        total_text = self.get_cart_total()
-        # Extract number from text like "2 item(s) - $202.00"
-        try:
-            count = int(total_text.split()[0])
-            logger.info(f"Cart item count: {count}")
-            return count
-        except (ValueError, IndexError):
-            logger.warning(f"Could not parse cart count from: {total_text}")
+        count = self.driver.execute_script(self.CART_COUNT_SCRIPT, self.CART_TOTAL.value)
+        if count is None:
+            logger.warning("Could not read cart count from the header cart button")
             return 0
+        logger.info("Cart item count: {}", count)
+        return count
+    
+    def wait_for_cart_count(self, expected: int, timeout: int = 5) -> bool:
+        """
+        Wait for the header cart to show an item count
+        
+        Reads the header button once per poll, instead of a test
+        calling get_cart_item_count() in a loop.
+        
+        Args:
+            expected: Expected number of items
+            timeout: Timeout in seconds
+            
+        Returns:
+            bool: True once the count matches
+            
+        Raises:
+            TimeoutException: If the count doesn't match within timeout
+        """
+        def count_matches(driver):
+            return driver.execute_script(self.CART_COUNT_SCRIPT, self.CART_TOTAL.value) == expected
+        
+        wait = self._get_wait(timeout, self.OPTIONAL_POLL_FREQUENCY)
+        result = wait.until(count_matches)
+        logger.info("Cart item count reached: {}", expected)
+        return result
     
     # ====================
     # PRODUCT INTERACTIONS
@@ -196,7 +369,7 @@ class HomePage(BasePage):
             list: List of product elements
         """
         products = self.find_elements(self.FEATURED_PRODUCTS)
-        logger.info(f"Found {len(products)} featured products")
+        logger.info("Found {} featured products", len(products))
         return products
     
     def get_product_titles(self) -> list:
@@ -206,11 +379,44 @@ class HomePage(BasePage):
         Returns:
             list: List of product titles
         """
-        title_elements = self.find_elements(self.PRODUCT_TITLES)
-        titles = [element.text for element in title_elements]
-        logger.info(f"Product titles: {titles}")
+        titles = self._js_text_all(self.PRODUCT_TITLES.value)
+        logger.info("Product titles: {}", titles)
         return titles
     
+    def get_product_prices(self) -> list:
+        """
+        Get prices of all featured products
+        
+        Returns:
+            list: List of product price texts
+        """
+        prices = self._js_text_all(self.PRODUCT_PRICES.value)
+        logger.info("Product prices: {}", prices)
+        return prices
+    
+    def _featured_product_child(self, product_index: int, child_xpath: str):
+        """
+        Locate one element inside the featured product at product_index
+        
+        Args:
+            product_index: Index of product (0-based, negative counts from the end)
+            child_xpath: XPath of the element relative to the product
+            
+        Returns:
+            WebElement: Found element
+            
+        Raises:
+            IndexError: If there is no such product
+        """
+        position = f"last(){product_index + 1:+d}" if product_index < 0 else product_index + 1
+        xpath = self.PRODUCT_THUMB_XPATH.format(position=position) + child_xpath
+        # Wait for the product grid once, then fetch only the target element
+        self.find_element(self.FEATURED_PRODUCTS, use_cache=True)
+        try:
+            return self.driver.find_element(By.XPATH, xpath)
+        except NoSuchElementException:
+            raise IndexError(f"Product index {product_index} out of range") from None
+    
     def add_featured_product_to_cart(self, product_index: int = 0):
         """
         Add featured product to cart by index
@@ -218,12 +424,8 @@ class HomePage(BasePage):
         Args:
             product_index: Index of product to add (0-based)
         """
-        add_to_cart_buttons = self.find_elements(self.ADD_TO_CART_BUTTONS)
-        if product_index < len(add_to_cart_buttons):
-            add_to_cart_buttons[product_index].click()
-            logger.info(f"Added featured product {product_index} to cart")
-        else:
-            raise IndexError(f"Product index {product_index} out of range")
+        self._featured_product_child(product_index, self.PRODUCT_ADD_TO_CART_XPATH).click()
+        logger.info("Added featured product {} to cart", product_index)
         return self
     
     def add_featured_product_to_wishlist(self, product_index: int = 0):
@@ -233,12 +435,8 @@ class HomePage(BasePage):
         Args:
             product_index: Index of product to add (0-based)
         """
-        wishlist_buttons = self.find_elements(self.ADD_TO_WISHLIST_BUTTONS)
-        if product_index < len(wishlist_buttons):
-            wishlist_buttons[product_index].click()
-            logger.info(f"Added featured product {product_index} to wishlist")
-        else:
-            raise IndexError(f"Product index {product_index} out of range")
+        self._featured_product_child(product_index, self.PRODUCT_ADD_TO_WISHLIST_XPATH).click()
+        logger.info("Added featured product {} to wishlist", product_index)
         return self
     
     def click_product_title(self, product_index: int = 0):
@@ -248,12 +446,9 @@ class HomePage(BasePage):
         Args:
             product_index: Index of product to click (0-based)
         """
-        product_titles = self.find_elements(self.PRODUCT_TITLES)
-        if product_index < len(product_titles):
-            product_titles[product_index].click()
-            logger.info(f"Clicked on product title {product_index}")
-        else:
-            raise IndexError(f"Product index {product_index} out of range")
+        self._featured_product_child(product_index, self.PRODUCT_TITLE_XPATH).click()
+        self.invalidate_cache()
+        logger.info("Clicked on product title {}", product_index)
         return self
     
     # ====================
@@ -268,16 +463,28 @@ class HomePage(BasePage):
             menu_locator: Locator for menu item
         """
         self.hover_over_element(menu_locator)
-        logger.info(f"Hovered over menu item: {menu_locator}")
+        logger.info("Hovered over menu item: {}", menu_locator)
         return self
     
     def click_desktops_menu(self):
+        """Open the Desktops category"""
+        self.open_path(self.CATEGORY_URLS['desktops'])
+        logger.info("Opened Desktops category")
+        return self
+    
+    def click_desktops_menu_via_ui(self):
         """Click on Desktops menu"""
         self.click_element(self.DESKTOPS_MENU)
         logger.info("Clicked Desktops menu")
         return self
     
     def click_laptops_menu(self):
+        """Open the Laptops & Notebooks category"""
+        self.open_path(self.CATEGORY_URLS['laptops'])
+        logger.info("Opened Laptops category")
+        return self
+    
+    def click_laptops_menu_via_ui(self):
         """Click on Laptops menu"""
         self.click_element(self.LAPTOPS_MENU)
         logger.info("Clicked Laptops menu")
@@ -294,12 +501,10 @@ class HomePage(BasePage):
         Returns:
             str: Success message text
         """
-        try:
-            message = self.get_element_text(self.SUCCESS_ALERT)
-            logger.info(f"Success message: {message}")
-            return message
-        except:
-            return ""
+        message = self._safe_text(self.SUCCESS_ALERT, self.MESSAGE_TIMEOUT)
+        if message:
+            logger.info("Success message: {}", message)
+        return message
     
     def get_error_message(self) -> str:
         """
@@ -308,12 +513,10 @@ class HomePage(BasePage):
         Returns:
             str: Error message text
         """
-        try:
-            message = self.get_element_text(self.ERROR_ALERT)
-            logger.info(f"Error message: {message}")
-            return message
-        except:
-            return ""
+        message = self._safe_text(self.ERROR_ALERT, self.MESSAGE_TIMEOUT)
+        if message:
+            logger.info("Error message: {}", message)
+        return message
     
     def is_success_message_displayed(self) -> bool:
         """Check if success message is displayed"""
@@ -336,13 +539,11 @@ class HomePage(BasePage):
         """
         try:
             # Check for key elements that should be present on home page
-            logo_present = self.is_element_visible(self.LOGO, timeout=10)
-            search_present = self.is_element_visible(self.SEARCH_INPUT, timeout=5)
-            cart_present = self.is_element_visible(self.CART_BUTTON, timeout=5)
-            
-            is_loaded = logo_present and search_present and cart_present
-            logger.info(f"Home page loaded status: {is_loaded}")
+            is_loaded = self.are_elements_visible(
+                (self.LOGO, self.SEARCH_INPUT, self.CART_BUTTON), timeout=10
+            )
+            logger.info("Home page loaded status: {}", is_loaded)
             return is_loaded
-        except:
+        except WebDriverException:
             logger.error("Failed to verify home page load status")
             return False
\ No newline at end of file
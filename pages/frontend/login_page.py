@@ -0,0 +1,145 @@
+"""
+Login Page Object Model
+Customer login functionality for OpenCart frontend
+Author: Lucas Maidana
+"""
+
+from typing import List
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+from pages.base_page import BasePage, Locator
+from loguru import logger
+
+
+class LoginPage(BasePage):
+    """
+    Login page object model for OpenCart frontend
+    Handles customer login through the account login form
+    """
+    
+    # Login form
+    EMAIL_INPUT = Locator(By.ID, "input-email")
+    PASSWORD_INPUT = Locator(By.ID, "input-password")
+    REMEMBER_ME_CHECKBOX = Locator(By.NAME, "remember")
+    LOGIN_BUTTON = Locator(By.CSS_SELECTOR, "input[type='submit'][value='Login']")
+    
+    # Fill and submit the form in one call. Arguments: email and password input
+    # IDs, their values, the remember me checkbox name, whether to tick it and
+    # the login button selector. Returns the clicked button, or null if the
+    # form is missing.
+    FAST_LOGIN_SCRIPT = """
+        var email = document.getElementById(arguments[0]),
+            password = document.getElementById(arguments[1]),
+            submit = document.querySelector(arguments[6]);
+        if (!email || !password || !submit) { return null; }
+        [[email, arguments[2]], [password, arguments[3]]].forEach(function (pair) {
+            pair[0].value = pair[1];
+            pair[0].dispatchEvent(new Event('input', {bubbles: true}));
+            pair[0].dispatchEvent(new Event('change', {bubbles: true}));
+        });
+        var remember = document.getElementsByName(arguments[4])[0];
+        if (arguments[5] && remember && !remember.checked) { remember.click(); }
+        submit.click();
+        return submit;
+    """
+    
+    # Messages
+    WARNING_MESSAGE = Locator(By.CSS_SELECTOR, ".alert.alert-danger")
+    
+    # Upper bound for the store to answer a login submission
+    LOGIN_TIMEOUT = 10  # seconds
+    
+    def __init__(self, driver):
+        """Initialize login page"""
+        super().__init__(driver)
+    
+    def navigate_to_login(self, base_url: str):
+        """
+        Navigate to login page
+        
+        Args:
+            base_url: Base URL of OpenCart installation
+        """
+        self.driver.get(f"{base_url}/index.php?route=account/login")
+        self.invalidate_cache()
+        # With an 'eager' page load strategy get() returns at DOMContentLoaded
+        self.wait_for_form()
+        logger.info("Navigated to login page")
+        return self
+    
+    def wait_for_form(self, timeout: int = None):
+        """
+        Wait for the login form to be displayed
+        
+        Args:
+            timeout: Optional timeout override
+        """
+        self.wait_for_element_visible(self.EMAIL_INPUT, timeout)
+        return self
+    
+    def has_remember_me_option(self) -> bool:
+        """Check if the form offers a remember me checkbox, without waiting"""
+        return self._probe_element(self.REMEMBER_ME_CHECKBOX, visible=True)
+    
+    def get_warning_messages(self) -> List[str]:
+        """
+        Get the text of every warning alert on the page in one call
+        
+        Returns:
+            list: Warning texts, empty if none are shown
+        """
+        return self._js_text_all(self.WARNING_MESSAGE.value)
+    
+    def get_password_field_type(self) -> str:
+        """Get the type attribute of the password input"""
+        return self.get_element_attribute(self.PASSWORD_INPUT, "type")
+    
+    def login(self, email: str, password: str, remember_me: bool = False):
+        """
+        Fill and submit the login form, then wait for the store's response
+        
+        The fields, remember me checkbox and submit are handled in a single
+        script call. Falls back to filling the form control by control if
+        the script can't find it.
+        
+        Args:
+            email: Customer email
+            password: Customer password
+            remember_me: Tick remember me when the form offers it
+        """
+        # The session has no implicit wait; wait for the form explicitly
+        self.wait_for_form()
+        login_button = self.driver.execute_script(
+            self.FAST_LOGIN_SCRIPT,
+            self.EMAIL_INPUT.value, self.PASSWORD_INPUT.value, email, password,
+            self.REMEMBER_ME_CHECKBOX.value, remember_me, self.LOGIN_BUTTON.value
+        )
+        if login_button is None:
+            logger.warning("Fast login submit failed, filling form step by step")
+            login_button = self._submit_step_by_step(email, password, remember_me)
+        
+        # The login page is replaced once the server has answered
+        try:
+            self._get_wait(self.LOGIN_TIMEOUT).until(EC.staleness_of(login_button))
+        except TimeoutException:
+            logger.warning("Login form was not answered within {}s", self.LOGIN_TIMEOUT)
+        
+        # Cached form elements don't survive the submit
+        self.invalidate_cache()
+        logger.info("Submitted login form for: {}", email)
+        return self
+    
+    def _submit_step_by_step(self, email: str, password: str, remember_me: bool):
+        """Fill and submit the form one control at a time, returning the clicked button"""
+        self.enter_text(self.EMAIL_INPUT, email)
+        self.enter_text(self.PASSWORD_INPUT, password)
+        
+        if remember_me and self.has_remember_me_option():
+            if not self._with_element(self.REMEMBER_ME_CHECKBOX, lambda element: element.is_selected()):
+                self.click_element(self.REMEMBER_ME_CHECKBOX)
+        
+        login_button = self.find_element(self.LOGIN_BUTTON, use_cache=True)
+        self.click_element(self.LOGIN_BUTTON)
+        return login_button
@@ -4,11 +4,20 @@ Customer registration functionality for OpenCart frontend
 Author: Lucas Maidana
 """
 
+import os
+import time
+import itertools
+from types import MappingProxyType
 from selenium.webdriver.common.by import By
-from pages.base_page import BasePage
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from pages.base_page import BasePage, Locator
 from loguru import logger
 
 
+# Keeps emails generated in the same clock tick distinct
+_EMAIL_COUNTER = itertools.count()
+
+
 class RegistrationPage(BasePage):
     """
     Registration page object model for OpenCart frontend
@@ -16,50 +25,120 @@ class RegistrationPage(BasePage):
     """
     
     # Page locators
-    PAGE_TITLE = (By.CSS_SELECTOR, "h1")
+    PAGE_TITLE = Locator(By.CSS_SELECTOR, "h1")
     
     # Personal Details section
-    FIRSTNAME_INPUT = (By.ID, "input-firstname")
-    LASTNAME_INPUT = (By.ID, "input-lastname")
-    EMAIL_INPUT = (By.ID, "input-email")
-    TELEPHONE_INPUT = (By.ID, "input-telephone")
+    FIRSTNAME_INPUT = Locator(By.ID, "input-firstname")
+    LASTNAME_INPUT = Locator(By.ID, "input-lastname")
+    EMAIL_INPUT = Locator(By.ID, "input-email")
+    TELEPHONE_INPUT = Locator(By.ID, "input-telephone")
     
     # Password section
-    PASSWORD_INPUT = (By.ID, "input-password")
-    CONFIRM_PASSWORD_INPUT = (By.ID, "input-confirm")
+    PASSWORD_INPUT = Locator(By.ID, "input-password")
+    CONFIRM_PASSWORD_INPUT = Locator(By.ID, "input-confirm")
     
     # Newsletter subscription
-    NEWSLETTER_YES_RADIO = (By.CSS_SELECTOR, "input[name='newsletter'][value='1']")
-    NEWSLETTER_NO_RADIO = (By.CSS_SELECTOR, "input[name='newsletter'][value='0']")
+    NEWSLETTER_YES_RADIO = Locator(By.CSS_SELECTOR, "input[name='newsletter'][value='1']")
+    NEWSLETTER_NO_RADIO = Locator(By.CSS_SELECTOR, "input[name='newsletter'][value='0']")
     
     # Privacy Policy and Terms
-    PRIVACY_POLICY_CHECKBOX = (By.NAME, "agree")
-    PRIVACY_POLICY_LINK = (By.CSS_SELECTOR, "a[href*='information/information']")
+    PRIVACY_POLICY_CHECKBOX = Locator(By.NAME, "agree")
+    PRIVACY_POLICY_LINK = Locator(By.CSS_SELECTOR, "a[href*='information/information']")
     
     # Form submission
-    CONTINUE_BUTTON = (By.CSS_SELECTOR, "input[type='submit'][value='Continue']")
+    CONTINUE_BUTTON = Locator(By.CSS_SELECTOR, "input[type='submit'][value='Continue']")
     
     # Error messages
-    FIRSTNAME_ERROR = (By.ID, "error-firstname")
-    LASTNAME_ERROR = (By.ID, "error-lastname")
-    EMAIL_ERROR = (By.ID, "error-email")
-    TELEPHONE_ERROR = (By.ID, "error-telephone")
-    PASSWORD_ERROR = (By.ID, "error-password")
-    CONFIRM_PASSWORD_ERROR = (By.ID, "error-confirm")
-    GENERAL_ERROR = (By.CSS_SELECTOR, ".alert.alert-danger")
+    FIRSTNAME_ERROR = Locator(By.ID, "error-firstname")
+    LASTNAME_ERROR = Locator(By.ID, "error-lastname")
+    EMAIL_ERROR = Locator(By.ID, "error-email")
+    TELEPHONE_ERROR = Locator(By.ID, "error-telephone")
+    PASSWORD_ERROR = Locator(By.ID, "error-password")
+    CONFIRM_PASSWORD_ERROR = Locator(By.ID, "error-confirm")
+    GENERAL_ERROR = Locator(By.CSS_SELECTOR, ".alert.alert-danger")
+    
+    # Errors render with the submitted page, alerts may arrive via AJAX
+    FIELD_ERROR_TIMEOUT = 0.3  # seconds
+    MESSAGE_TIMEOUT = 0.5  # seconds
+    REGISTRATION_TIMEOUT = 5  # seconds, for the submission's outcome page
+    
+    # Every error read by get_all_validation_errors(), keyed as it returns them
+    VALIDATION_ERROR_LOCATORS = MappingProxyType({
+        'firstname': FIRSTNAME_ERROR,
+        'lastname': LASTNAME_ERROR,
+        'email': EMAIL_ERROR,
+        'telephone': TELEPHONE_ERROR,
+        'password': PASSWORD_ERROR,
+        'confirm_password': CONFIRM_PASSWORD_ERROR,
+        'general': GENERAL_ERROR,
+    })
     
     # Success elements
-    SUCCESS_MESSAGE = (By.CSS_SELECTOR, ".alert.alert-success")
-    SUCCESS_PAGE_TITLE = (By.CSS_SELECTOR, "h1")
+    SUCCESS_MESSAGE = Locator(By.CSS_SELECTOR, ".alert.alert-success")
+    SUCCESS_PAGE_TITLE = Locator(By.CSS_SELECTOR, "h1")
+    SUCCESS_HEADING_TEXT = "Created"  # "Your Account Has Been Created!"
+    
+    # Everything read by get_form_snapshot(): the validation errors plus the heading
+    SNAPSHOT_LOCATORS = MappingProxyType(dict(VALIDATION_ERROR_LOCATORS, heading=SUCCESS_PAGE_TITLE))
+    
+    # Text inputs filled by fast_submit(), keyed by user_data field
+    FORM_INPUT_IDS = MappingProxyType({
+        'firstname': FIRSTNAME_INPUT.value,
+        'lastname': LASTNAME_INPUT.value,
+        'email': EMAIL_INPUT.value,
+        'telephone': TELEPHONE_INPUT.value,
+        'password': PASSWORD_INPUT.value,
+        'confirm_password': CONFIRM_PASSWORD_INPUT.value,
+    })
+    
+    # Fill, tick and submit the whole form in one call. Arguments: FORM_INPUT_IDS,
+    # the matching values, then the newsletter radio selector, privacy checkbox
+    # name and continue button selector. Returns '' or an error message.
+    FAST_SUBMIT_SCRIPT = """
+        var ids = arguments[0], values = arguments[1];
+        for (var field in ids) {
+            var input = document.getElementById(ids[field]);
+            if (!input) { return field + ' input not found'; }
+            input.value = values[field];
+            input.dispatchEvent(new Event('input', {bubbles: true}));
+            input.dispatchEvent(new Event('change', {bubbles: true}));
+        }
+        var newsletter = document.querySelector(arguments[2]),
+            agree = document.getElementsByName(arguments[3])[0],
+            submit = document.querySelector(arguments[4]);
+        if (!newsletter || !agree || !submit) { return 'form controls not found'; }
+        newsletter.click();
+        if (!agree.checked) { agree.click(); }
+        submit.click();
+        return '';
+    """
     
     # Navigation
-    LOGIN_LINK = (By.LINK_TEXT, "login page")
-    BREADCRUMB = (By.CSS_SELECTOR, ".breadcrumb")
+    LOGIN_LINK = Locator(By.CSS_SELECTOR, "#content a[href*='account/login']")
+    BREADCRUMB = Locator(By.CSS_SELECTOR, ".breadcrumb")
     
     def __init__(self, driver):
         """Initialize registration page"""
         super().__init__(driver)
     
+    @staticmethod
+    def generate_unique_email(prefix: str = "test", domain: str = "example.com") -> str:
+        """
+        Generate an email address that no other test or xdist worker will reuse
+        
+        OpenCart rejects duplicate customer emails, so parallel workers must
+        not draw the same address.
+        
+        Args:
+            prefix: Local part prefix
+            domain: Email domain
+            
+        Returns:
+            str: Unique email address
+        """
+        worker = os.getenv('PYTEST_XDIST_WORKER', 'gw0')
+        return f"{prefix}.{worker}.{time.time_ns()}{next(_EMAIL_COUNTER)}@{domain}"
+    
     def navigate_to_registration(self, base_url: str):
         """
         Navigate to registration page
@@ -69,6 +148,9 @@ class RegistrationPage(BasePage):
         """
         registration_url = f"{base_url}/index.php?route=account/register"
         self.driver.get(registration_url)
+        self.invalidate_cache()
+        # With an 'eager' page load strategy get() returns at DOMContentLoaded
+        self.wait_for_element_visible(self.FIRSTNAME_INPUT)
         logger.info("Navigated to registration page")
         return self
     
@@ -82,9 +164,9 @@ class RegistrationPage(BasePage):
         try:
             page_title = self.get_element_text(self.PAGE_TITLE)
             is_loaded = "Register Account" in page_title
-            logger.info(f"Registration page loaded: {is_loaded}")
+            logger.info("Registration page loaded: {}", is_loaded)
             return is_loaded
-        except:
+        except (NoSuchElementException, TimeoutException):
             logger.error("Failed to verify registration page load")
             return False
     
@@ -107,7 +189,7 @@ class RegistrationPage(BasePage):
         self.enter_text(self.EMAIL_INPUT, email)
         self.enter_text(self.TELEPHONE_INPUT, telephone)
         
-        logger.info(f"Filled personal details for: {firstname} {lastname}")
+        logger.info("Filled personal details for: {} {}", firstname, lastname)
         return self
     
     def fill_password(self, password: str, confirm_password: str = None):
@@ -159,12 +241,13 @@ class RegistrationPage(BasePage):
         Returns:
             bool: True if checkbox is checked
         """
-        element = self.find_element(locator)
-        return element.is_selected()
+        return self._with_element(locator, lambda element: element.is_selected())
     
     def submit_registration(self):
         """Submit registration form"""
         self.click_element(self.CONTINUE_BUTTON)
+        # Cached form elements don't survive the submit
+        self.invalidate_cache()
         logger.info("Submitted registration form")
         return self
     
@@ -204,7 +287,37 @@ class RegistrationPage(BasePage):
         # Submit form
         self.submit_registration()
         
-        logger.info(f"Completed registration for: {user_data['email']}")
+        logger.info("Completed registration for: {}", user_data['email'])
+        return self
+    
+    def fast_submit(self, user_data: dict):
+        """
+        Fill and submit the registration form in a single script call
+        
+        Sets every field, the newsletter choice and the privacy checkbox
+        without a WebDriver call per control. Falls back to
+        complete_registration() if the form can't be found.
+        
+        Args:
+            user_data: Same fields as complete_registration()
+        """
+        values = {
+            field: user_data.get(field, '') for field in self.FORM_INPUT_IDS
+        }
+        values['confirm_password'] = user_data.get('confirm_password', user_data['password'])
+        newsletter = self.NEWSLETTER_YES_RADIO if user_data.get('newsletter', True) else self.NEWSLETTER_NO_RADIO
+        
+        error = self.driver.execute_script(
+            self.FAST_SUBMIT_SCRIPT,
+            dict(self.FORM_INPUT_IDS), values,
+            newsletter.value, self.PRIVACY_POLICY_CHECKBOX.value, self.CONTINUE_BUTTON.value
+        )
+        if error:
+            logger.warning(f"Fast registration submit failed ({error}), filling form step by step")
+            return self.complete_registration(user_data)
+        
+        self.invalidate_cache()
+        logger.info("Completed registration for: {}", user_data['email'])
         return self
     
     # ====================
@@ -213,96 +326,106 @@ class RegistrationPage(BasePage):
     
     def get_firstname_error(self) -> str:
         """Get first name validation error"""
-        try:
-            return self.get_element_text(self.FIRSTNAME_ERROR)
-        except:
-            return ""
+        return self._safe_text(self.FIRSTNAME_ERROR, self.FIELD_ERROR_TIMEOUT)
     
     def get_lastname_error(self) -> str:
         """Get last name validation error"""
-        try:
-            return self.get_element_text(self.LASTNAME_ERROR)
-        except:
-            return ""
+        return self._safe_text(self.LASTNAME_ERROR, self.FIELD_ERROR_TIMEOUT)
     
     def get_email_error(self) -> str:
         """Get email validation error"""
-        try:
-            return self.get_element_text(self.EMAIL_ERROR)
-        except:
-            return ""
+        return self._safe_text(self.EMAIL_ERROR, self.FIELD_ERROR_TIMEOUT)
     
     def get_telephone_error(self) -> str:
         """Get telephone validation error"""
-        try:
-            return self.get_element_text(self.TELEPHONE_ERROR)
-        except:
-            return ""
+        return self._safe_text(self.TELEPHONE_ERROR, self.FIELD_ERROR_TIMEOUT)
     
     def get_password_error(self) -> str:
         """Get password validation error"""
-        try:
-            return self.get_element_text(self.PASSWORD_ERROR)
-        except:
-            return ""
+        return self._safe_text(self.PASSWORD_ERROR, self.FIELD_ERROR_TIMEOUT)
     
     def get_confirm_password_error(self) -> str:
         """Get confirm password validation error"""
-        try:
-            return self.get_element_text(self.CONFIRM_PASSWORD_ERROR)
-        except:
-            return ""
+        return self._safe_text(self.CONFIRM_PASSWORD_ERROR, self.FIELD_ERROR_TIMEOUT)
     
     def get_general_error(self) -> str:
         """Get general form error message"""
+        return self._safe_text(self.GENERAL_ERROR, self.MESSAGE_TIMEOUT)
+    
+    def _read_validation_errors(self) -> dict:
+        """Non-empty validation errors, polled briefly in one script call per poll"""
+        def any_errors(_):
+            texts = self._js_batch_text(self.VALIDATION_ERROR_LOCATORS)
+            errors = {key: value for key, value in texts.items() if value}
+            return errors or False
+        
         try:
-            return self.get_element_text(self.GENERAL_ERROR)
-        except:
-            return ""
+            wait = self._get_wait(self.FIELD_ERROR_TIMEOUT, self.OPTIONAL_POLL_FREQUENCY)
+            return wait.until(any_errors)
+        except TimeoutException:
+            return {}
     
     def has_validation_errors(self) -> bool:
         """
         Check if form has any validation errors
         
+        The check stops in the browser at the first error with text.
+        
         Returns:
             bool: True if validation errors are present
         """
-        errors = [
-            self.get_firstname_error(),
-            self.get_lastname_error(),
-            self.get_email_error(),
-            self.get_telephone_error(),
-            self.get_password_error(),
-            self.get_confirm_password_error(),
-            self.get_general_error()
-        ]
-        
-        has_errors = any(error for error in errors)
-        logger.info(f"Validation errors present: {has_errors}")
+        locators = tuple(self.VALIDATION_ERROR_LOCATORS.values())
+        try:
+            wait = self._get_wait(self.FIELD_ERROR_TIMEOUT, self.OPTIONAL_POLL_FREQUENCY)
+            has_errors = wait.until(lambda _: self._js_any_text(locators))
+        except TimeoutException:
+            has_errors = False
+        logger.info("Validation errors present: {}", has_errors)
         return has_errors
     
     def get_all_validation_errors(self) -> dict:
         """
         Get all validation errors as dictionary
         
+        All error fields are read in a single script call.
+        
         Returns:
             dict: Dictionary of field names and error messages
         """
-        errors = {
-            'firstname': self.get_firstname_error(),
-            'lastname': self.get_lastname_error(),
-            'email': self.get_email_error(),
-            'telephone': self.get_telephone_error(),
-            'password': self.get_password_error(),
-            'confirm_password': self.get_confirm_password_error(),
-            'general': self.get_general_error()
-        }
-        
-        # Filter out empty errors
-        errors = {key: value for key, value in errors.items() if value}
-        logger.info(f"Validation errors: {errors}")
+        errors = self._read_validation_errors()
+        logger.info("Validation errors: {}", errors)
         return errors
     
+    def get_form_snapshot(self, timeout: float = None) -> dict:
+        """
+        Get the outcome of a submission: validation errors and success state
+        
+        Every error and the page heading are read in one script call per
+        poll, instead of a WebDriver command per getter. Polling stops as
+        soon as either shows up.
+        
+        Args:
+            timeout: How long to wait for an outcome (default FIELD_ERROR_TIMEOUT)
+        
+        Returns:
+            dict: 'errors' maps field names to non-empty error messages,
+                'success' is True on the account created page
+        """
+        def settled(_):
+            texts = self._js_batch_text(self.SNAPSHOT_LOCATORS)
+            heading = texts.pop('heading')
+            errors = {key: value for key, value in texts.items() if value}
+            success = self.SUCCESS_HEADING_TEXT in heading
+            return (errors or success) and {'errors': errors, 'success': success}
+        
+        try:
+            wait = self._get_wait(timeout or self.FIELD_ERROR_TIMEOUT, self.OPTIONAL_POLL_FREQUENCY)
+            snapshot = wait.until(settled)
+        except TimeoutException:
+            snapshot = {'errors': {}, 'success': False}
+        logger.info("Registration form snapshot: {}", snapshot)
+        return snapshot
+    
     # ====================
     # SUCCESS VALIDATION
     # ====================
@@ -311,27 +434,20 @@ class RegistrationPage(BasePage):
         """
         Check if registration was successful
         
+        Waits explicitly for either the account created page or a validation
+        error, so a rejected submission returns as soon as its errors render
+        instead of after the full timeout.
+        
         Returns:
             bool: True if registration successful
         """
-        try:
-            # Check for success message or redirect to success page
-            success_message = self.is_element_visible(self.SUCCESS_MESSAGE, timeout=5)
-            success_title = "Account" in self.get_page_title()
-            
-            is_successful = success_message or success_title
-            logger.info(f"Registration successful: {is_successful}")
-            return is_successful
-        except:
-            logger.error("Failed to verify registration success")
-            return False
+        is_successful = self.get_form_snapshot(self.REGISTRATION_TIMEOUT)['success']
+        logger.info("Registration successful: {}", is_successful)
+        return is_successful
     
     def get_success_message(self) -> str:
         """Get registration success message"""
-        try:
-            return self.get_element_text(self.SUCCESS_MESSAGE)
-        except:
-            return ""
+        return self._safe_text(self.SUCCESS_MESSAGE, self.MESSAGE_TIMEOUT)
     
     # ====================
     # FIELD VALIDATION
@@ -348,9 +464,9 @@ class RegistrationPage(BasePage):
             self.CONFIRM_PASSWORD_INPUT
         ]
         
+        # Inputs located while filling the form are reused from the element cache
         for field in fields:
-            element = self.find_element(field)
-            element.clear()
+            self._with_element(field, lambda element: element.clear())
         
         logger.info("Cleared all form fields")
         return self
@@ -6,75 +6,127 @@ Author: Lucas Maidana
 """
 
 import json
+import heapq
+import functools
+import itertools
 import argparse
+import math
 import os
-from typing import List, Dict, Any
+from types import MappingProxyType
+from typing import List, Dict, Any, NamedTuple, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:  # fall back to the stdlib encoder
+    orjson = None
+
+
+class GroupConfig(NamedTuple):
+    """Static configuration of one test group"""
+    tests: Tuple[str, ...]
+    parallel_capacity: int
+    execution_time: int  # minutes
+
+
+# Built once at import; generators share it read-only
+TEST_GROUPS = MappingProxyType({
+    'frontend': GroupConfig(
+        tests=(
+            'test_user_registration',
+            'test_user_authentication',
+            'test_product_catalog',
+            'test_shopping_cart',
+            'test_checkout_process',
+        ),
+        parallel_capacity=4,
+        execution_time=8
+    ),
+    'backend': GroupConfig(
+        tests=(
+            'test_admin_authentication',
+            'test_product_management',
+            'test_order_management',
+            'test_customer_management',
+        ),
+        parallel_capacity=3,
+        execution_time=6
+    ),
+    'integration': GroupConfig(
+        tests=(
+            'test_end_to_end_purchase',
+            'test_cross_browser_compatibility',
+            'test_email_notifications',
+        ),
+        parallel_capacity=2,
+        execution_time=12
+    ),
+    'performance': GroupConfig(
+        tests=(
+            'test_page_load_performance',
+            'test_cart_performance',
+            'test_search_performance',
+        ),
+        parallel_capacity=2,
+        execution_time=10
+    ),
+    'security': GroupConfig(
+        tests=(
+            'test_sql_injection_protection',
+            'test_xss_protection',
+            'test_authentication_security',
+        ),
+        parallel_capacity=2,
+        execution_time=8
+    ),
+    'smoke': GroupConfig(
+        tests=(
+            'test_basic_functionality',
+            'test_critical_paths',
+        ),
+        parallel_capacity=1,
+        execution_time=3
+    ),
+})
+
+# Browsers in matrix order
+BROWSERS = ('chrome', 'firefox', 'edge')
+
+# Short matrix entry keys written by --compact
+COMPACT_KEYS = MappingProxyType({
+    'test-group': 'g',
+    'browser': 'b',
+    'chunk': 'c',
+    'tests': 't',
+    'estimated-time': 'et',
+})
 
 
 class TestMatrixGenerator:
     """Generates optimized test execution matrix for CI/CD pipeline"""
     
-    def __init__(self):
-        self.test_groups = {
-            'frontend': {
-                'tests': [
-                    'test_user_registration',
-                    'test_user_authentication', 
-                    'test_product_catalog',
-                    'test_shopping_cart',
-                    'test_checkout_process'
-                ],
-                'parallel_capacity': 4,
-                'execution_time': 8  # minutes
-            },
-            'backend': {
-                'tests': [
-                    'test_admin_authentication',
-                    'test_product_management',
-                    'test_order_management',
-                    'test_customer_management'
-                ],
-                'parallel_capacity': 3,
-                'execution_time': 6  # minutes
-            },
-            'integration': {
-                'tests': [
-                    'test_end_to_end_purchase',
-                    'test_cross_browser_compatibility',
-                    'test_email_notifications'
-                ],
-                'parallel_capacity': 2,
-                'execution_time': 12  # minutes
-            },
-            'performance': {
-                'tests': [
-                    'test_page_load_performance',
-                    'test_cart_performance',
-                    'test_search_performance'
-                ],
-                'parallel_capacity': 2,
-                'execution_time': 10  # minutes
-            },
-            'security': {
-                'tests': [
-                    'test_sql_injection_protection',
-                    'test_xss_protection',
-                    'test_authentication_security'
-                ],
-                'parallel_capacity': 2,
-                'execution_time': 8  # minutes
-            },
-            'smoke': {
-                'tests': [
-                    'test_basic_functionality',
-                    'test_critical_paths'
-                ],
-                'parallel_capacity': 1,
-                'execution_time': 3  # minutes
-            }
+    # Assumed duration of a test missing from the durations file
+    DEFAULT_TEST_DURATION = 60  # seconds
+    
+    def __init__(self, history_path: str = 'test_durations.json'):
+        """
+        Args:
+            history_path: JSON file of per-test durations in seconds from earlier
+                runs; chunks are balanced by group estimates when it is missing
+        """
+        self.test_groups = TEST_GROUPS
+        self.test_durations = self._load_durations(history_path)
+        
+        self.browsers = BROWSERS
+        self._browser_set = frozenset(BROWSERS)
+        
+        # Chunks depend only on the group, not on the browser or call
+        self._group_chunks = {
+            name: self._chunk_group(group_config) for name, group_config in self.test_groups.items()
         }
         
-        self.browsers = ['chrome', 'firefox', 'edge']
+        # The group config doesn't change after construction, so each
+        # (test_suite, browser, max_parallel) matrix is built only once
+        self._cached_matrix = functools.lru_cache(maxsize=None)(self._build_matrix)
     
     def generate_matrix(self, 
                        test_suite: str = 'all',
@@ -83,6 +135,9 @@ class TestMatrixGenerator:
         """
         Generate test execution matrix
         
+        Repeated calls with the same arguments return the same dict,
+        so callers should treat it as read-only.
+        
         Args:
             test_suite: Test suite to run (all, frontend, backend, etc.)
             browser: Browser to test (chrome, firefox, edge, all)
@@ -91,8 +146,10 @@ class TestMatrixGenerator:
         Returns:
             Dict containing the test matrix
         """
-        matrix_entries = []
-        
+        return self._cached_matrix(test_suite, browser, max_parallel)
+    
+    def _build_matrix(self, test_suite: str, browser: str, max_parallel: int) -> Dict[str, Any]:
+        """Build the matrix returned by generate_matrix()"""
         # Determine test groups to include
         if test_suite == 'all':
             selected_groups = list(self.test_groups.keys())
@@ -103,54 +160,111 @@ class TestMatrixGenerator:
         if browser == 'all':
             selected_browsers = self.browsers
         else:
-            selected_browsers = [browser] if browser in self.browsers else ['chrome']
+            selected_browsers = [browser] if browser in self._browser_set else ['chrome']
         
         # Generate matrix entries
-        for group_name in selected_groups:
-            group_config = self.test_groups[group_name]
-            
-            for browser_name in selected_browsers:
-                # Determine chunking strategy based on test count and parallel capacity
-                tests = group_config['tests']
-                parallel_capacity = group_config['parallel_capacity']
-                
-                if len(tests) <= parallel_capacity:
-                    # Run all tests in single chunk
-                    matrix_entries.append({
-                        'test-group': group_name,
-                        'browser': browser_name,
-                        'chunk': 'all',
-                        'tests': tests,
-                        'estimated-time': group_config['execution_time']
-                    })
-                else:
-                    # Split into multiple chunks
-                    chunk_size = max(1, len(tests) // parallel_capacity)
-                    for i in range(0, len(tests), chunk_size):
-                        chunk_tests = tests[i:i + chunk_size]
-                        chunk_num = (i // chunk_size) + 1
-                        
-                        matrix_entries.append({
-                            'test-group': group_name,
-                            'browser': browser_name,
-                            'chunk': f'chunk-{chunk_num}',
-                            'tests': chunk_tests,
-                            'estimated-time': group_config['execution_time'] // parallel_capacity
-                        })
+        matrix_entries = [
+            {
+                'test-group': group_name,
+                'browser': browser_name,
+                'chunk': chunk_name,
+                'tests': chunk_tests,
+                'estimated-time': chunk_time
+            }
+            for group_name, browser_name in itertools.product(selected_groups, selected_browsers)
+            for chunk_name, chunk_tests, chunk_time in self._group_chunks[group_name]
+        ]
         
         # Optimize matrix to fit within max_parallel constraint
         optimized_matrix = self._optimize_matrix(matrix_entries, max_parallel)
         
+        # Jobs are dispatched in listed order, so start the slowest first
+        optimized_matrix.sort(key=lambda entry: entry['estimated-time'], reverse=True)
+        
         return {
             'include': optimized_matrix,
             'total_jobs': len(optimized_matrix),
             'estimated_total_time': self._calculate_total_time(optimized_matrix, max_parallel)
         }
     
+    @staticmethod
+    def _load_durations(history_path: str) -> Dict[str, float]:
+        """
+        Load per-test durations recorded by earlier CI runs
+        
+        Args:
+            history_path: JSON file mapping test names to seconds
+            
+        Returns:
+            Test durations, empty if no usable file exists
+        """
+        try:
+            with open(history_path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            print(f"Warning: Ignoring test durations in {history_path}: {e}")
+            return {}
+    
+    def _chunk_group(self, group_config: GroupConfig) -> Tuple[Tuple[str, Tuple[str, ...], int], ...]:
+        """
+        Split a group's tests into chunks based on its parallel capacity
+        
+        With recorded durations, tests are placed longest first onto the
+        chunk with the least total duration; otherwise they are dealt
+        round-robin and the group's estimate is split evenly.
+        
+        Args:
+            group_config: Test group configuration
+            
+        Returns:
+            (chunk name, tests, estimated time in minutes) for each chunk
+        """
+        tests = group_config.tests
+        parallel_capacity = group_config.parallel_capacity
+        durations = self.test_durations
+        
+        if len(tests) <= parallel_capacity:
+            # Run all tests in single chunk
+            if durations:
+                return (('all', tests, self._estimate_minutes(tests)),)
+            return (('all', tests, group_config.execution_time),)
+        
+        if durations:
+            chunks = [[] for _ in range(parallel_capacity)]
+            chunk_loads = [(0, index) for index in range(parallel_capacity)]
+            for test in sorted(tests, key=lambda name: durations.get(name, self.DEFAULT_TEST_DURATION),
+                               reverse=True):
+                load, index = heapq.heappop(chunk_loads)
+                chunks[index].append(test)
+                heapq.heappush(chunk_loads, (load + durations.get(test, self.DEFAULT_TEST_DURATION), index))
+            return tuple(
+                (f'chunk-{index}', tuple(chunk_tests), self._estimate_minutes(chunk_tests))
+                for index, chunk_tests in enumerate(chunks, start=1)
+            )
+        
+        # Split into parallel_capacity chunks, dealing tests round-robin
+        # so chunk sizes differ by at most one
+        chunk_time = group_config.execution_time // parallel_capacity
+        return tuple(
+            (f'chunk-{chunk_num}', tests[chunk_num - 1::parallel_capacity], chunk_time)
+            for chunk_num in range(1, parallel_capacity + 1)
+        )
+    
+    def _estimate_minutes(self, tests) -> int:
+        """Recorded duration of tests in whole minutes, rounded up"""
+        seconds = sum(self.test_durations.get(test, self.DEFAULT_TEST_DURATION) for test in tests)
+        return math.ceil(seconds / 60)
+    
     def _optimize_matrix(self, matrix_entries: List[Dict], max_parallel: int) -> List[Dict]:
         """
         Optimize matrix to respect parallel job limits
         
+        Surplus entries are packed onto existing jobs instead of being
+        dropped: longest first, each onto the least-loaded job running
+        the same browser (best-fit decreasing).
+        
         Args:
             matrix_entries: List of matrix entries
             max_parallel: Maximum parallel jobs
@@ -166,21 +280,50 @@ class TestMatrixGenerator:
                               key=lambda x: x['estimated-time'], 
                               reverse=True)
         
-        # If we have too many jobs, we need to combine some
-        if len(sorted_entries) > max_parallel:
-            # For now, just take the first max_parallel entries
-            # In a more sophisticated implementation, we could combine test chunks
-            optimized = sorted_entries[:max_parallel]
-            
-            # Log what was excluded
-            excluded = sorted_entries[max_parallel:]
-            print(f"Warning: Excluded {len(excluded)} jobs due to parallel limit")
-            for job in excluded:
-                print(f"  - {job['test-group']} | {job['browser']} | {job['chunk']}")
-            
-            return optimized
+        # The longest max_parallel entries each open a job
+        jobs = [[entry] for entry in sorted_entries[:max_parallel]]
+        job_loads = [entry['estimated-time'] for entry in sorted_entries[:max_parallel]]
+        browser_heaps: Dict[str, List] = {}
+        for index, entry in enumerate(sorted_entries[:max_parallel]):
+            heapq.heappush(browser_heaps.setdefault(entry['browser'], []), (job_loads[index], index))
+        
+        for entry in sorted_entries[max_parallel:]:
+            heap = browser_heaps.setdefault(entry['browser'], [])
+            # Heap loads go stale when another browser's entry joins a job
+            while heap and heap[0][0] != job_loads[heap[0][1]]:
+                _, index = heapq.heappop(heap)
+                heapq.heappush(heap, (job_loads[index], index))
+            if heap:
+                _, index = heapq.heappop(heap)
+            else:
+                # No job runs this browser yet, share the least-loaded one
+                index = min(range(len(jobs)), key=job_loads.__getitem__)
+            jobs[index].append(entry)
+            job_loads[index] += entry['estimated-time']
+            heapq.heappush(heap, (job_loads[index], index))
+        
+        return [self._merge_entries(job) for job in jobs]
+    
+    @staticmethod
+    def _merge_entries(entries: List[Dict]) -> Dict:
+        """
+        Combine matrix entries packed onto one job
         
-        return sorted_entries
+        Args:
+            entries: Entries sharing the job, longest first
+            
+        Returns:
+            Single matrix entry running all of their tests
+        """
+        if len(entries) == 1:
+            return entries[0]
+        return {
+            'test-group': '+'.join(dict.fromkeys(entry['test-group'] for entry in entries)),
+            'browser': '+'.join(dict.fromkeys(entry['browser'] for entry in entries)),
+            'chunk': '+'.join(entry['chunk'] for entry in entries),
+            'tests': [test for entry in entries for test in entry['tests']],
+            'estimated-time': sum(entry['estimated-time'] for entry in entries)
+        }
     
     def _calculate_total_time(self, matrix_entries: List[Dict], max_parallel: int) -> int:
         """
@@ -199,16 +342,13 @@ class TestMatrixGenerator:
         # Sort by execution time
         times = sorted([entry['estimated-time'] for entry in matrix_entries], reverse=True)
         
-        # Calculate time with parallel execution
-        total_time = 0
-        job_batches = [times[i:i + max_parallel] for i in range(0, len(times), max_parallel)]
-        
-        for batch in job_batches:
-            # Each batch runs in parallel, so time is the longest job in the batch
-            batch_time = max(batch) if batch else 0
-            total_time += batch_time
+        # Longest-processing-time scheduling: each job starts on the runner
+        # that frees up first, as CI dispatches queued matrix jobs
+        runner_loads = [0] * min(max_parallel, len(times))
+        for job_time in times:
+            heapq.heapreplace(runner_loads, runner_loads[0] + job_time)
         
-        return total_time
+        return max(runner_loads)
     
     def generate_smoke_matrix(self) -> Dict[str, Any]:
         """Generate matrix for smoke tests only"""
@@ -219,14 +359,44 @@ class TestMatrixGenerator:
         return self.generate_matrix(test_suite='frontend', browser='all', max_parallel=15)
 
 
+def compact_matrix(matrix: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Shorten matrix entry keys for output (see COMPACT_KEYS)
+    
+    Workflows consuming the compact form must read matrix.g, matrix.b, etc.
+    
+    Args:
+        matrix: Matrix returned by generate_matrix()
+        
+    Returns:
+        Copy of the matrix with compact entry keys
+    """
+    return {
+        **matrix,
+        'include': [
+            {COMPACT_KEYS[key]: value for key, value in entry.items()}
+            for entry in matrix['include']
+        ]
+    }
+
+
+def _file_content(path: str) -> Optional[bytes]:
+    """Current content of a file, or None if it can't be read"""
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    except OSError:
+        return None
+
+
 def main():
     """Main entry point"""
     parser = argparse.ArgumentParser(description='Generate test execution matrix')
     parser.add_argument('--test-suite', default='all', 
-                       choices=['all', 'frontend', 'backend', 'integration', 'performance', 'security', 'smoke'],
+                       choices=['all', *TEST_GROUPS],
                        help='Test suite to run')
     parser.add_argument('--browser', default='chrome',
-                       choices=['chrome', 'firefox', 'edge', 'all'],
+                       choices=[*BROWSERS, 'all'],
                        help='Browser to test')
     parser.add_argument('--max-parallel', type=int, default=20,
                        help='Maximum parallel jobs')
@@ -234,11 +404,15 @@ def main():
                        help='Output file for matrix JSON')
     parser.add_argument('--pretty', action='store_true',
                        help='Pretty print JSON output')
+    parser.add_argument('--compact', action='store_true',
+                       help='Use short matrix entry keys (g, b, c, t, et)')
+    parser.add_argument('--durations-file', default='test_durations.json',
+                       help='JSON file of per-test durations (seconds) from earlier runs')
     
     args = parser.parse_args()
     
     # Generate matrix
-    generator = TestMatrixGenerator()
+    generator = TestMatrixGenerator(history_path=args.durations_file)
     matrix = generator.generate_matrix(
         test_suite=args.test_suite,
         browser=args.browser,
@@ -246,15 +420,24 @@ def main():
     )
     
     # Output matrix
-    indent = 2 if args.pretty else None
-    matrix_json = json.dumps(matrix, indent=indent)
+    output = compact_matrix(matrix) if args.compact else matrix
+    if orjson is not None:
+        matrix_json = orjson.dumps(output, option=orjson.OPT_INDENT_2 if args.pretty else 0)
+    elif args.pretty:
+        matrix_json = json.dumps(output, indent=2).encode()
+    else:
+        matrix_json = json.dumps(output, separators=(',', ':')).encode()
     
-    # Write to file
-    with open(args.output_file, 'w') as f:
-        f.write(matrix_json)
+    # Write to file, leaving an identical file untouched so its mtime
+    # doesn't invalidate downstream caches
+    if _file_content(args.output_file) == matrix_json:
+        print(f"Matrix unchanged, skipping write: {args.output_file}")
+    else:
+        with open(args.output_file, 'wb') as f:
+            f.write(matrix_json)
+        print(f"Generated test matrix: {args.output_file}")
     
     # Print summary
-    print(f"Generated test matrix: {args.output_file}")
     print(f"Total jobs: {matrix['total_jobs']}")
     print(f"Estimated execution time: {matrix['estimated_total_time']} minutes")
     print(f"Max parallel jobs: {args.max_parallel}")
@@ -8,9 +8,10 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
 from utils.driver_manager import DriverManager
 from config.settings import config
-import time
 
 def test_framework_demo():
     """Simple demo test to validate framework setup"""
@@ -28,17 +29,14 @@ def test_framework_demo():
         print("🌐 Navigating to Google...")
         driver.get("https://www.google.com")
         
-        # Verify page loaded
-        assert "Google" in driver.title
+        # Verify page loaded (raises TimeoutException otherwise)
+        WebDriverWait(driver, 5).until(EC.title_contains("Google"))
         print(f"✅ Page loaded successfully: {driver.title}")
         
         # Take a screenshot
         screenshot_path = driver_manager.take_screenshot("demo_test.png")
         print(f"📸 Screenshot taken: {screenshot_path}")
         
-        # Wait a moment
-        time.sleep(2)
-        
         print("✅ Framework demo test completed successfully!")
         
     except Exception as e:
@@ -6,13 +6,77 @@ Author: Lucas Maidana
 
 import sys
 import os
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+import functools
+import importlib
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, 'scripts'))
+
+from generate_test_matrix import TestMatrixGenerator
+
+# Shared so repeated matrix checks reuse its memoized results
+_GEN = TestMatrixGenerator()
+
+# Framework modules imported by test_framework_imports
+FRAMEWORK_MODULES = (
+    'config.settings',
+    'pages.base_page',
+    'pages.frontend.home_page',
+    'pages.frontend.registration_page',
+    'pages.frontend.cart_page',
+    'utils.driver_manager',
+    'pytest',
+)
+
+# Upper bound for the --workers session; a worker spawning workers of its own hangs
+WORKERS_SESSION_TIMEOUT = 60  # seconds
+
+# Directories never needed by the structure checks
+SKIPPED_DIRS = frozenset({'.git', '__pycache__', 'node_modules'})
+
+@functools.lru_cache(maxsize=None)
+def _collect_paths(root='.'):
+    """
+    Relative POSIX paths under root, from one shared scandir walk
+    
+    Returns:
+        (directories, files) as frozensets
+    """
+    directories, files = set(), set()
+    pending = [(root, '')]
+    while pending:
+        directory, prefix = pending.pop()
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.name in SKIPPED_DIRS:
+                    continue
+                relative = prefix + entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    directories.add(relative)
+                    pending.append((entry.path, relative + '/'))
+                else:
+                    files.add(relative)
+    return frozenset(directories), frozenset(files)
+
+def _report_missing(required, existing):
+    """Print the status of each required path; True if none are missing"""
+    missing = set(required) - existing
+    for path in required:
+        print(f"❌ {path} - Missing" if path in missing else f"✅ {path}")
+    return not missing
 
 def test_framework_imports():
     """Test that all framework components can be imported"""
     print("🔧 Testing OpenCart Test Framework Structure...")
     
     try:
+        # Load every module up front on a few threads; the imports below
+        # then only bind names from sys.modules
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(importlib.import_module, FRAMEWORK_MODULES))
+        
         # Test config imports
         print("📋 Testing config imports...")
         from config.settings import config, TestConfig, BrowserConfig
@@ -71,12 +135,9 @@ def test_directory_structure():
         '.github/workflows'
     ]
     
-    for dir_path in required_dirs:
-        if os.path.exists(dir_path):
-            print(f"✅ {dir_path}")
-        else:
-            print(f"❌ {dir_path} - Missing")
-            return False
+    directories, _ = _collect_paths()
+    if not _report_missing(required_dirs, directories):
+        return False
     
     print("✅ Directory structure validated")
     return True
@@ -98,12 +159,9 @@ def test_required_files():
         '.github/workflows/opencart-tests.yml'
     ]
     
-    for file_path in required_files:
-        if os.path.exists(file_path):
-            print(f"✅ {file_path}")
-        else:
-            print(f"❌ {file_path} - Missing")
-            return False
+    _, files = _collect_paths()
+    if not _report_missing(required_files, files):
+        return False
     
     print("✅ Required files validated")
     return True
@@ -113,10 +171,7 @@ def test_test_matrix_generator():
     print("\n📊 Testing test matrix generator...")
     
     try:
-        sys.path.append('scripts')
-        from generate_test_matrix import TestMatrixGenerator
-        
-        generator = TestMatrixGenerator()
+        generator = _GEN
         
         # Test smoke matrix generation
         smoke_matrix = generator.generate_smoke_matrix()
@@ -138,6 +193,31 @@ def test_test_matrix_generator():
         print(f"❌ Test matrix generator failed: {str(e)}")
         return False
 
+def test_workers_option_session(tmp_path):
+    """Test that --workers runs a trivial session on pytest-xdist workers"""
+    import pytest
+    pytest.importorskip("xdist")
+    
+    (tmp_path / "pytest.ini").write_text("[pytest]\n")
+    # The framework hooks must load as a rootdir conftest, like in the repo:
+    # a -p plugin registers before xdist and its hooks would run after xdist's
+    (tmp_path / "conftest.py").write_text(
+        "import runpy\n"
+        f"framework = runpy.run_path({os.path.join(ROOT_DIR, 'conftest.py')!r})\n"
+        "globals().update((name, value) for name, value in framework.items() if not name.startswith('__'))\n"
+    )
+    (tmp_path / "test_trivial.py").write_text(
+        "def test_first():\n    pass\n\n\ndef test_second():\n    pass\n"
+    )
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, (ROOT_DIR, os.environ.get('PYTHONPATH')))))
+    result = subprocess.run(
+        [sys.executable, "-m", "pytest", "-p", "no:cacheprovider", "--workers", "2", "-q", "test_trivial.py"],
+        cwd=tmp_path, env=env, capture_output=True, text=True, timeout=WORKERS_SESSION_TIMEOUT
+    )
+    
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert "2 passed" in result.stdout
+
 if __name__ == "__main__":
     print("🚀 OpenCart Test Framework Structure Validation")
     print("=" * 50)
@@ -6,56 +6,166 @@ Author: Lucas Maidana
 
 import pytest
 import time
-from faker import Faker
+import requests
 from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
 
 from pages.frontend.home_page import HomePage
 from pages.frontend.cart_page import CartPage
 from config.settings import config
-from utils.driver_manager import get_driver
+from utils.cart_api import clear_cart
 from loguru import logger
 
 
-class TestShoppingCart:
+class CartTestBase:
     """
-    Test suite for shopping cart functionality
-    Tests cart operations, quantity management, and cart persistence
+    Shared setup and helpers for the cart test classes
+    
+    Explicit waits only: every cart change is awaited with WebDriverWait on
+    the DOM state it produces, so keep IMPLICIT_WAIT at its default of 0.
     """
     
+    # Upper bound for waiting on cart updates and alerts
+    UPDATE_TIMEOUT = 10  # seconds
+    
+    # Featured product titles, scraped once per class (the catalogue is static)
+    _product_titles = None
+    
     @pytest.fixture(autouse=True)
-    def setup(self):
-        """Setup test environment"""
-        self.driver = get_driver()
+    def setup(self, driver):
+        """
+        Setup test environment
+        
+        The pooled driver fixture keeps one browser per worker for the whole
+        session and clears cookies and storage after each test, which also
+        drops the guest cart.
+        """
+        self.driver = driver
         self.base_url = config.base_url
-        self.fake = Faker()
         
         # Initialize page objects
-        self.home_page = HomePage(self.driver)
+        self.home_page = HomePage(self.driver, self.base_url)
         self.cart_page = CartPage(self.driver)
         
-        # Navigate to home page and clear cart
-        self.driver.get(self.base_url)
-        self._clear_cart_if_needed()
-        
-        yield
+        # Set by helpers that add items; the driver reset after each test
+        # starts a new guest session, so every test begins with an empty cart
+        self._cart_dirty = False
         
-        # Cleanup - clear cart after each test
-        self._clear_cart_if_needed()
+        # Navigate to home page
+        self._goto()
         
-        if config.screenshot_on_failure:
-            self.driver.save_screenshot(f"{config.screenshots_dir}/cart_test_cleanup_{int(time.time())}.png")
+        # Failure screenshots are taken by the pytest_runtest_makereport hook
+        yield
     
     def _clear_cart_if_needed(self):
-        """Clear cart if it contains items"""
+        """
+        Clear cart if this test has added items to it
+        
+        Empties the cart over HTTP with the browser's session cookies and
+        only drives the cart page when the store can't be reached that way.
+        """
+        if not self._cart_dirty:
+            return
         try:
-            self.home_page.click_cart()
-            self.cart_page.navigate_to_cart(self.base_url)
+            cookies = {cookie['name']: cookie['value'] for cookie in self.driver.get_cookies()}
+            clear_cart(cookies, self.base_url)
+            self._cart_dirty = False
+            logger.info("Cart cleared")
+            # A cart page already on screen still shows the removed items
+            if "checkout/cart" in self.driver.current_url:
+                self.cart_page.navigate_to_cart(self.base_url)
+            return
+        except requests.RequestException as e:
+            logger.warning(f"HTTP cart cleanup failed, clearing in the browser: {e}")
+        try:
+            self._ensure_on_cart_page()
             if not self.cart_page.is_cart_empty():
                 self.cart_page.remove_all_items()
-                logger.info("Cart cleared for test setup")
+                logger.info("Cart cleared")
+            self._cart_dirty = False
         except Exception as e:
             logger.warning(f"Could not clear cart: {e}")
     
+    def _wait_for_success(self):
+        """Wait for the add-to-cart success alert"""
+        WebDriverWait(self.driver, self.UPDATE_TIMEOUT).until(
+            EC.visibility_of_element_located(HomePage.SUCCESS_ALERT)
+        )
+    
+    def _wait_for_cart_count(self, expected: int):
+        """Wait for the header cart to show the expected item count"""
+        self.home_page.wait_for_cart_count(expected, timeout=self.UPDATE_TIMEOUT)
+    
+    def _wait_for_cart_refresh(self, row, timeout: float = None):
+        """
+        Wait for the cart table to re-render after a row update or removal
+        
+        Args:
+            row: Cart row element located before the change
+            timeout: Wait bound, defaults to UPDATE_TIMEOUT
+        """
+        try:
+            WebDriverWait(self.driver, timeout or self.UPDATE_TIMEOUT).until(EC.staleness_of(row))
+        except TimeoutException:
+            logger.warning("Cart table was not re-rendered, reading current state")
+    
+    def _cart_count_is(self, expected: int, timeout: float = 2) -> bool:
+        """
+        Check the header cart count, waiting briefly for the header to render
+        
+        Args:
+            expected: Expected number of items
+            timeout: Wait bound in seconds
+            
+        Returns:
+            bool: True if the count matches within timeout
+        """
+        try:
+            return self.home_page.wait_for_cart_count(expected, timeout=timeout)
+        except TimeoutException:
+            return False
+    
+    def _update_quantity(self, item_index: int, quantity: int, timeout: float = None):
+        """Update an item's quantity and wait for the cart to reflect it"""
+        items = self.cart_page.get_cart_items()
+        self.cart_page.update_item_quantity(item_index, quantity, items)
+        self._wait_for_cart_refresh(items[item_index], timeout)
+    
+    def _goto(self, path: str = ""):
+        """
+        Open a store page unless the browser is already on it
+        
+        Args:
+            path: Path relative to the home URL, empty for the home page
+        """
+        url = f"{self.base_url.rstrip('/')}/{path}".rstrip('/')
+        if self.driver.current_url.rstrip('/') == url:
+            return
+        if path:
+            self.home_page.open_path(path)
+        else:
+            self.home_page.navigate_to_home()
+    
+    def _ensure_on_cart_page(self):
+        """Navigate to the cart page unless the browser is already on it"""
+        if "checkout/cart" not in self.driver.current_url:
+            self.cart_page.navigate_to_cart(self.base_url)
+    
+    def _get_product_titles(self) -> list:
+        """
+        Featured product titles, fetched from the home page on first use
+        
+        Returns:
+            list: Product titles shared by every test in the class
+        """
+        cls = type(self)
+        if cls._product_titles is None:
+            self._goto()
+            cls._product_titles = self.home_page.get_product_titles()
+        return cls._product_titles
+    
     def _add_sample_product_to_cart(self) -> str:
         """
         Add a sample product to cart and return product name
@@ -63,10 +173,10 @@ class TestShoppingCart:
         Returns:
             str: Name of added product
         """
-        self.driver.get(self.base_url)
+        self._goto()
         
         # Get first featured product name
-        product_titles = self.home_page.get_product_titles()
+        product_titles = self._get_product_titles()
         if not product_titles:
             pytest.skip("No featured products available for testing")
         
@@ -74,13 +184,42 @@ class TestShoppingCart:
         
         # Add first featured product to cart
         self.home_page.add_featured_product_to_cart(0)
+        self._cart_dirty = True
         
         # Wait for success message
-        time.sleep(2)
+        self._wait_for_success()
         
         logger.info(f"Added sample product to cart: {product_name}")
         return product_name
     
+    @pytest.fixture
+    def cart_with_one_item(self) -> str:
+        """
+        Cart page showing one sample product
+        
+        Returns:
+            str: Name of the product in the cart
+        """
+        product_name = self._add_sample_product_to_cart()
+        self._ensure_on_cart_page()
+        return product_name
+    
+    @pytest.fixture
+    def empty_cart(self):
+        """Cart page showing an empty cart"""
+        self._clear_cart_if_needed()
+        self._ensure_on_cart_page()
+
+
+class TestShoppingCart(CartTestBase):
+    """
+    Test suite for shopping cart functionality
+    Tests cart operations, quantity management, and cart persistence
+    """
+    
+    # Bound for cart updates with out-of-range quantities
+    EDGE_CASE_TIMEOUT = 5  # seconds
+    
     def test_add_product_to_cart(self):
         """
         Test Case 1: Add product to shopping cart
@@ -106,35 +245,29 @@ class TestShoppingCart:
         assert new_cart_count > initial_cart_count, "Cart count did not increase"
         
         # Navigate to cart and verify product is there
-        self.cart_page.navigate_to_cart(self.base_url)
+        self._ensure_on_cart_page()
         assert self.cart_page.validate_item_in_cart(product_name), f"Product '{product_name}' not found in cart"
         
         logger.info(f"✅ Product successfully added to cart: {product_name}")
     
-    def test_remove_product_from_cart(self):
+    def test_remove_product_from_cart(self, cart_with_one_item):
         """
         Test Case 2: Remove product from shopping cart
         
         Verify that products can be removed from cart
         """
         logger.info("=== Test Case 2: Remove Product from Cart ===")
-        
-        # First add a product
-        product_name = self._add_sample_product_to_cart()
-        
-        # Navigate to cart
-        self.cart_page.navigate_to_cart(self.base_url)
+        product_name = cart_with_one_item
         
         # Verify product is in cart
         initial_count = self.cart_page.get_cart_item_count()
         assert initial_count > 0, "Cart should contain items"
         assert self.cart_page.validate_item_in_cart(product_name), "Product not found in cart"
         
-        # Remove the product
-        self.cart_page.remove_item(0)
-        
-        # Wait for page update
-        time.sleep(2)
+        # Remove the product and wait for the cart to update
+        items = self.cart_page.get_cart_items()
+        self.cart_page.remove_item(0, items)
+        self._wait_for_cart_refresh(items[0])
         
         # Verify product was removed
         new_count = self.cart_page.get_cart_item_count()
@@ -146,7 +279,7 @@ class TestShoppingCart:
         
         logger.info("✅ Product successfully removed from cart")
     
-    def test_update_product_quantity(self):
+    def test_update_product_quantity(self, cart_with_one_item):
         """
         Test Case 3: Update product quantity in cart
         
@@ -154,22 +287,13 @@ class TestShoppingCart:
         """
         logger.info("=== Test Case 3: Update Product Quantity ===")
         
-        # Add product to cart
-        product_name = self._add_sample_product_to_cart()
-        
-        # Navigate to cart
-        self.cart_page.navigate_to_cart(self.base_url)
-        
         # Get initial quantity
         initial_quantity = self.cart_page.get_item_quantity(0)
         assert initial_quantity == 1, f"Expected initial quantity 1, got {initial_quantity}"
         
         # Update quantity to 3
         new_quantity = 3
-        self.cart_page.update_item_quantity(0, new_quantity)
-        
-        # Wait for update
-        time.sleep(3)
+        self._update_quantity(0, new_quantity)
         
         # Verify quantity was updated
         updated_quantity = self.cart_page.get_item_quantity(0)
@@ -183,7 +307,7 @@ class TestShoppingCart:
         
         logger.info(f"✅ Product quantity successfully updated to {new_quantity}")
     
-    def test_cart_totals_calculation(self):
+    def test_cart_totals_calculation(self, cart_with_one_item):
         """
         Test Case 4: Verify cart totals calculation
         
@@ -191,15 +315,8 @@ class TestShoppingCart:
         """
         logger.info("=== Test Case 4: Cart Totals Calculation ===")
         
-        # Add multiple products to cart
-        product_name = self._add_sample_product_to_cart()
-        
-        # Navigate to cart
-        self.cart_page.navigate_to_cart(self.base_url)
-        
         # Update quantity to test calculation
-        self.cart_page.update_item_quantity(0, 2)
-        time.sleep(3)
+        self._update_quantity(0, 2)
         
         # Get cart summary
         cart_summary = self.cart_page.get_cart_summary()
@@ -218,7 +335,7 @@ class TestShoppingCart:
         
         logger.info(f"✅ Cart totals calculated: Subtotal={subtotal}, Total={total}")
     
-    def test_empty_cart_state(self):
+    def test_empty_cart_state(self, empty_cart):
         """
         Test Case 5: Empty cart state and messages
         
@@ -226,11 +343,6 @@ class TestShoppingCart:
         """
         logger.info("=== Test Case 5: Empty Cart State ===")
         
-        # Ensure cart is empty
-        self.cart_page.navigate_to_cart(self.base_url)
-        if not self.cart_page.is_cart_empty():
-            self.cart_page.remove_all_items()
-        
         # Verify empty cart state
         assert self.cart_page.is_cart_empty(), "Cart should be empty"
         assert self.cart_page.get_cart_item_count() == 0, "Cart count should be 0"
@@ -257,27 +369,23 @@ class TestShoppingCart:
         
         # Navigate to different pages
         self.home_page.click_desktops_menu()
-        time.sleep(2)
         
-        # Check cart count persists
-        desktop_page_cart_count = self.home_page.get_cart_item_count()
-        assert desktop_page_cart_count == initial_cart_count, "Cart count not persisted on category page"
+        # Check cart count persists (one script per poll covers the header render)
+        assert self._cart_count_is(initial_cart_count), "Cart count not persisted on category page"
         
-        # Navigate back to home
+        # Navigate back to home (waits for the page itself)
         self.home_page.navigate_to_home()
-        time.sleep(2)
         
         # Check cart count still persists
-        home_page_cart_count = self.home_page.get_cart_item_count()
-        assert home_page_cart_count == initial_cart_count, "Cart count not persisted on home page"
+        assert self._cart_count_is(initial_cart_count), "Cart count not persisted on home page"
         
         # Verify in cart page
-        self.cart_page.navigate_to_cart(self.base_url)
+        self._ensure_on_cart_page()
         assert self.cart_page.validate_item_in_cart(product_name), "Product not persisted in cart"
         
         logger.info("✅ Cart persistence verified across page navigation")
     
-    def test_continue_shopping_functionality(self):
+    def test_continue_shopping_functionality(self, cart_with_one_item):
         """
         Test Case 7: Continue shopping from cart
         
@@ -285,10 +393,6 @@ class TestShoppingCart:
         """
         logger.info("=== Test Case 7: Continue Shopping ===")
         
-        # Add product and go to cart
-        self._add_sample_product_to_cart()
-        self.cart_page.navigate_to_cart(self.base_url)
-        
         # Click continue shopping
         self.cart_page.continue_shopping()
         
@@ -312,22 +416,24 @@ class TestShoppingCart:
         logger.info("=== Test Case 8: Multiple Products in Cart ===")
         
         # Get available products
-        self.driver.get(self.base_url)
-        product_titles = self.home_page.get_product_titles()
+        self._goto()
+        product_titles = self._get_product_titles()
         
         if len(product_titles) < 2:
             pytest.skip("Need at least 2 products for this test")
         
         # Add multiple products
+        initial_cart_count = self.home_page.get_cart_item_count()
         self.home_page.add_featured_product_to_cart(0)
-        time.sleep(2)
+        self._cart_dirty = True
+        self._wait_for_cart_count(initial_cart_count + 1)
         
         if len(product_titles) > 1:
             self.home_page.add_featured_product_to_cart(1)
-            time.sleep(2)
+            self._wait_for_cart_count(initial_cart_count + 2)
         
         # Navigate to cart
-        self.cart_page.navigate_to_cart(self.base_url)
+        self._ensure_on_cart_page()
         
         # Verify multiple items in cart
         cart_count = self.cart_page.get_cart_item_count()
@@ -339,7 +445,7 @@ class TestShoppingCart:
         
         logger.info(f"✅ Multiple products in cart verified: {cart_count} items")
     
-    def test_cart_quantity_edge_cases(self):
+    def test_cart_quantity_edge_cases(self, cart_with_one_item):
         """
         Test Case 9: Cart quantity edge cases
         
@@ -347,29 +453,23 @@ class TestShoppingCart:
         """
         logger.info("=== Test Case 9: Quantity Edge Cases ===")
         
-        # Add product to cart
-        self._add_sample_product_to_cart()
-        self.cart_page.navigate_to_cart(self.base_url)
-        
-        # Test very large quantity
+        # Test very large quantity (the store answers quickly or not at all)
         large_quantity = 999
-        self.cart_page.update_item_quantity(0, large_quantity)
-        time.sleep(3)
+        self._update_quantity(0, large_quantity, timeout=self.EDGE_CASE_TIMEOUT)
         
         # Check if large quantity was accepted or limited
         updated_quantity = self.cart_page.get_item_quantity(0)
         logger.info(f"Large quantity test: Requested={large_quantity}, Got={updated_quantity}")
         
         # Test zero quantity (should remove item)
-        self.cart_page.update_item_quantity(0, 0)
-        time.sleep(3)
+        self._update_quantity(0, 0, timeout=self.EDGE_CASE_TIMEOUT)
         
         # Verify item was removed or quantity handled appropriately
-        try:
+        if self.cart_page.is_cart_empty():
+            logger.info("Zero quantity removed item from cart (expected behavior)")
+        else:
             final_quantity = self.cart_page.get_item_quantity(0)
             logger.info(f"Zero quantity test: Final quantity={final_quantity}")
-        except IndexError:
-            logger.info("Zero quantity removed item from cart (expected behavior)")
         
         logger.info("✅ Quantity edge cases tested")
     
@@ -382,7 +482,7 @@ class TestShoppingCart:
         logger.info("=== Test Case 10: Cart Error Handling ===")
         
         # Test accessing cart page directly when empty
-        self.cart_page.navigate_to_cart(self.base_url)
+        self._ensure_on_cart_page()
         assert self.cart_page.is_cart_page_loaded(), "Cart page should load even when empty"
         
         # Test removing non-existent item (should handle gracefully)
@@ -397,12 +497,11 @@ class TestShoppingCart:
         
         # Test invalid quantity updates
         self._add_sample_product_to_cart()
-        self.cart_page.navigate_to_cart(self.base_url)
+        self._ensure_on_cart_page()
         
         # Try negative quantity (should be handled gracefully)
         try:
-            self.cart_page.update_item_quantity(0, -1)
-            time.sleep(2)
+            self._update_quantity(0, -1)
             quantity = self.cart_page.get_item_quantity(0)
             assert quantity >= 0, "Negative quantity should not be allowed"
         except Exception as e:
@@ -411,19 +510,9 @@ class TestShoppingCart:
         logger.info("✅ Error handling tested")
 
 
-class TestCartPerformance:
+class TestCartPerformance(CartTestBase):
     """Performance testing for cart operations"""
     
-    @pytest.fixture(autouse=True)
-    def setup(self):
-        """Setup performance test environment"""
-        self.driver = get_driver()
-        self.base_url = config.base_url
-        self.home_page = HomePage(self.driver)
-        self.cart_page = CartPage(self.driver)
-        
-        yield
-    
     def test_cart_operation_performance(self):
         """
         Test performance of cart operations
@@ -432,11 +521,15 @@ class TestCartPerformance:
         """
         logger.info("=== Cart Performance Test ===")
         
-        self.driver.get(self.base_url)
+        self._goto()
         
-        # Measure add to cart performance
+        # Measure add to cart performance, up to the success alert
         start_time = time.time()
         self.home_page.add_featured_product_to_cart(0)
+        self._cart_dirty = True
+        WebDriverWait(self.driver, 5).until(
+            EC.visibility_of_element_located(HomePage.SUCCESS_ALERT)
+        )
         add_time = time.time() - start_time
         
         # Add to cart should be fast (< 5 seconds)
@@ -4,81 +4,140 @@ Comprehensive testing of OpenCart login/logout functionality
 Author: Lucas Maidana
 """
 
+import re
 import pytest
-import time
-from faker import Faker
-from selenium.webdriver.common.by import By
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from selenium.common.exceptions import WebDriverException
 
 from pages.frontend.home_page import HomePage
 from pages.frontend.registration_page import RegistrationPage
+from pages.frontend.login_page import LoginPage
 from config.settings import config, customer_data
-from utils.driver_manager import get_driver
+from utils.account_api import login_customer, post_login
+from utils.cart_api import cart_session, REQUEST_TIMEOUT
 from loguru import logger
 
 
-class TestUserAuthentication:
+class AuthTestBase:
     """
-    Test suite for user authentication functionality
-    Tests login, logout, session management, and security features
+    Shared setup and helpers for the browser authentication test classes
+    
+    The suite is split by area so reports group related checks; the classes
+    carry no xdist_group, so under loadgroup their tests still spread across
+    workers one by one.
     """
     
+    # Failed logins sent before checking for throttling
+    THROTTLE_ATTEMPTS = 5
+    
+    # Anything the login form may use to report an error
+    LOGIN_ERROR_CSS = ".alert.alert-danger, .text-danger, [class*='error'], [class*='warning']"
+    
+    # Whether any element matching a CSS selector is displayed (argument: selector)
+    VISIBLE_ERROR_SCRIPT = """
+        return Array.from(document.querySelectorAll(arguments[0])).some(function (element) {
+            return element.getClientRects().length > 0;
+        });
+    """
+    
+    # Only rendered for logged-in customers (the account menu's logout link)
+    LOGGED_IN_MARKER = "route=account/logout"
+    
+    # Throttling indicators, matched against the login page's warning alerts
+    THROTTLING_PATTERN = re.compile(
+        "too many attempts|account locked|rate limit|captcha|temporarily disabled|try again later",
+        re.IGNORECASE
+    )
+    
     @pytest.fixture(autouse=True)
-    def setup(self):
-        """Setup test environment"""
-        self.driver = get_driver()
+    def setup(self, driver):
+        """
+        Setup test environment
+        
+        Runs on the pooled driver fixture: one browser per xdist worker,
+        whose cookies are cleared after each test, which also logs out.
+        """
+        self.driver = driver
         self.base_url = config.base_url
-        self.fake = Faker()
         
         # Initialize page objects
-        self.home_page = HomePage(self.driver)
+        self.home_page = HomePage(self.driver, self.base_url)
         self.registration_page = RegistrationPage(self.driver)
+        self.login_page = LoginPage(self.driver)
         
-        # Navigate to home page
-        self.driver.get(self.base_url)
+        # No home page load here: every test opens the page it needs
+        # directly, so it would only be a second navigation
         
+        # Failure screenshots come from the pytest_runtest_makereport hook
         yield
+    
+    def _login_user(self, user_data: dict):
+        """
+        Log in an already registered user
         
-        # Cleanup - ensure user is logged out
+        Logs in over HTTP and hands the session cookies to the browser;
+        falls back to the login form if the store refuses or can't be reached.
+        """
         try:
-            if self.home_page.is_user_logged_in():
-                self.home_page.click_logout()
-        except:
-            pass
-        
-        if config.screenshot_on_failure:
-            self.driver.save_screenshot(f"{config.screenshots_dir}/auth_test_cleanup_{int(time.time())}.png")
+            cookies = login_customer(user_data['email'], user_data['password'], self.base_url)
+        except requests.RequestException as e:
+            logger.warning(f"HTTP login failed, using the login form: {e}")
+            cookies = {}
+        
+        if not cookies:
+            self.home_page.click_login()
+            self._perform_login(user_data['email'], user_data['password'])
+            return
+        
+        # Cookies can only be set for the domain of the current page
+        if not self.driver.current_url.startswith(self.base_url):
+            self.driver.get(self.base_url)
+        for name, value in cookies.items():
+            self.driver.add_cookie({'name': name, 'value': value})
+        self.home_page.navigate_to_home()
+    
+    def _perform_login(self, email: str, password: str, remember_me: bool = False):
+        """Perform login with given credentials"""
+        self.login_page.login(email, password, remember_me)
+    
+    def _check_for_login_error(self) -> bool:
+        """Check if a login or validation error message is displayed"""
+        try:
+            return bool(self.driver.execute_script(self.VISIBLE_ERROR_SCRIPT, self.LOGIN_ERROR_CSS))
+        except WebDriverException:
+            return False
+    
+    def _check_for_throttling_indicators(self) -> bool:
+        """Check the login page's warning alerts for throttling indicators"""
+        try:
+            warnings = self.login_page.get_warning_messages()
+        except WebDriverException:
+            return False
+        return any(self.THROTTLING_PATTERN.search(warning) for warning in warnings)
+    
+    def _check_remember_me_option(self) -> bool:
+        """Check if remember me option exists"""
+        return self.login_page.has_remember_me_option()
+
+
+class TestLogin(AuthTestBase):
+    """
+    Test suite for the customer login form
+    Tests successful login, form validation and remember me
+    """
     
     @pytest.mark.smoke
-    def test_successful_login_with_valid_credentials(self):
+    def test_successful_login_with_valid_credentials(self, registered_user):
         """
         Test Case 1: Successful login with valid credentials
         
         Verify that registered users can log in successfully
         """
         logger.info("=== Test Case 1: Successful Login ===")
+        user_data = registered_user
         
-        # First register a user
-        user_data = {
-            'firstname': self.fake.first_name(),
-            'lastname': self.fake.last_name(),
-            'email': self.fake.email(),
-            'telephone': self.fake.phone_number()[:15],
-            'password': 'TestPassword123!',
-            'confirm_password': 'TestPassword123!',
-            'newsletter': True
-        }
-        
-        # Register user
-        self.home_page.click_register()
-        self.registration_page.complete_registration(user_data)
-        assert self.registration_page.is_registration_successful(), "Registration failed"
-        
-        # Logout
-        self.driver.get(self.base_url)
-        if self.home_page.is_user_logged_in():
-            self.home_page.click_logout()
-        
-        # Now test login
+        # Test login
         self.home_page.click_login()
         
         # Verify we're on login page
@@ -90,41 +149,74 @@ class TestUserAuthentication:
         
         # Verify successful login
         self.driver.get(self.base_url)
-        assert self.home_page.is_user_logged_in(), "User not logged in after successful login"
+        assert self.home_page.wait_for_login_state(True), "User not logged in after successful login"
         
         logger.info(f"✅ User successfully logged in: {user_data['email']}")
     
-    def test_failed_login_with_invalid_credentials(self):
+    def test_login_form_validation(self):
         """
-        Test Case 2: Failed login with invalid credentials
+        Test Case 5: Login form validation
         
-        Verify that login fails with incorrect credentials
+        Verify that login form validates required fields
         """
-        logger.info("=== Test Case 2: Failed Login with Invalid Credentials ===")
+        logger.info("=== Test Case 5: Login Form Validation ===")
         
-        # Navigate to login page
         self.home_page.click_login()
         
-        # Try login with invalid credentials
-        invalid_email = "nonexistent@example.com"
-        invalid_password = "wrongpassword123"
+        # Test empty form submission
+        self._perform_login("", "")
+        
+        # Should show validation errors or not process login
+        validation_working = self._check_for_login_error() or not self.home_page.is_user_logged_in()
+        assert validation_working, "Form should validate empty fields"
         
-        self._perform_login(invalid_email, invalid_password)
+        # Test invalid email format
+        self._perform_login("invalid-email", "password123")
         
-        # Verify login failed
-        self.driver.get(self.base_url)
-        assert not self.home_page.is_user_logged_in(), "Login should have failed"
+        # Should show email validation error or fail login
+        email_validation_working = self._check_for_login_error() or not self.home_page.is_user_logged_in()
+        logger.info(f"Email validation working: {email_validation_working}")
         
-        # Check for error message on login page
-        current_url = self.driver.current_url
-        if "login" in current_url.lower():
-            # Should show error message
-            error_present = self._check_for_login_error()
-            logger.info(f"Login error message present: {error_present}")
+        logger.info("✅ Login form validation tested")
+    
+    def test_remember_me_functionality(self, request):
+        """
+        Test Case 8: Remember me functionality (if available)
         
-        logger.info("✅ Login correctly failed with invalid credentials")
+        Verify remember me checkbox behavior
+        """
+        logger.info("=== Test Case 8: Remember Me Functionality ===")
+        
+        self.home_page.click_login()
+        
+        # Check if remember me option exists
+        remember_me_exists = self._check_remember_me_option()
+        
+        if remember_me_exists:
+            logger.info("Remember me option found - testing functionality")
+            
+            # Login the session user with remember me (registered on first use)
+            user_data = request.getfixturevalue("registered_user")
+            self._perform_login(user_data['email'], user_data['password'], remember_me=True)
+            
+            # Verify login successful
+            assert self.home_page.wait_for_login_state(True), "Login with remember me failed"
+            
+            # Test session persistence (would require browser restart to fully test)
+            logger.info("Remember me option tested (full test requires browser restart)")
+        else:
+            logger.info("Remember me option not found - skipping test")
+        
+        logger.info("✅ Remember me functionality tested")
+
+
+class TestSession(AuthTestBase):
+    """
+    Test suite for customer sessions
+    Tests logout and session persistence across pages
+    """
     
-    def test_logout_functionality(self):
+    def test_logout_functionality(self, registered_user):
         """
         Test Case 3: Logout functionality
         
@@ -133,30 +225,32 @@ class TestUserAuthentication:
         logger.info("=== Test Case 3: Logout Functionality ===")
         
         # First login a user
-        user_data = self._create_and_login_user()
+        self._login_user(registered_user)
         
         # Verify user is logged in
-        assert self.home_page.is_user_logged_in(), "User should be logged in"
+        assert self.home_page.wait_for_login_state(True), "User should be logged in"
         
         # Logout
         self.home_page.click_logout()
         
         # Verify logout successful
-        assert not self.home_page.is_user_logged_in(), "User should be logged out"
+        assert self.home_page.wait_for_login_state(False), "User should be logged out"
         
-        # Try to access account page directly (should redirect to login)
+        # Try to access account page directly (should redirect to login);
+        # the redirect's headers are enough, so skip the browser and the body
         account_url = f"{self.base_url}/index.php?route=account/account"
-        self.driver.get(account_url)
+        cookies = {cookie['name']: cookie['value'] for cookie in self.driver.get_cookies()}
+        with cart_session(cookies) as session:
+            response = session.head(account_url, allow_redirects=False, timeout=REQUEST_TIMEOUT)
         
-        # Should be redirected to login or show login required message
-        current_url = self.driver.current_url
-        page_requires_login = "login" in current_url.lower() or self._check_login_required_message()
+        # Should be redirected to login
+        page_requires_login = response.is_redirect and "login" in response.headers.get("Location", "")
         
-        assert page_requires_login, "Should require login to access account page"
+        assert page_requires_login, f"Should require login to access account page (HTTP {response.status_code})"
         
         logger.info("✅ Logout functionality working correctly")
     
-    def test_session_persistence(self):
+    def test_session_persistence(self, registered_user):
         """
         Test Case 4: Session persistence across page navigation
         
@@ -165,8 +259,8 @@ class TestUserAuthentication:
         logger.info("=== Test Case 4: Session Persistence ===")
         
         # Login user
-        user_data = self._create_and_login_user()
-        assert self.home_page.is_user_logged_in(), "User should be logged in"
+        self._login_user(registered_user)
+        assert self.home_page.wait_for_login_state(True), "User should be logged in"
         
         # Navigate to different pages
         pages_to_test = [
@@ -175,41 +269,31 @@ class TestUserAuthentication:
             f"{self.base_url}/index.php?route=product/search"  # Search page
         ]
         
-        for page_url in pages_to_test:
-            self.driver.get(page_url)
-            time.sleep(2)  # Wait for page load
-            
-            # Verify still logged in
-            is_logged_in = self.home_page.is_user_logged_in()
-            assert is_logged_in, f"Session lost on page: {page_url}"
-        
-        logger.info("✅ Session persistence working correctly")
-    
-    def test_login_form_validation(self):
-        """
-        Test Case 5: Login form validation
-        
-        Verify that login form validates required fields
-        """
-        logger.info("=== Test Case 5: Login Form Validation ===")
+        # The session lives in the store cookie: fetch the pages concurrently
+        # with the browser's cookies instead of rendering each one
+        cookies = {cookie['name']: cookie['value'] for cookie in self.driver.get_cookies()}
         
-        self.home_page.click_login()
+        def fetch(page_url):
+            with cart_session(cookies) as session:
+                response = session.get(page_url, timeout=REQUEST_TIMEOUT)
+                response.raise_for_status()
+                return response
         
-        # Test empty form submission
-        self._perform_login("", "")
-        
-        # Should show validation errors or not process login
-        validation_working = self._check_for_validation_errors() or not self.home_page.is_user_logged_in()
-        assert validation_working, "Form should validate empty fields"
-        
-        # Test invalid email format
-        self._perform_login("invalid-email", "password123")
+        with ThreadPoolExecutor(max_workers=len(pages_to_test)) as executor:
+            responses = list(executor.map(fetch, pages_to_test))
         
-        # Should show email validation error or fail login
-        email_validation_working = self._check_for_email_validation_error() or not self.home_page.is_user_logged_in()
-        logger.info(f"Email validation working: {email_validation_working}")
+        for page_url, response in zip(pages_to_test, responses):
+            # Verify still logged in
+            assert self.LOGGED_IN_MARKER in response.text, f"Session lost on page: {page_url}"
         
-        logger.info("✅ Login form validation tested")
+        logger.info("✅ Session persistence working correctly")
+
+
+class TestLoginSecurity(AuthTestBase):
+    """
+    Test suite for login security features
+    Tests password masking and login attempt throttling
+    """
     
     def test_password_field_security(self):
         """
@@ -222,21 +306,16 @@ class TestUserAuthentication:
         self.home_page.click_login()
         
         # Check password field type
-        try:
-            password_field = self.driver.find_element(By.ID, "input-password")
-            field_type = password_field.get_attribute("type")
-            assert field_type == "password", f"Password field should be type 'password', got '{field_type}'"
-            
-            # Enter password and verify it's masked
-            password_field.send_keys("testpassword123")
-            displayed_value = password_field.get_attribute("value")
-            
-            # Note: In most browsers, the actual password value is still retrievable via JavaScript
-            # The security is in the visual masking, not in hiding the value from automation
-            logger.info(f"Password field type: {field_type}")
-            
-        except Exception as e:
-            logger.warning(f"Could not test password field: {e}")
+        field_type = self.login_page.get_password_field_type()
+        assert field_type == "password", f"Password field should be type 'password', got '{field_type}'"
+        
+        # Enter password and verify it's masked
+        self.login_page.enter_text(LoginPage.PASSWORD_INPUT, "testpassword123", use_keyboard=True)
+        displayed_value = self.login_page.get_element_attribute(LoginPage.PASSWORD_INPUT, "value")
+        
+        # Note: In most browsers, the actual password value is still retrievable via JavaScript
+        # The security is in the visual masking, not in hiding the value from automation
+        logger.info(f"Password field type: {field_type}")
         
         logger.info("✅ Password field security tested")
     
@@ -248,13 +327,23 @@ class TestUserAuthentication:
         """
         logger.info("=== Test Case 7: Login Attempt Throttling ===")
         
-        self.home_page.click_login()
+        email, password = "test@example.com", "wrongpassword"
         
-        # Attempt multiple failed logins
-        for attempt in range(5):
-            logger.info(f"Login attempt {attempt + 1}")
-            self._perform_login("test@example.com", "wrongpassword")
-            time.sleep(1)
+        # Attempt multiple failed logins concurrently over HTTP; the browser
+        # adds nothing to what the rate limiter sees
+        logger.info(f"Sending {self.THROTTLE_ATTEMPTS} concurrent failed logins")
+        try:
+            with ThreadPoolExecutor(max_workers=self.THROTTLE_ATTEMPTS) as executor:
+                list(executor.map(
+                    lambda _: login_customer(email, password, self.base_url),
+                    range(self.THROTTLE_ATTEMPTS)
+                ))
+        except requests.RequestException as e:
+            logger.warning(f"HTTP login attempts failed: {e}")
+        
+        # One more attempt through the form shows the store's response
+        self.home_page.click_login()
+        self._perform_login(email, password)
         
         # Check if throttling is in effect
         # This could manifest as:
@@ -268,165 +357,35 @@ class TestUserAuthentication:
         
         # Note: Some systems may not implement throttling, which is a security finding
         logger.info("✅ Login throttling tested")
+
+
+class TestUserAuthHttp:
+    """
+    Authentication checks that only need the store's HTTP responses
+    Takes no driver fixture, so no browser is acquired for these tests
+    """
+    
+    # OpenCart's warning for an unknown email or wrong password
+    LOGIN_MISMATCH_WARNING = "No match for E-Mail Address and/or Password"
     
-    def test_remember_me_functionality(self):
+    def test_failed_login_with_invalid_credentials(self):
         """
-        Test Case 8: Remember me functionality (if available)
+        Test Case 2: Failed login with invalid credentials
         
-        Verify remember me checkbox behavior
+        Verify that login fails with incorrect credentials
         """
-        logger.info("=== Test Case 8: Remember Me Functionality ===")
-        
-        self.home_page.click_login()
-        
-        # Check if remember me option exists
-        remember_me_exists = self._check_remember_me_option()
-        
-        if remember_me_exists:
-            logger.info("Remember me option found - testing functionality")
-            
-            # Create and login user with remember me
-            user_data = self._create_test_user()
-            self._perform_login(user_data['email'], user_data['password'], remember_me=True)
-            
-            # Verify login successful
-            assert self.home_page.is_user_logged_in(), "Login with remember me failed"
-            
-            # Test session persistence (would require browser restart to fully test)
-            logger.info("Remember me option tested (full test requires browser restart)")
-        else:
-            logger.info("Remember me option not found - skipping test")
+        logger.info("=== Test Case 2: Failed Login with Invalid Credentials ===")
         
-        logger.info("✅ Remember me functionality tested")
-    
-    # Helper methods
-    
-    def _create_test_user(self) -> dict:
-        """Create a test user and return user data"""
-        user_data = {
-            'firstname': self.fake.first_name(),
-            'lastname': self.fake.last_name(),
-            'email': self.fake.email(),
-            'telephone': self.fake.phone_number()[:15],
-            'password': 'TestPassword123!',
-            'confirm_password': 'TestPassword123!',
-            'newsletter': True
-        }
-        
-        # Register user
-        self.home_page.click_register()
-        self.registration_page.complete_registration(user_data)
-        assert self.registration_page.is_registration_successful(), "User registration failed"
-        
-        return user_data
-    
-    def _create_and_login_user(self) -> dict:
-        """Create a test user and log them in"""
-        user_data = self._create_test_user()
+        # A fresh address each run: repeated failures for one email trip
+        # OpenCart's login attempt lockout, which changes the warning
+        invalid_email = RegistrationPage.generate_unique_email("nonexistent")
+        invalid_password = "wrongpassword123"
         
-        # Logout if already logged in
-        self.driver.get(self.base_url)
-        if self.home_page.is_user_logged_in():
-            self.home_page.click_logout()
+        with requests.Session() as session:
+            response = post_login(session, invalid_email, invalid_password, config.base_url)
         
-        # Login
-        self.home_page.click_login()
-        self._perform_login(user_data['email'], user_data['password'])
+        # Verify login failed
+        assert "account/account" not in response.url, "Login should have failed"
+        assert self.LOGIN_MISMATCH_WARNING in response.text, "Login error message not shown"
         
-        return user_data
-    
-    def _perform_login(self, email: str, password: str, remember_me: bool = False):
-        """Perform login with given credentials"""
-        try:
-            # Find and fill email field
-            email_field = self.driver.find_element(By.ID, "input-email")
-            email_field.clear()
-            email_field.send_keys(email)
-            
-            # Find and fill password field
-            password_field = self.driver.find_element(By.ID, "input-password")
-            password_field.clear()
-            password_field.send_keys(password)
-            
-            # Handle remember me if requested and available
-            if remember_me:
-                try:
-                    remember_checkbox = self.driver.find_element(By.NAME, "remember")
-                    if not remember_checkbox.is_selected():
-                        remember_checkbox.click()
-                except:
-                    pass  # Remember me not available
-            
-            # Submit form
-            login_button = self.driver.find_element(By.CSS_SELECTOR, "input[type='submit'][value='Login']")
-            login_button.click()
-            
-            # Wait for response
-            time.sleep(3)
-            
-        except Exception as e:
-            logger.error(f"Error performing login: {e}")
-    
-    def _check_for_login_error(self) -> bool:
-        """Check if login error message is displayed"""
-        try:
-            error_selectors = [
-                ".alert.alert-danger",
-                ".text-danger",
-                "[class*='error']",
-                "[class*='warning']"
-            ]
-            
-            for selector in error_selectors:
-                elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                if elements and any(elem.is_displayed() for elem in elements):
-                    return True
-            return False
-        except:
-            return False
-    
-    def _check_for_validation_errors(self) -> bool:
-        """Check for form validation errors"""
-        return self._check_for_login_error()
-    
-    def _check_for_email_validation_error(self) -> bool:
-        """Check for email-specific validation error"""
-        return self._check_for_login_error()
-    
-    def _check_login_required_message(self) -> bool:
-        """Check if page shows login required message"""
-        try:
-            page_text = self.driver.page_source.lower()
-            login_indicators = [
-                "login required", 
-                "please login", 
-                "access denied",
-                "authentication required"
-            ]
-            return any(indicator in page_text for indicator in login_indicators)
-        except:
-            return False
-    
-    def _check_for_throttling_indicators(self) -> bool:
-        """Check for login throttling indicators"""
-        try:
-            page_source = self.driver.page_source.lower()
-            throttling_indicators = [
-                "too many attempts",
-                "account locked",
-                "rate limit",
-                "captcha",
-                "temporarily disabled",
-                "try again later"
-            ]
-            return any(indicator in page_source for indicator in throttling_indicators)
-        except:
-            return False
-    
-    def _check_remember_me_option(self) -> bool:
-        """Check if remember me option exists"""
-        try:
-            remember_checkbox = self.driver.find_element(By.NAME, "remember")
-            return remember_checkbox.is_displayed()
-        except:
-            return False
\ No newline at end of file
+        logger.info("✅ Login correctly failed with invalid credentials")
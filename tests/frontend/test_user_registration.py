@@ -6,13 +6,11 @@ Author: Lucas Maidana
 
 import pytest
 import time
-from faker import Faker
 from selenium.webdriver.common.by import By
 
 from pages.frontend.home_page import HomePage
 from pages.frontend.registration_page import RegistrationPage
 from config.settings import config, customer_data
-from utils.driver_manager import get_driver
 from loguru import logger
 
 
@@ -23,28 +21,31 @@ class TestUserRegistration:
     """
     
     @pytest.fixture(autouse=True)
-    def setup(self):
-        """Setup test environment"""
-        self.driver = get_driver()
+    def setup(self, driver, test_data_pool):
+        """
+        Setup test environment
+        
+        Runs on the pooled driver fixture: one browser per xdist worker,
+        whose cookies and storage are cleared after each test, which also
+        logs out the customer each registration signs in.
+        """
+        self.driver = driver
         self.base_url = config.base_url
-        self.fake = Faker()
+        self.test_data_pool = test_data_pool
         
         # Initialize page objects
-        self.home_page = HomePage(self.driver)
+        self.home_page = HomePage(self.driver, self.base_url)
         self.registration_page = RegistrationPage(self.driver)
         
-        # Navigate to home page
-        self.driver.get(self.base_url)
+        # No home page load here: every test opens the page it needs
+        # directly, so it would only be a second navigation
         
+        # Failure screenshots come from the pytest_runtest_makereport hook
         yield
-        
-        # Cleanup
-        if config.screenshot_on_failure:
-            self.driver.save_screenshot(f"{config.screenshots_dir}/test_cleanup_{int(time.time())}.png")
     
     def generate_test_user_data(self, **overrides) -> dict:
         """
-        Generate test user data with faker
+        Generate test user data from the session's pre-generated records
         
         Args:
             **overrides: Override specific fields
@@ -52,13 +53,14 @@ class TestUserRegistration:
         Returns:
             dict: User data for registration
         """
+        user = next(self.test_data_pool)['user']
         user_data = {
-            'firstname': self.fake.first_name(),
-            'lastname': self.fake.last_name(),
-            'email': self.fake.email(),
-            'telephone': self.fake.phone_number()[:15],  # Limit length
-            'password': 'TestPassword123!',
-            'confirm_password': 'TestPassword123!',
+            'firstname': user['firstname'],
+            'lastname': user['lastname'],
+            'email': RegistrationPage.generate_unique_email(),
+            'telephone': user['telephone'],
+            'password': user['password'],
+            'confirm_password': user['password'],
             'newsletter': True
         }
         
@@ -93,7 +95,7 @@ class TestUserRegistration:
         
         logger.info(f"✅ User successfully registered: {user_data['email']}")
     
-    def test_registration_with_existing_email(self):
+    def test_registration_with_existing_email(self, registered_user):
         """
         Test Case 2: Registration with existing email address
         
@@ -101,25 +103,14 @@ class TestUserRegistration:
         """
         logger.info("=== Test Case 2: Registration with Existing Email ===")
         
-        # First registration
-        user_data_1 = self.generate_test_user_data()
-        
-        self.home_page.click_register()
-        self.registration_page.complete_registration(user_data_1)
-        assert self.registration_page.is_registration_successful(), "First registration failed"
-        
-        # Logout if logged in
-        self.driver.get(self.base_url)
-        if self.home_page.is_user_logged_in():
-            self.home_page.click_logout()
-        
-        # Second registration with same email
-        user_data_2 = self.generate_test_user_data(
-            email=user_data_1['email']  # Use same email
+        # The session test user is already registered, so no first
+        # registration (and logout) is needed here
+        duplicate_user_data = self.generate_test_user_data(
+            email=registered_user['email']  # Use same email
         )
         
         self.home_page.click_register()
-        self.registration_page.complete_registration(user_data_2)
+        self.registration_page.complete_registration(duplicate_user_data)
         
         # Verify registration fails
         assert not self.registration_page.is_registration_successful(), "Registration should have failed"
@@ -145,10 +136,10 @@ class TestUserRegistration:
         # Test 1: Submit empty form
         self.registration_page.submit_registration()
         
-        # Verify validation errors
-        assert self.registration_page.has_validation_errors(), "Expected validation errors for empty form"
+        # Verify validation errors (one read for every error on the page)
+        errors = self.registration_page.get_form_snapshot()['errors']
+        assert errors, "Expected validation errors for empty form"
         
-        errors = self.registration_page.get_all_validation_errors()
         expected_fields = ['firstname', 'lastname', 'email', 'telephone', 'password']
         
         for field in expected_fields:
@@ -162,8 +153,8 @@ class TestUserRegistration:
         self.registration_page.complete_registration(invalid_user_data)
         
         # Should have email validation error
-        email_error = self.registration_page.get_email_error()
-        assert email_error or not self.registration_page.is_registration_successful(), \
+        snapshot = self.registration_page.get_form_snapshot()
+        assert 'email' in snapshot['errors'] or not snapshot['success'], \
             "Expected email format validation"
         
         logger.info("✅ Email format validation working correctly")
@@ -176,8 +167,8 @@ class TestUserRegistration:
         self.registration_page.complete_registration(password_mismatch_data)
         
         # Should have password confirmation error
-        password_error = self.registration_page.get_confirm_password_error()
-        assert password_error or not self.registration_page.is_registration_successful(), \
+        snapshot = self.registration_page.get_form_snapshot()
+        assert 'confirm_password' in snapshot['errors'] or not snapshot['success'], \
             "Expected password mismatch validation"
         
         logger.info("✅ Password confirmation validation working correctly")
@@ -259,69 +250,61 @@ class TestUserRegistration:
         
         logger.info("✅ Privacy policy requirement working correctly")
     
-    def test_password_strength_requirements(self):
+    @pytest.mark.parametrize("weak_password", [
+        "123",          # Too short
+        "password",     # Too common
+        "12345678",     # No letters
+        "abcdefgh",     # No numbers
+    ])
+    def test_password_strength_requirements(self, weak_password):
         """
         Test Case 7: Password strength validation
         
-        Verify password strength requirements are enforced
+        Verify password strength requirements are enforced, one weak
+        password per case so xdist can spread them across workers
         """
-        logger.info("=== Test Case 7: Password Strength ===")
+        logger.info(f"=== Test Case 7: Password Strength ({weak_password}) ===")
         
         self.home_page.click_register()
         
-        # Test weak passwords
-        weak_passwords = [
-            "123",          # Too short
-            "password",     # Too common
-            "12345678",     # No letters
-            "abcdefgh"      # No numbers
-        ]
+        user_data = self.generate_test_user_data(
+            password=weak_password,
+            confirm_password=weak_password
+        )
+        self.registration_page.complete_registration(user_data)
         
-        for weak_password in weak_passwords:
-            logger.info(f"Testing weak password: {weak_password}")
-            
-            user_data = self.generate_test_user_data(
-                password=weak_password,
-                confirm_password=weak_password
-            )
-            
-            self.registration_page.clear_all_fields()
-            self.registration_page.complete_registration(user_data)
-            
-            # Check if registration fails or password error appears
-            success = self.registration_page.is_registration_successful()
-            password_error = self.registration_page.get_password_error()
-            
-            if success:
-                logger.warning(f"Weak password '{weak_password}' was accepted")
-            else:
-                logger.info(f"Weak password '{weak_password}' correctly rejected")
+        # Check if registration fails or password error appears
+        snapshot = self.registration_page.get_form_snapshot()
+        
+        if snapshot['success']:
+            logger.warning(f"Weak password '{weak_password}' was accepted")
+        else:
+            logger.info(f"Weak password '{weak_password}' correctly rejected: {snapshot['errors']}")
         
         logger.info("✅ Password strength testing completed")
     
-    def test_registration_form_field_limits(self):
+    @pytest.mark.parametrize("field, long_value", [
+        ("firstname", "A" * 100),               # Very long first name
+        ("lastname", "B" * 100),                # Very long last name
+        ("email", "c" * 50 + "@example.com"),   # Long email
+        ("telephone", "1" * 50),                # Long telephone
+    ])
+    def test_registration_form_field_limits(self, field, long_value):
         """
         Test Case 8: Field length limits and boundary testing
         
-        Verify that form fields handle length limits appropriately
+        Verify that form fields handle length limits appropriately, one
+        overlong field per case
         """
-        logger.info("=== Test Case 8: Field Length Limits ===")
+        logger.info(f"=== Test Case 8: Field Length Limits ({field}) ===")
         
         self.home_page.click_register()
         
-        # Test with very long values
-        long_user_data = self.generate_test_user_data(
-            firstname="A" * 100,    # Very long first name
-            lastname="B" * 100,     # Very long last name
-            email="c" * 50 + "@example.com",  # Long email
-            telephone="1" * 50      # Long telephone
-        )
-        
+        long_user_data = self.generate_test_user_data(**{field: long_value})
         self.registration_page.complete_registration(long_user_data)
         
         # Check if form handles long input appropriately
-        success = self.registration_page.is_registration_successful()
-        errors = self.registration_page.get_all_validation_errors()
+        errors = self.registration_page.get_form_snapshot()['errors']
         
         if errors:
             logger.info(f"Long field validation errors: {errors}")
@@ -392,7 +375,7 @@ class TestUserRegistration:
         
         logger.info(f"✅ Registration completed in {registration_time:.2f} seconds")
     
-    @pytest.mark.parametrize("browser", ["chrome", "firefox"])
+    @pytest.mark.parametrize("browser", ["chrome", "firefox"], ids=["chrome", "firefox"])
     def test_cross_browser_registration(self, browser):
         """
         Test Case 11: Cross-browser compatibility
@@ -401,8 +384,8 @@ class TestUserRegistration:
         """
         logger.info(f"=== Cross-Browser Test: {browser} ===")
         
-        # This test would be run with different browser configurations
-        # The parametrize decorator runs this test for each browser
+        # The driver fixture starts the browser named by the "browser"
+        # parameter; each case is scheduled independently under xdist
         
         user_data = self.generate_test_user_data()
         
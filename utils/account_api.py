@@ -0,0 +1,109 @@
+"""
+Account API
+Direct HTTP access to OpenCart customer accounts, for test users that
+don't need to be registered through the browser
+Author: Lucas Maidana
+"""
+
+from types import MappingProxyType
+from typing import Dict
+
+import requests
+from loguru import logger
+
+from utils.cart_api import REQUEST_TIMEOUT
+
+
+# Registration form fields, keyed by the test data names used by the suites
+REGISTER_FORM_FIELDS = MappingProxyType({
+    'firstname': 'firstname',
+    'lastname': 'lastname',
+    'email': 'email',
+    'telephone': 'telephone',
+    'password': 'password',
+    'confirm_password': 'confirm',
+})
+
+
+def register_customer(user_data: dict, base_url: str) -> bool:
+    """
+    Register a customer by posting the registration form
+    
+    Args:
+        user_data: Registration data as used by RegistrationPage
+        base_url: Base URL of OpenCart installation
+    
+    Returns:
+        bool: True if the store redirected to the account success page
+    
+    Raises:
+        requests.RequestException: If the store could not be reached
+    """
+    form = {field: user_data[key] for key, field in REGISTER_FORM_FIELDS.items() if key in user_data}
+    form.setdefault('confirm', user_data['password'])
+    form['newsletter'] = '1' if user_data.get('newsletter') else '0'
+    form['agree'] = '1'
+    
+    with requests.Session() as session:
+        response = session.post(
+            f"{base_url}/index.php?route=account/register",
+            data=form,
+            timeout=REQUEST_TIMEOUT
+        )
+        response.raise_for_status()
+    
+    registered = 'account/success' in response.url
+    logger.debug("Registered {} over HTTP: {}", user_data['email'], registered)
+    return registered
+
+
+def post_login(session: requests.Session, email: str, password: str, base_url: str) -> requests.Response:
+    """
+    Post the login form on an existing session
+    
+    Args:
+        session: Session to log in
+        email: Customer email
+        password: Customer password
+        base_url: Base URL of OpenCart installation
+    
+    Returns:
+        requests.Response: Final response after redirects; a refused login
+            renders the login page again with a warning
+    
+    Raises:
+        requests.RequestException: If the store could not be reached
+    """
+    response = session.post(
+        f"{base_url}/index.php?route=account/login",
+        data={'email': email, 'password': password},
+        timeout=REQUEST_TIMEOUT
+    )
+    response.raise_for_status()
+    return response
+
+
+def login_customer(email: str, password: str, base_url: str) -> Dict[str, str]:
+    """
+    Log a customer in by posting the login form
+    
+    Each call starts a new store session, so logging out in one test never
+    invalidates the cookies handed to another.
+    
+    Args:
+        email: Customer email
+        password: Customer password
+        base_url: Base URL of OpenCart installation
+    
+    Returns:
+        Dict[str, str]: Session cookies by name, empty if the login was refused
+    
+    Raises:
+        requests.RequestException: If the store could not be reached
+    """
+    with requests.Session() as session:
+        response = post_login(session, email, password, base_url)
+        # A successful login redirects to the account page
+        if 'account/account' not in response.url:
+            return {}
+        return session.cookies.get_dict()
@@ -0,0 +1,79 @@
+"""
+Cart API
+Direct HTTP access to the OpenCart cart, for test setup and cleanup that
+doesn't need to render pages in the browser
+Author: Lucas Maidana
+"""
+
+import re
+from typing import Dict, List
+
+import requests
+from loguru import logger
+
+
+# Cart item keys, as rendered in the cart page remove buttons: cart.remove('<key>')
+CART_KEY_PATTERN = re.compile(r"cart\.remove\('([^']+)'\)")
+
+# Cleanup should fail fast and fall back to the browser if the store is slow
+REQUEST_TIMEOUT = 10  # seconds
+
+
+def cart_session(cookies: Dict[str, str]) -> requests.Session:
+    """
+    Build a requests session that shares the browser's store session
+    
+    Args:
+        cookies: Browser cookies as a name to value mapping
+    
+    Returns:
+        requests.Session: Session sending the same cookies
+    """
+    session = requests.Session()
+    session.cookies.update(cookies)
+    return session
+
+
+def get_cart_keys(session: requests.Session, base_url: str) -> List[str]:
+    """
+    Read the cart item keys from the cart page
+    
+    Args:
+        session: Session carrying the store session cookie
+        base_url: Base URL of OpenCart installation
+    
+    Returns:
+        List[str]: Cart item keys, empty for an empty cart
+    """
+    response = session.get(f"{base_url}/index.php?route=checkout/cart", timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+    # Each key appears once per remove button; keep page order, drop repeats
+    return list(dict.fromkeys(CART_KEY_PATTERN.findall(response.text)))
+
+
+def clear_cart(cookies: Dict[str, str], base_url: str) -> int:
+    """
+    Remove every item from the cart of a browser session over HTTP
+    
+    Args:
+        cookies: Browser cookies as a name to value mapping
+        base_url: Base URL of OpenCart installation
+    
+    Returns:
+        int: Number of cart items removed
+    
+    Raises:
+        requests.RequestException: If the store could not be reached
+    """
+    with cart_session(cookies) as session:
+        keys = get_cart_keys(session, base_url)
+        for key in keys:
+            response = session.post(
+                f"{base_url}/index.php?route=checkout/cart/remove",
+                data={'key': key},
+                timeout=REQUEST_TIMEOUT
+            )
+            response.raise_for_status()
+    
+    logger.debug("Removed {} cart items over HTTP", len(keys))
+    return len(keys)
@@ -7,7 +7,13 @@ Author: Lucas Maidana
 
 import os
 import time
-from typing import Optional
+import shutil
+import socket
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, wait
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Mapping, Optional, Tuple
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options as ChromeOptions
 from selenium.webdriver.firefox.options import Options as FirefoxOptions
@@ -15,14 +21,85 @@ from selenium.webdriver.edge.options import Options as EdgeOptions
 from selenium.webdriver.chrome.service import Service as ChromeService
 from selenium.webdriver.firefox.service import Service as FirefoxService
 from selenium.webdriver.edge.service import Service as EdgeService
-from webdriver_manager.chrome import ChromeDriverManager
-from webdriver_manager.firefox import GeckoDriverManager
-from webdriver_manager.microsoft import EdgeChromiumDriverManager
 from loguru import logger
 
 from config.settings import config
 
 
+# tmpfs mount used for throwaway browser profiles when present (Linux, CI runners)
+SHARED_MEMORY_DIR = "/dev/shm"
+
+# Upper bound for a quit driver service to release its port before a restart
+DRIVER_SHUTDOWN_TIMEOUT = 5  # seconds
+
+# Upper bound for every browser to quit at the end of a session
+DRIVER_CLEANUP_TIMEOUT = 10  # seconds
+
+
+@lru_cache(maxsize=None)
+def _ensure_dir(path: str) -> str:
+    """Create a directory once per process and return it"""
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+@lru_cache(maxsize=None)
+def _chrome_base_options(headless: bool, is_ci: bool, window_size: str,
+                         download_directory: str, load_images: bool) -> Tuple[Tuple[str, ...], Mapping]:
+    """
+    Chrome arguments and preferences shared by every driver with the same settings
+    
+    Built once per process; the per-driver profile directory is added by the caller.
+    
+    Returns:
+        tuple: Command line arguments and a read-only prefs mapping
+    """
+    arguments = [
+        # Performance optimizations
+        '--no-sandbox',
+        '--disable-dev-shm-usage',
+        '--disable-gpu',
+        '--disable-extensions',
+        '--disable-plugins',
+        # Background subsystems tests never use (and that compete for CPU)
+        '--disable-background-networking',
+        '--disable-default-apps',
+        '--disable-sync',
+        '--disable-renderer-backgrounding',
+        '--disable-features=Translate,BackForwardCache,MediaRouter,OptimizationHints',
+        # Memory optimizations
+        '--memory-pressure-off',
+        '--max_old_space_size=4096',
+    ]
+    
+    # CI/CD optimizations
+    if is_ci:
+        arguments += ['--disable-logging', '--log-level=3', '--silent']
+    
+    if headless:
+        arguments.append('--headless=new')
+    arguments.append(f'--window-size={window_size}')
+    arguments.append('--disk-cache-size=0')
+    
+    # Download configuration
+    prefs = {
+        'download.default_directory': download_directory,
+        'download.prompt_for_download': False,
+        'download.directory_upgrade': True,
+        'safebrowsing.enabled': True
+    }
+    if not load_images:
+        # The content setting covers <img> loads, the blink setting also
+        # stops the renderer decoding images (e.g. CSS backgrounds)
+        prefs['profile.managed_default_content_settings.images'] = 2
+        arguments.append('--blink-settings=imagesEnabled=false')
+    
+    # Security configurations
+    arguments += ['--disable-web-security', '--allow-running-insecure-content']
+    
+    return tuple(arguments), MappingProxyType(prefs)
+
+
 class DriverManager:
     """
     Advanced WebDriver manager supporting multiple browsers and execution environments
@@ -43,6 +120,7 @@ class DriverManager:
         if not hasattr(self, 'initialized'):
             self.browser_name = browser_name or config.current_browser
             self.driver: Optional[webdriver.Remote] = None
+            self._profile_dir: Optional[str] = None
             self.initialized = True
             logger.info(f"DriverManager initialized for {self.browser_name}")
     
@@ -69,56 +147,37 @@ class DriverManager:
             
         except Exception as e:
             logger.error(f"Failed to create WebDriver for {self.browser_name}: {str(e)}")
+            # Drop the profile directory of a browser that never started
+            self.quit_driver()
             raise
     
     def _create_chrome_driver(self) -> webdriver.Chrome:
         """Create Chrome WebDriver with optimized options"""
-        options = ChromeOptions()
-        
-        # Performance optimizations
-        options.add_argument('--no-sandbox')
-        options.add_argument('--disable-dev-shm-usage')
-        options.add_argument('--disable-gpu')
-        options.add_argument('--disable-extensions')
-        options.add_argument('--disable-plugins')
-        options.add_argument('--disable-images')
-        options.add_argument('--disable-javascript')  # Remove for JS-heavy tests
-        
-        # Memory optimizations
-        options.add_argument('--memory-pressure-off')
-        options.add_argument('--max_old_space_size=4096')
-        
-        # CI/CD optimizations
-        if config.is_ci_environment:
-            options.add_argument('--headless=new')
-            options.add_argument('--disable-logging')
-            options.add_argument('--log-level=3')
-            options.add_argument('--silent')
-        
-        # Browser configuration
         browser_config = config.browsers.get('chrome')
-        if browser_config.headless:
-            options.add_argument('--headless=new')
-        
-        options.add_argument(f'--window-size={browser_config.window_size}')
+        arguments, prefs = _chrome_base_options(
+            self._is_headless(), config.is_ci_environment, browser_config.window_size,
+            browser_config.download_directory, config.load_images
+        )
         
-        # Download configuration
-        prefs = {
-            'download.default_directory': os.path.abspath(browser_config.download_directory),
-            'download.prompt_for_download': False,
-            'download.directory_upgrade': True,
-            'safebrowsing.enabled': True
-        }
-        options.add_experimental_option('prefs', prefs)
+        options = ChromeOptions()
+        for argument in arguments:
+            options.add_argument(argument)
+        options.add_experimental_option('prefs', dict(prefs))
+        options.page_load_strategy = config.page_load_strategy
         
-        # Security configurations
-        options.add_argument('--disable-web-security')
-        options.add_argument('--allow-running-insecure-content')
+        # Profile and cache in RAM where tmpfs is available, so cookie, storage
+        # and cache writes between tests never hit the disk
+        self._profile_dir = tempfile.mkdtemp(
+            prefix="chrome-profile-", dir=SHARED_MEMORY_DIR if os.path.isdir(SHARED_MEMORY_DIR) else None
+        )
+        options.add_argument(f'--user-data-dir={self._profile_dir}')
+        options.add_argument(f'--disk-cache-dir={os.path.join(self._profile_dir, "cache")}')
         
         # Create service
-        service = ChromeService(ChromeDriverManager().install())
+        service = ChromeService(self._resolve_driver_path())
         
-        return webdriver.Chrome(service=service, options=options)
+        # One pooled HTTP connection to the driver for every command
+        return webdriver.Chrome(service=service, options=options, keep_alive=True)
     
     def _create_firefox_driver(self) -> webdriver.Firefox:
         """Create Firefox WebDriver with optimized options"""
@@ -128,23 +187,26 @@ class DriverManager:
         options.set_preference('dom.webnotifications.enabled', False)
         options.set_preference('media.volume_scale', '0.0')
         options.set_preference('dom.push.enabled', False)
+        options.page_load_strategy = config.page_load_strategy
+        if not config.load_images:
+            options.set_preference('permissions.default.image', 2)
         
         # CI/CD optimizations
         browser_config = config.browsers.get('firefox')
-        if browser_config.headless or config.is_ci_environment:
+        if self._is_headless():
             options.add_argument('--headless')
         
         # Download configuration
         options.set_preference('browser.download.folderList', 2)
         options.set_preference('browser.download.dir', 
-                             os.path.abspath(browser_config.download_directory))
+                             browser_config.download_directory)
         options.set_preference('browser.helperApps.neverAsk.saveToDisk', 
                              'application/octet-stream')
         
         # Create service
-        service = FirefoxService(GeckoDriverManager().install())
+        service = FirefoxService(self._resolve_driver_path())
         
-        return webdriver.Firefox(service=service, options=options)
+        return webdriver.Firefox(service=service, options=options, keep_alive=True)
     
     def _create_edge_driver(self) -> webdriver.Edge:
         """Create Edge WebDriver with optimized options"""
@@ -155,33 +217,63 @@ class DriverManager:
         options.add_argument('--disable-dev-shm-usage')
         options.add_argument('--disable-gpu')
         options.add_argument('--disable-extensions')
+        options.page_load_strategy = config.page_load_strategy
+        if not config.load_images:
+            options.add_experimental_option(
+                'prefs', {'profile.managed_default_content_settings.images': 2}
+            )
+            options.add_argument('--blink-settings=imagesEnabled=false')
         
         # CI/CD optimizations
         browser_config = config.browsers.get('edge')
-        if browser_config.headless or config.is_ci_environment:
+        if self._is_headless():
             options.add_argument('--headless')
         
         options.add_argument(f'--window-size={browser_config.window_size}')
         
         # Create service
-        service = EdgeService(EdgeChromiumDriverManager().install())
+        service = EdgeService(self._resolve_driver_path())
         
-        return webdriver.Edge(service=service, options=options)
+        return webdriver.Edge(service=service, options=options, keep_alive=True)
+    
+    def _is_headless(self) -> bool:
+        """Whether the browser runs headless: configured so, or forced on CI"""
+        return config.browsers.get(self.browser_name.lower()).headless or config.is_ci_environment
+    
+    def _resolve_driver_path(self) -> Optional[str]:
+        """
+        Resolve the driver binary path
+        
+        A <BROWSER>_DRIVER_PATH environment variable (e.g. CHROME_DRIVER_PATH)
+        pins the binary. Otherwise no path is given and Selenium Manager
+        locates the driver, downloading it once into ~/.cache/selenium.
+        
+        Returns:
+            Optional[str]: Pinned driver binary path, or None for Selenium Manager
+        """
+        override = os.getenv(f"{self.browser_name.upper()}_DRIVER_PATH")
+        if override:
+            logger.debug("Using driver binary from environment: {}", override)
+        return override
     
     def _configure_driver(self):
         """Configure WebDriver with timeouts and other settings"""
         if self.driver:
-            # Set timeouts
-            self.driver.implicitly_wait(config.implicit_wait)
+            # Set timeouts (sessions start with no implicit wait, which is
+            # what the explicit waits in the page objects expect)
+            if config.implicit_wait:
+                self.driver.implicitly_wait(config.implicit_wait)
             self.driver.set_page_load_timeout(config.page_load_timeout)
+            self.driver.set_script_timeout(config.script_timeout)
             
             # Maximize window if not headless
-            if not config.browsers.get(self.browser_name).headless:
+            if not self._is_headless():
                 self.driver.maximize_window()
             
             logger.info(f"WebDriver configured with timeouts: "
                        f"implicit={config.implicit_wait}s, "
-                       f"page_load={config.page_load_timeout}s")
+                       f"page_load={config.page_load_timeout}s, "
+                       f"script={config.script_timeout}s")
     
     def get_driver(self) -> webdriver.Remote:
         """
@@ -204,14 +296,56 @@ class DriverManager:
                 logger.warning(f"Error quitting WebDriver: {str(e)}")
             finally:
                 self.driver = None
+        
+        if self._profile_dir:
+            shutil.rmtree(self._profile_dir, ignore_errors=True)
+            self._profile_dir = None
+    
+    def reset_driver(self):
+        """Clear browser state so the WebDriver can be reused by another test"""
+        if not self.driver:
+            return
+        
+        self.driver.delete_all_cookies()
+        try:
+            self.driver.execute_script(
+                "window.localStorage.clear(); window.sessionStorage.clear();"
+            )
+        except Exception as e:
+            # Storage is not accessible on every origin (e.g. about:blank)
+            logger.debug("Could not clear web storage: {}", e)
+        self.driver.get("about:blank")
+        logger.debug("WebDriver state reset: {}", self.browser_name)
     
     def restart_driver(self) -> webdriver.Remote:
         """Restart WebDriver (useful for recovering from crashes)"""
         logger.info(f"Restarting WebDriver: {self.browser_name}")
+        service = getattr(self.driver, 'service', None)
+        port = getattr(service, 'port', None)
         self.quit_driver()
-        time.sleep(2)  # Wait for cleanup
+        if port:
+            self._wait_for_port_closed(port)
         return self.create_driver()
     
+    @staticmethod
+    def _wait_for_port_closed(port: int, timeout: float = DRIVER_SHUTDOWN_TIMEOUT):
+        """
+        Wait until the old driver service stops accepting connections
+        
+        Args:
+            port: Local port of the driver service
+            timeout: Upper bound for the service to shut down
+        """
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                with socket.create_connection(("127.0.0.1", port), timeout=0.1):
+                    pass
+            except OSError:
+                return
+            time.sleep(0.05)
+        logger.warning("Driver service still listening on port {} after {}s", port, timeout)
+    
     def take_screenshot(self, filename: str = None) -> str:
         """
         Take screenshot of current page
@@ -228,22 +362,48 @@ class DriverManager:
         timestamp = time.strftime("%Y%m%d_%H%M%S")
         filename = filename or f"screenshot_{timestamp}.png"
         
-        # Ensure screenshots directory exists
-        os.makedirs(config.screenshots_dir, exist_ok=True)
-        
-        filepath = os.path.join(config.screenshots_dir, filename)
+        filepath = os.path.join(_ensure_dir(config.screenshots_dir), filename)
         self.driver.save_screenshot(filepath)
         
         logger.info(f"Screenshot saved: {filepath}")
         return filepath
     
     @classmethod
-    def cleanup_all_drivers(cls):
-        """Clean up all WebDriver instances"""
-        for browser_name, instance in cls._instances.items():
-            if hasattr(instance, 'driver') and instance.driver:
-                instance.quit_driver()
+    def get_active_driver(cls, browser_name: str = None) -> Optional[webdriver.Remote]:
+        """
+        Get the running WebDriver for a browser without creating a manager
+        
+        Args:
+            browser_name: Browser name (defaults to current browser)
+            
+        Returns:
+            Optional[webdriver.Remote]: Running WebDriver or None
+        """
+        instance = cls._instances.get(browser_name or config.current_browser)
+        return instance.driver if instance else None
+    
+    @classmethod
+    def cleanup_all_drivers(cls, timeout: float = DRIVER_CLEANUP_TIMEOUT):
+        """
+        Clean up all WebDriver instances
+        
+        Browsers are quit in parallel, so one hanging browser neither
+        serializes nor blocks the others' shutdown.
+        
+        Args:
+            timeout: Upper bound to wait for all browsers to quit
+        """
+        instances = [instance for instance in cls._instances.values()
+                     if getattr(instance, 'driver', None)]
         cls._instances.clear()
+        if instances:
+            executor = ThreadPoolExecutor(max_workers=len(instances))
+            futures = [executor.submit(instance.quit_driver) for instance in instances]
+            _, pending = wait(futures, timeout=timeout)
+            # Don't join threads stuck on a hung browser
+            executor.shutdown(wait=False)
+            if pending:
+                logger.warning("{} WebDriver(s) did not quit within {}s", len(pending), timeout)
         logger.info("All WebDriver instances cleaned up")
 
 